@@ -14,45 +14,188 @@ __maintainer__ =['Victor Calderon']
 
 """
 # Importing Modules
-import numpy as np
+# `numpy`, `pandas`, `requests`, `ads`, `arxiv` and the email modules are
+# loaded with `lazy_import` by the functions that use them, so that days
+# with nothing to send do not pay for importing them.
 import os
 import sys
-import sys
+import time
 # sys.setdefaultencoding('utf8')
-import pandas as pd
+import argparse
+import importlib
 
 # Extra-modules
-import ads
-import arxiv
+import re
 import datetime
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from io import StringIO
+# Local modules
+import ajc_cache
+import ajc_index
+import ajc_metadata
+
+## HTTP settings
+# Connect and read timeouts (in seconds) for every page request
+HTTP_TIMEOUT   = (5, 30)
+# Number of keep-alive connections kept per host
+HTTP_POOL_SIZE = 4
+# Maximum number of pages downloaded at the same time
+HTTP_MAX_WORKERS = int(os.environ.get('ajc_max_workers', 3))
+# Seconds to wait for a page before serving the last cached copy
+HTTP_BUDGET    = float(os.environ.get('ajc_http_budget', 10.0))
+# Pages older than this many seconds raise an alert when they are served
+STALE_ALERT    = float(os.environ.get('ajc_stale_alert', 86400))
+# Staleness (in seconds) of every page served from the cache after a
+# failed or slow download, keyed by URL
+STALE_PAGES    = {}
+# Shared `requests.Session`. Created on first use by `http_session`
+_http_session  = None
+# Shared on-disk response cache. Created on first use by `http_cache`
+_http_cache    = None
+# Shared paper metadata cache. Created on first use by `metadata_cache`
+_metadata_cache = None
+
+## Event calendar
+# Directory of `event_calendar`, shared with `Astroweb_updates_xmlrpc`
+EVENT_CALENDAR_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'Astroweb_post')
+# Shared `event_calendar.EventCalendar`. Loaded on first use by
+# `event_calendar`
+_event_calendar = None
+# Name of the AJC event in `event_calendar`
+AJC_EVENT = 'AJC'
+
+## Email settings
+# Days before the AJC date when the speaker is reminded
+REMINDER_DAY = 2
+# Days before the AJC date when `PHYS_AJC` is emailed
+PHYSAJC_DAY  = 1
+
+## ADS / arXiv settings
+# Seconds to wait for ADS before also querying arXiv
+ADS_HEDGE_DELAY = float(os.environ.get('ajc_ads_hedge_delay', 2.0))
+# Maximum number of seconds for a paper lookup
+ADS_DEADLINE    = float(os.environ.get('ajc_ads_deadline', 20.0))
+
+## Lazy imports
+# Seconds spent importing each module loaded through `lazy_import`
+IMPORT_TIMES = {}
+# If set, import times are written to stderr, like `python -X importtime`
+IMPORT_TIME_REPORT = bool(os.environ.get('ajc_importtime'))
+
+## Parsing settings
+# `First Last` at the beginning of a contact cell
+PEOPLE_NAME_RE  = re.compile(r'^\s*(?P<first_name>\S+)\s+(?P<last_name>\S+)')
+# `Email: address` inside of a contact cell
+PEOPLE_EMAIL_RE = re.compile(r'Email:\s*(?P<email>[^\s,;]+)')
+# ArXiv ID, new-style (`1901.00001v2`) or old-style (`astro-ph/0601001`),
+# optionally as `[arXiv:ID]`
+ARXIV_ID_PATTERN = r"""
+    (?:\s*\[?\s*(?:arXiv:\s*)?
+        (?P<arxiv_id>\d{4}\.\d{4,5}(?:v\d+)?
+                    |[a-z\-]+(?:\.[A-Z]{2})?/\d{7}(?:v\d+)?)
+    \s*\]?)?"""
+# `"Title" by Author et al. (Year) [arXiv ID]` cell of the AJC schedule.
+# Quotes can be curly or straight, and the title can contain `by`: the
+# author is taken after the last ` by ` (or `by` right after the closing
+# quote). The parentheses around the year are optional.
+TITLE_RE = re.compile(r"""
+    ^\s*(?P<title>.+)(?:\s+|(?<=["\u201d]))by\s+
+    (?P<author>[^()\[\]"\u201c\u201d]+?)(?:,?\s+et\s+al\.?)?[\s,;:]*
+    \(?\s*(?P<year>\d{4})[a-z]?\s*\)?""" + ARXIV_ID_PATTERN + r"""
+    \s*$""", re.VERBOSE | re.IGNORECASE)
+# Cells that do not match `TITLE_RE`: only the title and arXiv ID are kept
+TITLE_FALLBACK_RE = re.compile(r"""
+    ^\s*(?P<title>\S.*?)""" + ARXIV_ID_PATTERN + r"""
+    \s*$""", re.VERBOSE | re.IGNORECASE | re.DOTALL)
+# Quotes around the title
+TITLE_QUOTES = '"\'\u201c\u201d\u2018\u2019 '
+# Punctuation left after the author, e.g. `Smith et al.,`
+AUTHOR_STRIP = ' ,;:'
 
 # Main functions
 
+def lazy_import(module_name):
+    """
+    Imports `module_name` on first use and records how long it took.
+
+    Parameters
+    ----------
+    module_name: string
+        name of the module, e.g. `pandas` or `email.mime.text`
+
+    Returns
+    --------
+    module: module
+        imported module
+    """
+    start  = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if module_name not in IMPORT_TIMES:
+        IMPORT_TIMES[module_name] = time.perf_counter() - start
+        if IMPORT_TIME_REPORT:
+            sys.stderr.write('import time: {0:>10d} | {1}\n'.format(
+                int(1e6 * IMPORT_TIMES[module_name]), module_name))
+
+    return module
+
 #### ------------------------- Datetime Extraction ---------------------- #####
 
-def datetime_dict():
+def datetime_dict(now=None):
     """
     Produces dictionary with necessary time information
 
+    Parameters
+    ----------
+    now : `datetime.date` or `NoneType`, optional
+        Date to use instead of today, e.g. when simulating a semester.
+        This variable is set to `None` by default.
+
     Returns
     -------
     now_dict: `dict`
-        dictionary with `year`, `weekday`, `month`, `day` entries
+        dictionary with `year`, `weekday`, `month`, `day` entries, and
+        the `events` and `break` (name or `None`) of the date in
+        `event_calendar`
     """
     ## Determining today's date
-    now     = datetime.datetime.now()
+    now     = datetime.datetime.now() if now is None else now
     year    = now.strftime("%Y")
     weekday = now.strftime("%a")
     month   = now.strftime("%m")
     day     = now.strftime("%d")
     now_dict = {'year':year, 'weekday':weekday, 'month':month, 'day':day}
+    ## Events of the day
+    calendar = event_calendar()
+    calendar_day = calendar.day(now) if calendar is not None else None
+    now_dict['events'] = calendar_day.events if calendar_day else ()
+    now_dict['break' ] = calendar_day.break_name if calendar_day else None
 
     return now_dict
 
+def event_calendar():
+    """
+    Returns the calendar of events and breaks shared with
+    `Astroweb_updates_xmlrpc`, loading it on first use.
+
+    Returns
+    --------
+    _event_calendar: `event_calendar.EventCalendar` or `NoneType`
+        compiled calendar, or `None` if it could not be read
+    """
+    global _event_calendar
+    if _event_calendar is None:
+        if EVENT_CALENDAR_DIR not in sys.path:
+            sys.path.append(EVENT_CALENDAR_DIR)
+        try:
+            _event_calendar = lazy_import('event_calendar').load_calendar()
+        except (ImportError, IOError, OSError, ValueError, KeyError) as err:
+            now = datetime.datetime.now()
+            sys.stderr.write('{0}\t Could not load the event calendar: {1}\n'.format(
+                now.strftime("%x %a %X"), err))
+            _event_calendar = False
+
+    return _event_calendar or None
+
 def ajc_url_creator(now_dict):
     """
     Creates the `ajc_url` string
@@ -68,10 +211,8 @@ def ajc_url_creator(now_dict):
         URL of the current AJC schedule page.
     """
     # Months in academic semesters
-    spring_months = np.arange(1, 6, 1)
-    fall_months   = np.arange(8, 13, 1)
-    # Months in the academic year, i.e. Fall + Spring semester
-    academic_year_arr = np.concatenate((fall_months, spring_months))
+    spring_months = range(1, 6)
+    fall_months   = range(8, 13)
     # Determining the URL for the current AJC schedule
     if (int(now_dict['month']) in fall_months):
         fall_year   = int(now_dict['year'])
@@ -91,12 +232,34 @@ def ajc_url_creator(now_dict):
     ajc_list.append(f"{sem_num}")
     ajc_list.append(f"journal-club-fall-{fall_year}-spring-{spring_year}")
     ajc_url = '/'.join(ajc_list)
-    # Checking URL
-    url_checker(ajc_url)
 
     return ajc_url
 
-def people_info_extractor(people_type='graduate'):
+def people_url_creator(people_type='graduate'):
+    """
+    Creates the URL of the page listing `people_type`.
+
+    Parameters
+    ----------
+    people_type : `str`, optional
+        Type of people. Either `graduate` or `faculty`. This variable is
+        set to `graduate` by default.
+
+    Returns
+    -------
+    people_url : `str`
+        URL of the graduate-students or faculty page.
+    """
+    url_base = "https://as.vanderbilt.edu/astronomy/people/"
+    people_type_url_dict = {
+        'graduate' : '{0}/graduate-students/'.format(url_base),
+        'faculty'  : '{0}/faculty'.format(url_base)
+    }
+    people_url = people_type_url_dict[people_type]
+
+    return people_url
+
+def people_info_extractor(people_type='graduate', people_html=None):
     """
     This function extracts the info for `people_type` from specified URL.
 
@@ -110,12 +273,18 @@ def people_info_extractor(people_type='graduate'):
             - 'graduate' : Extracts information about graduate students.
             - 'faculty' : Extracts information about faculty.
 
+    people_html : `str` or `NoneType`, optional
+        HTML body of the `people_type` page, if it was already downloaded.
+        If `None`, the page is fetched with `url_fetch`. This variable is
+        set to `None` by default.
+
     Returns
     -------------
     people_pd : `pandas.DataFrame`
         DataFrame with names and emails of the current students or
         faculty of the Astronomy Department at Vanderbilt University.
     """
+    pd = lazy_import('pandas')
     ## Checking info parameters
     # `people_type` - Type
     people_type_type_arr = (str)
@@ -130,54 +299,33 @@ def people_info_extractor(people_type='graduate'):
         msg = msg.format(people_type, people_type_value_arr)
         raise ValueError(msg)
     #
-    #
-    url_base = "https://as.vanderbilt.edu/astronomy/people/"
-    people_type_url_dict = {
-        'graduate' : '{0}/graduate-students/'.format(url_base),
-        'faculty'  : '{0}/faculty'.format(url_base)
-    }
-    # Checking chosen url
-    url_chosen = people_type_url_dict[people_type]
-    url_checker(url_chosen)
+    # Downloading chosen url, unless it was passed in
+    url_chosen = people_url_creator(people_type)
+    if people_html is None:
+        people_html = url_fetch(url_chosen)
+    # Using cached DataFrame if the page has not changed
+    people_pd = http_cache().load_parsed(url_chosen, 'people_pd', people_html)
+    if people_pd is not None:
+        return people_pd
     # Reading in table
-    people_table = pd.read_html(url_chosen)
-    # Looping over elements in `people_table`
-    for ii, people_ii in enumerate(people_table):
-        if (ii == 0):
-            people_pd_temp = people_ii[1]
-        else:
-            people_pd_temp = people_pd_temp.append(people_ii[1],
-                ignore_index=True)
+    people_table = pd.read_html(StringIO(people_html))
+    # Joining the name/contact column of every table
+    people_pd_temp = pd.concat([people_ii[1] for people_ii in people_table],
+                        ignore_index=True)
     # Dropping NaN's
     people_pd_temp = people_pd_temp.dropna().reset_index(drop=True)
-    n_people       = people_pd_temp.shape[0]
     # Parsing fields
-    list_st = [[] for x in range(n_people)]
-    people_dict = { 'full_name' : list(list_st),
-                    'first_name': list(list_st),
-                    'last_name' : list(list_st),
-                    'email'     : list(list_st)}
-    # Populating dictionary
-    for ii, elem in enumerate(people_pd_temp):
-        elem_split = elem.split()
-        people_dict['first_name'][ii] = elem_split[0]
-        people_dict['last_name'][ii]  = elem_split[1]
-        people_dict['full_name'][ii]  = '_'.join(elem_split[:2][::-1])
-        jj = 0
-        # Splitting for email
-        elem_state = False
-        while (elem_state == False):
-            for jj, elem_jj in enumerate(elem_split):
-                if ('Email:' in elem_jj):
-                    elem_state = True
-                    zz = jj
-        email = elem_split[zz+1].strip()
-        people_dict['email'][ii] = email
-    # Converting to DataFrame
-    people_pd = pd.DataFrame(people_dict)
-    people_pd_cols = people_pd.columns.tolist()
-    people_pd_cols = people_pd_cols[::-1]
-    people_pd = people_pd[people_pd_cols]
+    people_pd = people_parser(people_pd_temp)
+    # Skipping rows without a name or email
+    malformed = people_pd['malformed']
+    if malformed.any():
+        now = datetime.datetime.now()
+        for elem in people_pd_temp[malformed.values]:
+            sys.stderr.write('{0}\t Could not parse `{1}` entry: {2}\n'.format(
+                now.strftime("%x %a %X"), people_type, ' '.join(elem.split())))
+    people_pd = people_pd.loc[~malformed, ['full_name', 'first_name',
+                    'last_name', 'email']]
+    people_pd = people_pd[people_pd.columns[::-1]]
     # Sorting by name
     people_pd.sort_values('full_name', inplace=True)
     people_pd.reset_index(inplace=True, drop=True)
@@ -185,10 +333,46 @@ def people_info_extractor(people_type='graduate'):
     people_pd = people_pd.set_index('full_name')
     # Adding columns that indicates type of person
     people_pd.loc[:, 'people_type'] = people_type
+    # Caching parsed DataFrame next to the page
+    http_cache().store_parsed(url_chosen, 'people_pd', people_html, people_pd)
 
     return people_pd
 
-def ajc_parser(ajc_url, reminder_day=2, physajc_day=1):
+def people_parser(people_series):
+    """
+    Extracts names and emails from the contact cells of the people pages.
+
+    Each cell is expected to start with `First Last` and to contain an
+    `Email: address` entry somewhere in the text.
+
+    Parameters
+    ----------
+    people_series : `pandas.Series`
+        Contact cells of the graduate-students or faculty pages.
+
+    Returns
+    -------
+    people_pd : `pandas.DataFrame`
+        DataFrame with `first_name`, `last_name`, `full_name` (`Last_First`)
+        and `email` columns for every cell in `people_series`, and a
+        `malformed` column that is True for cells without a name or email.
+    """
+    pd = lazy_import('pandas')
+    people_series = people_series.astype(str).reset_index(drop=True)
+    # Names and emails
+    names_pd = people_series.str.extract(PEOPLE_NAME_RE)
+    email_pd = people_series.str.extract(PEOPLE_EMAIL_RE)
+    # Joining fields
+    people_pd = pd.concat([names_pd, email_pd], axis=1)
+    people_pd['full_name'] = people_pd['last_name'] + '_' + \
+                                people_pd['first_name']
+    people_pd['malformed'] = people_pd[['first_name', 'last_name',
+                                'email']].isna().any(axis=1)
+
+    return people_pd
+
+def ajc_parser(ajc_url, reminder_day=REMINDER_DAY, physajc_day=PHYSAJC_DAY,
+    ajc_html=None):
     """
     Parses the information from `ajc_url`
 
@@ -197,20 +381,34 @@ def ajc_parser(ajc_url, reminder_day=2, physajc_day=1):
     ajc_url: string
         URL of the current AJC string
 
-    reminder_day: int, optional (default = 2)
+    reminder_day: int, optional (default = `REMINDER_DAY`)
         number of days `prior` to AJC to send email reminder to speaker
 
-    physajc_day: int, optional (default = 1)
+    physajc_day: int, optional (default = `PHYSAJC_DAY`)
         number of days `prior` to AJC to send email to PHYS_AJC mailing list.
 
+    ajc_html: string or NoneType, optional (default = None)
+        HTML body of `ajc_url`, if it was already downloaded. If `None`,
+        the page is fetched with `url_fetch`.
+
     Return
     ----------
     ajc_pd: pandas DataFrame
         DataFrame containing info about 1) AJC date, 2) Title, 3) Speaker,
-        4) Reminder date, 5) Date to send email to mailing list.
+        4) Reminder date, 5) Date to send email to mailing list, and
+        6) the columns parsed from `Title` by `title_frame`.
     """
+    pd = lazy_import('pandas')
     # Reading URL
-    ajc_pd = pd.read_html(ajc_url, header=0)[0]
+    if ajc_html is None:
+        ajc_html = url_fetch(ajc_url)
+    # Using cached DataFrame if the page and `TITLE_RE` have not changed
+    parsed_name = 'ajc_pd_{0}_{1}_{2}'.format(reminder_day, physajc_day,
+                    ajc_cache.body_digest(TITLE_RE.pattern)[:8])
+    ajc_pd = http_cache().load_parsed(ajc_url, parsed_name, ajc_html)
+    if (ajc_pd is not None) and ('paper_title' in ajc_pd.columns):
+        return ajc_pd
+    ajc_pd = pd.read_html(StringIO(ajc_html), header=0)[0]
     # Parsind - Date
     ajc_pd['Date'] = pd.to_datetime(ajc_pd['Date'])
     # Removing Dates with no Speaker
@@ -226,171 +424,524 @@ def ajc_parser(ajc_url, reminder_day=2, physajc_day=1):
     ajc_pd['Reminders']  = ajc_pd['Date'] - pd.Timedelta(reminder_day, 'D')
     # Send email dates
     ajc_pd['Send_email'] = ajc_pd['Date'] - pd.Timedelta(physajc_day, 'D')
+    # Parsing Title - paper title, first author, year and arXiv ID
+    ajc_pd = pd.concat([ajc_pd, title_frame(ajc_pd['Title'])], axis=1)
     # Making Speaker the index
     ajc_pd = ajc_pd.set_index('Speaker')
+    # Caching parsed DataFrame next to the page
+    http_cache().store_parsed(ajc_url, parsed_name, ajc_html, ajc_pd)
 
     return ajc_pd
 
-def ajc_gs_merge(ajc_pd):
+def ajc_gs_merge(ajc_pd, gs_html=None, fac_html=None):
     """
     Merges the DataFrames `ajc_pd` and `gs_pd`
+
+    Speakers are matched to the rosters with `ajc_names.NameIndex`, so
+    that middle names, accents, hyphens or nicknames do not break the
+    match. Matches below `ajc_names.NAME_MATCH_LOW` are not used: the
+    speaker is left without an email, so that the organizer gets the
+    `speaker_not_found` email, and the roster name is kept in the
+    `candidate` column.
     
     Parameters
     ----------
     ajc_pd: pandas DataFrame
         DataFrame with information on the AJC table
 
+    gs_html, fac_html: string or NoneType, optional (default = None)
+        HTML bodies of the graduate-students and faculty pages, e.g. from
+        `fetch_pages`. Pages that are `None` are downloaded here.
+
     Returns
     --------
     ajd_gs_pd: pandas DataFrame
         merged DataFrame between `ajc_pd` and `gs_pd`
-        Keys: `email`, `Date`, `Reminders`.
+        Keys: `email`, `Date`, `Reminders`, `candidate`.
         Index is set to `firstname_lastname` of student.
     """
-    # Graduate Students List
-    gs_pd = people_info_extractor('graduate')
-    # Faculty
-    fac_pd = people_info_extractor('faculty')
-    # Joining both DataFrames
-    gs_fac_pd = pd.concat([gs_pd, fac_pd])
+    pd = lazy_import('pandas')
+    ajc_names = lazy_import('ajc_names')
+    # Graduate Students and Faculty
+    roster = roster_load(gs_html=gs_html, fac_html=fac_html)
+    ## Resolving speakers
+    name_index = ajc_names.load_index(roster.names())
+    match_list = [name_index.match(speaker) for speaker in ajc_pd.index]
+    now = datetime.datetime.now()
     # Merging
-    ajc_gs_pd = pd.merge(gs_fac_pd, ajc_pd, left_index=True, right_index=True,
-        how='right')
+    roster_cols = ['email', 'last_name', 'first_name', 'people_type',
+                   'candidate']
+    roster_list = []
+    for speaker, (match_name, score) in zip(ajc_pd.index, match_list):
+        person = roster.get(match_name)
+        if person is None:
+            roster_list.append({})
+        elif score < ajc_names.NAME_MATCH_LOW:
+            # Not certain enough to email this person
+            candidate = '{0} <{1}>'.format(match_name, person.email)
+            sys.stderr.write('{0}\t Speaker `{1}` not matched: closest name is `{2}` ({3:.2f})\n'.format(
+                now.strftime("%x %a %X"), speaker, candidate, score))
+            roster_list.append({'candidate': candidate})
+        else:
+            roster_list.append(person.to_dict())
+    roster_pd = pd.DataFrame(roster_list, index=ajc_pd.index,
+                    columns=roster_cols)
+    ajc_gs_pd = pd.concat([roster_pd, ajc_pd], axis=1)
     # Sort by Date
     ajc_gs_pd = ajc_gs_pd.sort_values('Date')
 
     return ajc_gs_pd
 
-def send_email_reminder(ajc_gs_pd, now_dict):
+def roster_load(gs_html=None, fac_html=None):
     """
-    Sends email reminders 2 days before AJC date to the specified student
+    Graduate-student and faculty rosters, as an `ajc_roster.Roster`.
+
+    The roster is parsed with `people_info_extractor` only when the pages
+    changed. Otherwise, it is read from `AJC_CACHE_DIR/roster.bin`,
+    without `pandas`.
+
+    Parameters
+    ----------
+    gs_html, fac_html: string or NoneType, optional (default = None)
+        HTML bodies of the graduate-students and faculty pages, e.g. from
+        `fetch_pages`. If any of them is `None`, both pages are downloaded.
+
+    Returns
+    --------
+    roster: `ajc_roster.Roster`
+        people of both pages, graduate students first
+    """
+    ajc_roster = lazy_import('ajc_roster')
+    if (gs_html is None) or (fac_html is None):
+        gs_url  = people_url_creator('graduate')
+        fac_url = people_url_creator('faculty')
+        html_dict = fetch_pages([gs_url, fac_url])
+        gs_html, fac_html = html_dict[gs_url], html_dict[fac_url]
+    roster_digest = ajc_cache.body_digest(''.join([gs_html, fac_html]))
+    roster_path   = ajc_cache.cache_path('roster.bin')
+    try:
+        roster = ajc_roster.Roster.load(roster_path, digest=roster_digest)
+    except ajc_roster.RosterError as err:
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t {1}. Parsing the pages again\n'.format(
+            now.strftime("%x %a %X"), err))
+        roster = None
+    if roster is not None:
+        return roster
+    ## Parsing the pages
+    records = []
+    for people_type, people_html in [('graduate', gs_html),
+                                     ('faculty', fac_html)]:
+        people_pd = people_info_extractor(people_type, people_html=people_html)
+        records.extend(people_pd.reset_index().to_dict('records'))
+    roster = ajc_roster.Roster.from_records(records)
+    roster.save(roster_path, roster_digest)
+
+    return roster
+
+#### ------------------------- Schedule Index ---------------------- #####
+
+def schedule_records(ajc_gs_pd):
+    """
+    Converts the merged schedule into records for `ajc_index.ScheduleIndex`
 
     Parameters
     -----------
     ajc_gs_pd: pandas DataFrame
-        merged DataFrame between `ajc_pd` and `gs_pd`
-        Keys: `email`, `Date`, `Reminders`.
-        Index is set to `firstname_lastname` of student.
+        merged DataFrame between `ajc_pd` and `gs_pd`. The output of
+        `ajc_parser` can also be used, in which case the roster columns
+        are `None`.
+
+    Returns
+    --------
+    records: list
+        list of dictionaries with the keys in `ajc_index.SCHEDULE_COLS`
+    """
+    pd = lazy_import('pandas')
+    def date_str(date_ii):
+        return None if pd.isnull(date_ii) else date_ii.strftime('%Y-%m-%d')
+    def str_or_none(value):
+        return None if pd.isnull(value) else str(value)
+    ##
+    records = []
+    for speaker, row in ajc_gs_pd.iterrows():
+        record = {  'speaker'    : str(speaker),
+                    'date'       : date_str(row['Date']),
+                    'reminder'   : date_str(row['Reminders']),
+                    'send_email' : date_str(row['Send_email']),
+                    'email'      : str_or_none(row.get('email')),
+                    'first_name' : str_or_none(row.get('first_name')),
+                    'last_name'  : str_or_none(row.get('last_name')),
+                    'people_type': str_or_none(row.get('people_type')),
+                    'title'      : str_or_none(row.get('Title')),
+                    'paper_title': str_or_none(row.get('paper_title')),
+                    'author'     : str_or_none(row.get('author')),
+                    'year'       : None if pd.isnull(row.get('year'))
+                                    else int(row.get('year')),
+                    'arxiv_id'   : str_or_none(row.get('arxiv_id')),
+                    'candidate'  : str_or_none(row.get('candidate'))}
+        record['row_hash'] = ajc_index.row_hash(record['date'],
+                                record['speaker'], record['title'])
+        records.append(record)
+
+    return records
+
+def schedule_frame(records):
+    """
+    Converts records from `ajc_index.ScheduleIndex` back into a DataFrame
+    with the same columns as the output of `ajc_gs_merge`.
+
+    Parameters
+    -----------
+    records: list
+        list of dictionaries with the keys in `ajc_index.SCHEDULE_COLS`
+
+    Returns
+    --------
+    ajc_gs_pd: pandas DataFrame
+        merged DataFrame with `Speaker` as the index.
+    """
+    pd = lazy_import('pandas')
+    cols_dict = {   'speaker'   : 'Speaker',
+                    'date'      : 'Date',
+                    'reminder'  : 'Reminders',
+                    'send_email': 'Send_email',
+                    'title'     : 'Title'}
+    ajc_gs_pd = pd.DataFrame(records, columns=ajc_index.SCHEDULE_COLS)
+    ajc_gs_pd = ajc_gs_pd.rename(columns=cols_dict)
+    for col in ['Date', 'Reminders', 'Send_email']:
+        ajc_gs_pd[col] = pd.to_datetime(ajc_gs_pd[col])
+    ajc_gs_pd = ajc_gs_pd.astype({'paper_title': 'string', 'author': 'string',
+                    'year': 'Int64', 'arxiv_id': 'string'})
+    ajc_gs_pd = ajc_gs_pd.set_index('Speaker')
+
+    return ajc_gs_pd
+
+def schedule_diff(new_records, old_records):
+    """
+    Compares two versions of the schedule, row by row, using the
+    `row_hash` of each row. Rows are matched by (date, speaker).
 
+    Parameters
+    -----------
+    new_records, old_records: list
+        records from `schedule_records` or `ajc_index.ScheduleIndex.rows`
+
+    Returns
+    --------
+    diff_dict: dict
+        lists of (date, speaker) keys under `added`, `changed`, `removed`
+        and `unchanged`
+    """
+    old_dict = dict(((rec['date'], rec['speaker']), rec['row_hash'])
+                        for rec in old_records)
+    new_dict = dict(((rec['date'], rec['speaker']), rec['row_hash'])
+                        for rec in new_records)
+    diff_dict = {'added': [], 'changed': [], 'removed': [], 'unchanged': []}
+    for key, hash_ii in new_dict.items():
+        if key not in old_dict:
+            diff_dict['added'].append(key)
+        elif old_dict[key] != hash_ii:
+            diff_dict['changed'].append(key)
+        else:
+            diff_dict['unchanged'].append(key)
+    diff_dict['removed'] = [key for key in old_dict if key not in new_dict]
+
+    return diff_dict
+
+def schedule_refresh(now_dict, schedule_index):
+    """
+    Downloads the AJC schedule and the rosters, and updates
+    `schedule_index` if any of the pages changed since it was built.
+
+    It is skipped by `main` on days when `calendar_idle` finds that no
+    email can be due and the index is fresh. Otherwise, the cached pages are always revalidated
+    with a conditional request, so an unchanged schedule costs one `304`
+    per page, and neither `pandas` nor the rosters are loaded.
+
+    Only the rows that were added or changed since the last version go
+    through speaker resolution (`ajc_gs_merge`) and `ADS_Testing`. Every
+    row is resolved again if the rosters changed.
+
+    Parameters
+    -----------
     now_dict: python dictionary
         dictionary with `year`, `weekday`, `month`, `day` entries
+
+    schedule_index: `ajc_index.ScheduleIndex`
+        index of the AJC schedule
+
+    Returns
+    --------
+    updated: boolean
+        True if any row of the index was updated.
     """
+    ## URLs
+    ajc_url = ajc_url_creator(now_dict)
+    gs_url  = people_url_creator('graduate')
+    fac_url = people_url_creator('faculty')
+    # Downloading all pages at once
+    html_dict = fetch_pages([ajc_url, gs_url, fac_url], revalidate=True)
+    source_digest = ajc_cache.body_digest(''.join([html_dict[ajc_url],
+                        html_dict[gs_url], html_dict[fac_url]]))
+    roster_digest = ajc_cache.body_digest(''.join([html_dict[gs_url],
+                        html_dict[fac_url]]))
+    # Stale cached copies (server down or slow) do not validate the index
+    live = not any(url_ii in STALE_PAGES for url_ii in html_dict)
+    # Nothing changed
+    if source_digest == schedule_index.source_digest():
+        if live:
+            schedule_index.touch()
+        return False
+    ## Obtaining Tables
+    # AJC Table
+    ajc_pd = ajc_parser(ajc_url, ajc_html=html_dict[ajc_url])
+    ## Diffing against the index
+    new_records = schedule_records(ajc_pd)
+    old_records = schedule_index.rows()
+    diff_dict   = schedule_diff(new_records, old_records)
+    roster_changed = (roster_digest != schedule_index.roster_digest())
+    now = datetime.datetime.now()
+    sys.stderr.write('{0}\t Schedule changes: {1} added, {2} changed, {3} removed, {4} unchanged{5}\n'.format(
+        now.strftime("%x %a %X"), len(diff_dict['added']),
+        len(diff_dict['changed']), len(diff_dict['removed']),
+        len(diff_dict['unchanged']),
+        ' (rosters changed)' if roster_changed else ''))
+    for kind in ['added', 'changed', 'removed']:
+        for date_ii, speaker_ii in diff_dict[kind]:
+            sys.stderr.write('{0}\t     {1}: `{2}` ({3})\n'.format(
+                now.strftime("%x %a %X"), kind, speaker_ii, date_ii))
+    # Rows to resolve against the rosters
+    content_keys = set(diff_dict['added'] + diff_dict['changed'])
+    if roster_changed:
+        resolve_keys = set(content_keys).union(diff_dict['unchanged'])
+    else:
+        resolve_keys = content_keys
+    # No row changed. Only the digest is updated
+    if (len(resolve_keys) == 0) and (len(diff_dict['removed']) == 0):
+        schedule_index.touch(source_digest=source_digest, validated=live)
+        return False
+    ## Merging the rows to resolve with the rosters
+    resolve_mask = [(rec['date'], rec['speaker']) in resolve_keys
+                        for rec in new_records]
+    resolved_records = []
+    if any(resolve_mask):
+        ajc_gs_pd = ajc_gs_merge(ajc_pd.loc[resolve_mask],
+                        gs_html=html_dict[gs_url], fac_html=html_dict[fac_url])
+        resolved_records = schedule_records(ajc_gs_pd)
+    # Rows that did not change are kept from the index
+    # (the parsed title columns are taken from the new version, in case
+    # the index was built before they existed)
+    unchanged_keys = set(diff_dict['unchanged']).difference(resolve_keys)
+    new_dict = dict(((rec['date'], rec['speaker']), rec) for rec in new_records)
+    paper_cols = ['paper_title', 'author', 'year', 'arxiv_id']
+    kept_records = [dict(rec, **dict((col, new_dict[(rec['date'],
+                        rec['speaker'])][col]) for col in paper_cols))
+                        for rec in old_records
+                        if (rec['date'], rec['speaker']) in unchanged_keys]
+    records = sorted(kept_records + resolved_records,
+                    key=lambda rec: rec['date'] or '')
+    ## Updating index
+    schedule_index.refresh(records, source_digest, roster_digest=roster_digest,
+        validated=live)
+    ## Resolving upcoming papers of the new rows, so that the announcement
+    ## only reads the metadata cache
+    ads_records = [rec for rec in resolved_records
+                        if (rec['date'], rec['speaker']) in content_keys]
+    if ads_records:
+        ADS_Testing(schedule_frame(ads_records), now_dict)
+
+    return True
+
+#### ------------------------- Emails ---------------------- #####
+
+def catchup_window(now_dict, last_run=None):
+    """
+    Interval of dates whose emails are due on this run.
+
+    Parameters
+    ----------
+    now_dict: python dictionary
+        dictionary with `year`, `weekday`, `month`, `day` entries
+
+    last_run: string, optional
+        date (`YYYY-MM-DD`) of the last successful run. If `None`, only
+        today's emails are due.
+
+    Returns
+    --------
+    start_pd, today_pd: `pandas.Timestamp`
+        emails due in (`start_pd`, `today_pd`] are sent
+    """
+    pd = lazy_import('pandas')
     ## Today's Timestamp
     today_pd = pd.Timestamp('{0}/{1}/{2}'.format(now_dict['month'],
                                                  now_dict['day'],
                                                  now_dict['year']))
-    # Checking if today's date is in `ajc_gs_pd`
-    today_ajc_pd = ajc_gs_pd.loc[ajc_gs_pd['Reminders'] == today_pd]
-    # Checking if there is an 
-    if (today_ajc_pd.shape[0] == 1):
+    if last_run is None:
+        start_pd = today_pd - pd.Timedelta(1, 'D')
+    else:
+        start_pd = min(pd.Timestamp(last_run), today_pd)
+
+    return start_pd, today_pd
+
+def calendar_idle(now_dict, last_run=None):
+    """
+    Checks in `event_calendar` that no email can be due on this run,
+    without downloading the schedule or loading `pandas`.
+
+    Emails are due `REMINDER_DAY` and `PHYSAJC_DAY` days before an AJC
+    date, so nothing can be due if no day of the catch-up window (see
+    `catchup_window`) is that many days before an `AJC_EVENT` day.
+
+    Parameters
+    ----------
+    now_dict: python dictionary
+        dictionary with `year`, `weekday`, `month`, `day` entries
+
+    last_run: string, optional
+        date (`YYYY-MM-DD`) of the last successful run. If `None`, only
+        today is checked.
+
+    Returns
+    --------
+    idle: boolean
+        True if no email can be due. False if the calendar could not be
+        loaded.
+    """
+    calendar = event_calendar()
+    if calendar is None:
+        return False
+    today = datetime.date(int(now_dict['year']), int(now_dict['month']),
+                int(now_dict['day']))
+    if last_run is None:
+        start = today
+    else:
+        start = datetime.datetime.strptime(last_run, '%Y-%m-%d').date() + \
+                    datetime.timedelta(days=1)
+    for ii in range((today - start).days + 1):
+        day = start + datetime.timedelta(days=ii)
+        for offset in [REMINDER_DAY, PHYSAJC_DAY]:
+            ajc_day = day + datetime.timedelta(days=offset)
+            if AJC_EVENT in calendar.events_on(ajc_day):
+                return False
+
+    return True
+
+def due_interval(ajc_gs_pd, col_name, start_pd, end_pd):
+    """
+    Rows of `ajc_gs_pd` with `col_name` in (`start_pd`, `end_pd`], found
+    with a binary search over the sorted column.
+
+    Parameters
+    ----------
+    ajc_gs_pd: pandas DataFrame
+        merged DataFrame between `ajc_pd` and `gs_pd`
+
+    col_name: string
+        date column, e.g. `Reminders` or `Send_email`
+
+    start_pd, end_pd: `pandas.Timestamp`
+        bounds of the interval
+
+    Returns
+    --------
+    due_pd: pandas DataFrame
+        matching rows, sorted by `col_name`
+    """
+    np = lazy_import('numpy')
+    col_arr   = ajc_gs_pd[col_name].values.astype('datetime64[ns]')
+    # `NaT` is sorted last, so it is never inside of the interval
+    order_arr = np.argsort(col_arr, kind='stable')
+    bounds    = np.array([start_pd.to_datetime64(), end_pd.to_datetime64()],
+                    dtype='datetime64[ns]')
+    idx_start, idx_end = np.searchsorted(col_arr[order_arr], bounds,
+                            side='right')
+    due_pd = ajc_gs_pd.iloc[order_arr[idx_start:idx_end]]
+
+    return due_pd
+
+def send_email_reminder(ajc_gs_pd, now_dict, mailer=None, last_run=None):
+    """
+    Sends email reminders 2 days before AJC date to the specified student
+
+    Parameters
+    -----------
+    ajc_gs_pd: pandas DataFrame
+        merged DataFrame between `ajc_pd` and `gs_pd`
+        Keys: `email`, `Date`, `Reminders`.
+        Index is set to `firstname_lastname` of student.
+
+    now_dict: python dictionary
+        dictionary with `year`, `weekday`, `month`, `day` entries
+
+    mailer: `ajc_mail.Mailer`, `ajc_outbox.Outbox` or `NoneType`, optional
+        SMTP session or outbox shared with the other emails of the run.
+        If `None`, a session is opened and closed by this function.
+
+    last_run: string, optional
+        date (`YYYY-MM-DD`) of the last successful run. Every reminder due
+        since then is sent, unless its AJC date has passed. If `None`,
+        only today's reminders are sent.
+    """
+    if mailer is None:
+        with lazy_import('ajc_mail').Mailer(email_type='vandy') as mailer:
+            return send_email_reminder(ajc_gs_pd, now_dict, mailer=mailer,
+                        last_run=last_run)
+    pd = lazy_import('pandas')
+    ajc_templates = lazy_import('ajc_templates')
+    # Reminders due since the last run
+    start_pd, today_pd = catchup_window(now_dict, last_run)
+    today_ajc_pd = due_interval(ajc_gs_pd, 'Reminders', start_pd, today_pd)
+    # Skipping AJC dates that have already passed
+    passed = (today_ajc_pd['Date'] < today_pd).values
+    for speaker_ii, date_ii in zip(today_ajc_pd.index[passed],
+                                   today_ajc_pd['Date'][passed]):
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t Skipping `Reminder` email for `{1}`: AJC date ({2}) has passed\n'.format(
+            now.strftime("%x %a %X"), speaker_ii, date_ii.strftime('%Y-%m-%d')))
+    today_ajc_pd = today_ajc_pd.loc[~passed]
+    # Checking if there are reminders to send
+    if (today_ajc_pd.shape[0] == 0):
+        # No reminders for today
+        # Updating Log
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t No email reminders today!\n'.format(
+            now.strftime("%x %a %X")))
+        return
+    ## Sender - Logs in to the server on the first email
+    my_email = mailer.my_email
+    for ii in range(today_ajc_pd.shape[0]):
+        ## Student's Details
+        today_info_pd  = today_ajc_pd.iloc[ii]
+        today_date_str = today_info_pd['Date'].strftime('%Y-%m-%d')
         # If email belongs to a student / faculty at Vanderbilt
-        if (isinstance(today_ajc_pd['email'][0], str)) and ('vanderbilt.edu' in today_ajc_pd['email'][0]):
-            ## Student's Details
-            today_info_pd  = today_ajc_pd.iloc[0]
+        if (isinstance(today_info_pd['email'], str)) and ('vanderbilt.edu' in today_info_pd['email']):
             ## Email details
             to_email = today_info_pd['email']
-            ## Logging in to Server
-            smtpserver, my_email = email_init(email_type='vandy')
-            # Create message container - the correct MIME type is multipart/alternative.
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = 'Astronomy Journal Club'
-            msg['From'   ] = my_email
-            msg['To'     ] = to_email
-            msg.add_header('reply-to', my_email)
-            ## Writing Message - HTML
-            msg_html  = '<html>'
-            msg_html += '<head></head>'
-            msg_html += '<body>'
-            msg_html += '<p>'
-            msg_html += 'Hi {0},<br /><br />'.format(today_info_pd.first_name)
-            msg_html += 'Could you please send me the name and arXiv link to the '
-            msg_html += 'paper that you will be presenting at AJC by today at 8pm?'
-            msg_html += ' <br /><br />'
-            msg_html += 'Thanks!<br />'
-            msg_html += '-'*130 + '<br />'
-            msg_html += '{0}<br />'.format(os.environ.get('ajc_name'))
-            msg_html += "Email: <a href='mailto:{0}'>{0}</a><br />".format(os.environ.get('ajc_email'))
-            msg_html += "Website: <a href='{0}' target='_blank'>{0}</a><br />".format(os.environ.get('ajc_website'))
-            msg_html += "</p>"
-            msg_html += '</body>'
-            msg_html += '</html>'
-            ## Writing Message - Text
-            msg_html_2  = 'Hi {0},\r\n\r\n'.format(today_info_pd.first_name)
-            msg_html_2 += 'Could you please send me the name and arXiv link to the '
-            msg_html_2 += 'paper that you will be presenting at AJC by today at 8pm?\r\n\r\n'
-            msg_html_2 += 'Thanks!\r\n'
-            msg_html_2 += '-'*100 + '\r\n'
-            msg_html_2 += '{0}\r\n'.format(os.environ.get('ajc_name'))
-            msg_html_2 += "Email: {0}\r\n".format(os.environ.get('ajc_email'))
-            msg_html_2 += "Website: {0}\r\n".format(os.environ.get('ajc_website'))
-            ## Adding to `msg`
-            part1=MIMEText(msg_html  , 'html')
-            part2=MIMEText(msg_html_2, 'text')
-            msg.attach(part1)
-            msg.attach(part2)
-            # Sending email
-            smtpserver.sendmail(my_email, [to_email, my_email], msg.as_string())
-            smtpserver.quit()
-            ## Updating Log
-            now = datetime.datetime.now()
-            sys.stderr.write('{0}\t Successfully sent out `Reminder` email!\n'.format(
-                now.strftime("%x %a %X")))
+            ## Writing Message - HTML and Text
+            msg = ajc_templates.build_message('reminder',
+                {'first_name': today_info_pd.first_name}, my_email, to_email)
         else:
             # Speaker is not a Faculty / Graduate Student
-            ## Student's Details
-            today_info_pd  = today_ajc_pd.iloc[0]
             ## Email details
             to_email = os.environ.get('vandy_email')
-            ## Logging in to Server
-            smtpserver, my_email = email_init(email_type='vandy')
-            # Create message container - the correct MIME type is multipart/alternative.
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = 'Astronomy Journal Club - Speaker not Faculty / Grad Student'
-            msg['From'   ] = my_email
-            msg['To'     ] = to_email
-            msg.add_header('reply-to', my_email)
-            ## Writing Message - HTML
-            msg_html  = '<html>'
-            msg_html += '<head></head>'
-            msg_html += '<body>'
-            msg_html += '<p>'
-            msg_html += 'The speaker for `{0}` could not be found! <br /><br />'.format(today_info_pd.to_frame().columns[0])
-            msg_html += 'Please email them directly today to obtain their title before 8pm today!'
-            msg_html += ' <br /><br />'
-            msg_html += 'Thanks!<br />'
-            msg_html += '-'*130 + '<br />'
-            msg_html += "</p>"
-            msg_html += '</body>'
-            msg_html += '</html>'
-            ## Writing Message - Text
-            msg_html_2  = 'Hi {0},\r\n\r\n'.format(today_info_pd.first_name)
-            msg_html_2  = 'The speaker for `{0}` could not be found!\r\n\r\n'.format(today_info_pd.to_frame().columns[0])
-            msg_html_2 += 'Please email them directly today to obtain their title before 8pm today!\r\n\r\n'
-            msg_html_2 += 'Thanks!\r\n'
-            msg_html_2 += '-'*100 + '\r\n'
-            msg_html_2 += '{0} \r\n'.format(os.environ.get('ajc_name'))
-            msg_html_2 += "Email: {0}\r\n".format(os.environ.get('ajc_email'))
-            msg_html_2 += "Website: {0}\r\n".format(os.environ.get('ajc_website'))
-            ## Adding to `msg`
-            part1=MIMEText(msg_html  , 'html')
-            part2=MIMEText(msg_html_2, 'text')
-            msg.attach(part1)
-            msg.attach(part2)
-            # Sending email
-            smtpserver.sendmail(my_email, [to_email, my_email], msg.as_string())
-            smtpserver.quit()
-            ## Updating Log
+            ## Writing Message - HTML and Text
+            candidate = today_info_pd.get('candidate')
+            msg = ajc_templates.build_message('speaker_not_found',
+                {'speaker'  : today_info_pd.name,
+                 'candidate': None if pd.isnull(candidate) else candidate},
+                my_email, to_email)
+        # Sending email
+        sent = mailer.send(msg, [to_email, my_email],
+            dedupe=(today_info_pd.name, today_date_str, 'reminder'))
+        ## Updating Log. The outbox logs the emails it queues
+        if sent and (not mailer.queues):
             now = datetime.datetime.now()
-            sys.stderr.write('{0}\t Successfully sent out `Reminder` email!\n'.format(
-                now.strftime("%x %a %X")))
-    else:
-        # No reminders for today
-        # Updating Log
-        now = datetime.datetime.now()
-        sys.stderr.write('{0}\t No email reminders today!\n'.format(
-            now.strftime("%x %a %X")))
+            sys.stderr.write('{0}\t Successfully sent out `Reminder` email for `{1}` ({2})!\n'.format(
+                now.strftime("%x %a %X"), today_info_pd.name, today_date_str))
 
-def send_email_PHYS_AJC(ajc_gs_pd, now_dict):
+def send_email_PHYS_AJC(ajc_gs_pd, now_dict, mailer=None, last_run=None):
     """
     Sends email to the `PHYS_ASTRO` mailing list
 
@@ -404,50 +955,63 @@ def send_email_PHYS_AJC(ajc_gs_pd, now_dict):
     now_dict: python dictionary
         dictionary with `year`, `weekday`, `month`, `day` entries
 
+    mailer: `ajc_mail.Mailer`, `ajc_outbox.Outbox` or `NoneType`, optional
+        SMTP session or outbox shared with the other emails of the run.
+        If `None`, a session is opened and closed by this function.
+
+    last_run: string, optional
+        date (`YYYY-MM-DD`) of the last successful run. Every announcement
+        due since then is sent, unless its AJC date has passed. If `None`,
+        only today's announcements are sent.
+
     Warnings
     ---------
     Note: The `username` and `passwords` are hardcoded into the script.
 
     To Do: Make these variables `Environment Variables`
     """
-    ## Today's Timestamp
-    today_pd = pd.Timestamp('{0}/{1}/{2}'.format(now_dict['month'],
-                                                 now_dict['day'],
-                                                 now_dict['year']))
-    # Checking if today's date is in `ajc_gs_pd`
-    today_ajc_pd = ajc_gs_pd.loc[ajc_gs_pd['Send_email']==today_pd]
+    if mailer is None:
+        with lazy_import('ajc_mail').Mailer(email_type='vandy') as mailer:
+            return send_email_PHYS_AJC(ajc_gs_pd, now_dict, mailer=mailer,
+                        last_run=last_run)
+    pd = lazy_import('pandas')
+    ajc_templates = lazy_import('ajc_templates')
+    # Announcements due since the last run
+    start_pd, today_pd = catchup_window(now_dict, last_run)
+    today_ajc_pd = due_interval(ajc_gs_pd, 'Send_email', start_pd, today_pd)
+    # Skipping AJC dates that have already passed
+    passed = (today_ajc_pd['Date'] < today_pd).values
+    for speaker_ii, date_ii in zip(today_ajc_pd.index[passed],
+                                   today_ajc_pd['Date'][passed]):
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t Skipping `PHYS_AJC` email for `{1}`: AJC date ({2}) has passed\n'.format(
+            now.strftime("%x %a %X"), speaker_ii, date_ii.strftime('%Y-%m-%d')))
+    today_ajc_pd = today_ajc_pd.loc[~passed]
     # AJC Location
     ajc_zoom_url = "https://vanderbilt.zoom.us/j/970017245"
     # Checking if value exists:
-    if today_ajc_pd.shape[0] == 1:
-        ## Logging in to Server
-        smtpserver, my_email = email_init(email_type='vandy')
-        to_email = 'PHYS_AJC@LIST.VANDERBILT.EDU'
-        # Create message container - the correct MIME type is multipart/alternative.
-        msg = MIMEMultipart('alternative')
-        msg['Subject'] = 'Astronomy Journal Club'
-        msg['From'   ] = my_email
-        msg['To'     ] = to_email
-        msg.add_header('reply-to', my_email)
-        # Sending email
-        today_info_pd   = today_ajc_pd.iloc[0]
-        ##
-        try:
-            title, author   = today_info_pd['Title'].split('by')
-            title           = title.strip().replace('“',"").replace('”',"")
-            author, year_id = author.strip().split(' et al. ')
-            year, arxiv_id  = year_id.split(" ")
-            year            = int(year.replace('(','').replace(')',''))
-            arxiv_id        = arxiv_id.replace('[','').replace(']','')
-            ## ADS Query
-            ads_link, ads_link_match = ADS_Query(author, year, arxiv_id)
-        except AttributeError:
-            title = ""
-            author = ""
-            year = ""
-            arxiv_id = ""
-            ads_link = ""
-            ads_link_match = 0
+    if today_ajc_pd.shape[0] == 0:
+        ## Updating Log
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t No posts for `PHYS_AJC` today!\n'.format(
+            now.strftime("%x %a %X")))
+        return
+    ## Sender - Logs in to the server on the first email
+    my_email = mailer.my_email
+    to_email = 'PHYS_AJC@LIST.VANDERBILT.EDU'
+    for ii in range(today_ajc_pd.shape[0]):
+        today_info_pd   = today_ajc_pd.iloc[ii]
+        ## Paper - Parsed by `ajc_parser`
+        title, author, year, arxiv_id = [('' if pd.isnull(today_info_pd[col])
+                    else today_info_pd[col]) for col in ['paper_title',
+                    'author', 'year', 'arxiv_id']]
+        ## ADS Query - Prefetched by `ADS_Testing`
+        ads_link, ads_link_match = '', 0
+        if author and year:
+            try:
+                ads_link, ads_link_match = ADS_Query(author, int(year), arxiv_id)
+            except (AttributeError, ValueError):
+                pass
         # Date
         today_datetime = datetime.datetime.date(today_info_pd['Date'])
         today_month    = today_datetime.strftime("%B")
@@ -458,71 +1022,215 @@ def send_email_PHYS_AJC(ajc_gs_pd, now_dict):
                                                       today_month,
                                                       today_date,
                                                       today_year)
-        ## Composing message
-        msg_html  = '<html>'
-        msg_html += '<head></head>'
-        msg_html += '<body>'
-        msg_html += '<p>'
-        msg_html += 'Hello AJCers,<br/><br/>'
-        msg_html += "This week's AJC will be: <br /><br />"
-        msg_html += 'Title            : "{0}"<br />'.format(title)
-        msg_html += 'Author  : {0} et al. ({1})<br />'.format(author, year)
-        if ads_link_match == 1:
-            msg_html += 'Link    : {0}<br/>'.format(ads_link)
-        msg_html += 'Speaker : {0} {1}<br />'.format( today_info_pd['first_name'],
-                                            today_info_pd['last_name'])
-        msg_html += 'Time    : {0} @ 12pm<br />'.format(today_date_str)
-        # msg_html += 'Location: SC 6333<br /><br />'
-        msg_html += "Location: <a href='{0}'>{0}</a><br />".format(ajc_zoom_url)
-        msg_html += 'See you all there!<br /><br />'
-        msg_html += 'Thanks!<br />'
-        msg_html += '-'*130 + '<br />'
-        msg_html += '{0}<br />'.format(os.environ.get('ajc_name'))
-        msg_html += "Email: <a href='mailto:{0}'>{0}</a><br />".format(os.environ.get('ajc_email'))
-        msg_html += "Website: <a href='{0}' target='_blank'>{0}</a><br />".format(os.environ.get('ajc_website'))
-        msg_html += "</p>"
-        msg_html += '</body>'
-        msg_html += '</html>'
-        ## Msg - Text
-        # msg_html_2  = 'Hello AJCers (Text),\r\n\r\n'
-        # msg_html_2 += "This week's AJC will be:\r\n\r\n"
-        # if ads_link_match == 1:
-        #     msg_html_2 += 'Title   : "{0}"\r\n'.format(title)
-        #     msg_html_2 += 'Author  : {0} et al. ({1})\r\n'.format(author, year)
-        #     msg_html_2 += 'Link    : {0}\r\n'.format(ads_link)
-        # msg_html_2 += 'Speaker : {0} {1}\r\n'.format(today_info_pd['first_name'],
-        #                                      today_info_pd['last_name'])
-        # msg_html_2 += 'Time    : {0} @ 12pm\r\n'.format(today_date_str)
-        # msg_html_2 += 'Location: SC 6333\r\n\r\n'
-        # msg_html_2 += 'See you all there!\r\n\r\n'
-        # msg_html_2 += 'Thanks!\r\n'
-        # msg_html_2 += '-'*100 + '\r\n'
-        # msg_html_2 += 'Victor Calderon Arrivillaga\r\n'
-        # msg_html_2 += 'Ph.D. Candidate in Physics\r\n'
-        # msg_html_2 += "Email: victor.calderon@vanderbilt.edu\r\n"
-        # msg_html_2 += "Website: http://vcalderon.me\r\n"
-        ## Adding to `msg`
-        part1=MIMEText(msg_html  , 'html')
-        # part2=MIMEText(msg_html_2, 'text')
-        msg.attach(part1)
-        # msg.attach(part2)
+        ## Composing message - HTML and Text
+        msg_context = { 'title'     : title,
+                        'author'    : author,
+                        'year'      : year,
+                        'link'      : ads_link if ads_link_match == 1 else '',
+                        'first_name': today_info_pd['first_name'],
+                        'last_name' : today_info_pd['last_name'],
+                        'date_str'  : today_date_str,
+                        'location'  : ajc_zoom_url}
+        msg = ajc_templates.build_message('announcement', msg_context,
+                my_email, to_email)
         # Sending email
-        smtpserver.sendmail(my_email, [to_email, my_email], msg.as_string())
-        smtpserver.quit()
-        ## Updating Log
-        now = datetime.datetime.now()
-        sys.stderr.write('{0}\t Successfully sent out `PHYS_AJC` email!\n'.format(
-            now.strftime("%x %a %X")))
-    else:
-        ## Updating Log
-        now = datetime.datetime.now()
-        sys.stderr.write('{0}\t No posts for `PHYS_AJC` today!\n'.format(
-            now.strftime("%x %a %X")))
+        sent = mailer.send(msg, [to_email, my_email],
+            dedupe=(today_info_pd.name, today_datetime.strftime('%Y-%m-%d'),
+                    'announcement'))
+        ## Updating Log. The outbox logs the emails it queues
+        if sent and (not mailer.queues):
+            now = datetime.datetime.now()
+            sys.stderr.write('{0}\t Successfully sent out `PHYS_AJC` email for `{1}` ({2})!\n'.format(
+                now.strftime("%x %a %X"), today_info_pd.name,
+                today_datetime.strftime('%Y-%m-%d')))
+
+def send_email_roster(roster, template_name='signup', context=None,
+    pool=None, results_path=None):
+    """
+    Sends one personalized email to every person in `roster`, over a
+    small pool of SMTP sessions working in parallel.
+
+    Parameters
+    -----------
+    roster: `ajc_roster.Roster` or pandas DataFrame
+        people to write to, e.g. from `roster_load`. A DataFrame from
+        `people_info_extractor` is converted to a roster first.
+
+    template_name: string, optional (default = 'signup')
+        name of the template in `ajc_templates.TEMPLATES`
+
+    context: dict, optional
+        values shared by every message. Each message also gets the
+        `email`, `first_name`, `last_name` and `full_name` of its person.
+
+    pool: `ajc_mail.MailerPool`, optional
+        pool of SMTP sessions. By default, `ajc_mail.MailerPool()`, i.e.
+        `ajc_smtp_pool_size` sessions capped at `ajc_smtp_rate` messages
+        per second.
+
+    results_path: string, optional
+        path to the JSON file with the result of every message.
+        By default, `AJC_CACHE_DIR/roster/<template_name>_<timestamp>.json`.
+
+    Returns
+    --------
+    results_list: list
+        result of every message, as dictionaries with `full_name`,
+        `email`, `status` (`sent`, `refused`, `error` or `skipped`),
+        `error` and `latency` keys.
+    """
+    json = lazy_import('json')
+    ajc_mail = lazy_import('ajc_mail')
+    ajc_roster = lazy_import('ajc_roster')
+    ajc_templates = lazy_import('ajc_templates')
+    if not isinstance(roster, ajc_roster.Roster):
+        roster = ajc_roster.Roster.from_records(
+                    roster.reset_index().to_dict('records'))
+    pool = ajc_mail.MailerPool() if pool is None else pool
+    my_email = os.environ.get('ajc_email')
+    template = ajc_templates.get_template(template_name)
+    ## Rendering messages. People without a Vanderbilt email are skipped
+    results_list = []
+    message_list = []
+    for person in roster:
+        result = {  'full_name': person.full_name,
+                    'email'    : person.email,
+                    'status'   : 'skipped',
+                    'error'    : None,
+                    'latency'  : None}
+        results_list.append(result)
+        if not (isinstance(person.email, str) and ('vanderbilt.edu' in person.email)):
+            result['error'] = 'Not a Vanderbilt email'
+            continue
+        msg_context = dict(context or {}, email=person.email,
+                        first_name=person.first_name,
+                        last_name=person.last_name, full_name=person.full_name)
+        msg = template.message(msg_context, my_email, person.email)
+        message_list.append((result, msg, [person.email]))
+    ## Sending messages
+    start = time.time()
+    sent_list = pool.send_many([(msg, to_list) for (result, msg, to_list)
+                                    in message_list])
+    for (result, msg, to_list), sent in zip(message_list, sent_list):
+        result.update(status=sent['status'], error=sent['error'],
+            latency=sent['latency'])
+    ## Recording results
+    if results_path is None:
+        results_path = ajc_cache.cache_path('roster', '{0}_{1}.json'.format(
+            template_name, datetime.datetime.now().strftime('%Y%m%d_%H%M%S')))
+    if not os.path.isdir(os.path.dirname(results_path)):
+        os.makedirs(os.path.dirname(results_path))
+    ajc_cache.atomic_write(results_path,
+        json.dumps(results_list, indent=1).encode('utf-8'))
+    ## Updating Log
+    n_status = {}
+    for result in results_list:
+        n_status[result['status']] = n_status.get(result['status'], 0) + 1
+    now = datetime.datetime.now()
+    sys.stderr.write('{0}\t Sent {1} of {2} `{3}` emails in {4:.1f} s '
+        '({5} failed, {6} skipped). Results in `{7}`\n'.format(
+        now.strftime("%x %a %X"), n_status.get('sent', 0), len(results_list),
+        template_name, time.time() - start,
+        n_status.get('refused', 0) + n_status.get('error', 0),
+        n_status.get('skipped', 0), results_path))
+
+    return results_list
+
+def title_parser(title_str):
+    """
+    Parses the `Title` cell of the AJC schedule with `TITLE_RE`.
+
+    The cell is expected to look like
+    `"Title" by Author et al. (Year) [arXiv ID]`. The arXiv ID is
+    optional. Cells in any other format fall back to `TITLE_FALLBACK_RE`,
+    which only keeps the title and arXiv ID. See `title_frame` to parse a
+    whole column at once.
+
+    Parameters
+    ----------
+    title_str : `str`
+        `Title` cell of the AJC schedule.
+
+    Returns
+    -------
+    title, author : `str`
+        Title and first author of the paper. `author` is an empty string
+        if the cell does not follow the format above.
+
+    year : `int` or `NoneType`
+        Year of the paper, or `None` if the cell does not follow the
+        format above.
+
+    arxiv_id : `str`
+        ArXiv ID of the paper, or an empty string.
 
-def ADS_Query(author, year, arxiv_id):
+    Raises
+    ------
+    ValueError
+        If `title_str` is missing or empty.
+    """
+    title_str   = title_str if isinstance(title_str, str) else ''
+    title_match = TITLE_RE.match(title_str)
+    if title_match is None:
+        title_match = TITLE_FALLBACK_RE.match(title_str)
+        if title_match is None:
+            msg = '>> `title_str` ({0}) could not be parsed!'.format(title_str)
+            raise ValueError(msg)
+        return (title_match.group('title').strip(TITLE_QUOTES), '', None,
+                title_match.group('arxiv_id') or '')
+    title    = title_match.group('title').strip(TITLE_QUOTES)
+    author   = title_match.group('author').strip(AUTHOR_STRIP)
+    year     = int(title_match.group('year'))
+    arxiv_id = title_match.group('arxiv_id') or ''
+
+    return title, author, year, arxiv_id
+
+def title_frame(title_series):
+    """
+    Parses a whole `Title` column of the AJC schedule with `TITLE_RE`,
+    and `TITLE_FALLBACK_RE` for the cells that do not match it. See
+    `title_parser`.
+
+    Parameters
+    ----------
+    title_series : `pandas.Series`
+        `Title` column of the AJC schedule.
+
+    Returns
+    -------
+    paper_pd : `pandas.DataFrame`
+        DataFrame with the same index as `title_series` and the
+        `paper_title`, `author` (strings), `year` (`Int64`) and `arxiv_id`
+        (string) columns. Cells that could not be parsed are missing.
+    """
+    pd = lazy_import('pandas')
+    title_series = title_series.astype('string')
+    paper_pd = title_series.str.extract(TITLE_RE)
+    # Title and arXiv ID of the cells in another format
+    fallback = paper_pd['title'].isna() & title_series.notna()
+    if fallback.any():
+        fallback_pd = title_series[fallback].str.extract(TITLE_FALLBACK_RE)
+        paper_pd.loc[fallback, 'title']    = fallback_pd['title']
+        paper_pd.loc[fallback, 'arxiv_id'] = fallback_pd['arxiv_id']
+    paper_pd = paper_pd.rename(columns={'title': 'paper_title'})
+    paper_pd['paper_title'] = paper_pd['paper_title'].str.strip(TITLE_QUOTES)
+    paper_pd['author']      = paper_pd['author'].str.strip(AUTHOR_STRIP)
+    paper_pd['year']        = pd.to_numeric(paper_pd['year']).astype('Int64')
+    paper_pd = paper_pd.astype({'paper_title': 'string', 'author': 'string',
+                    'arxiv_id': 'string'})
+
+    return paper_pd
+
+def ADS_Query(author, year, arxiv_id, use_cache=True,
+    hedge_delay=ADS_HEDGE_DELAY, deadline=ADS_DEADLINE):
     """
     Function that performs an ADS query on the `title` for the AJC topic.
 
+    Results are stored in `metadata_cache`, keyed by arXiv ID, so that a
+    paper is only resolved once. Papers that could not be found are cached
+    as misses. Titles without an arXiv ID are not looked up, and get no
+    link.
+
     Parameters
     ----------
     author : `str`
@@ -534,65 +1242,456 @@ def ADS_Query(author, year, arxiv_id):
     arxiv_id : `int`
         ArXiv ID of the paper to be looked at.
 
+    use_cache : `bool`, optional
+        If False, the cache is neither read nor updated. This variable is
+        set to `True` by default.
+
+    hedge_delay, deadline : `float`, optional
+        Hedge delay and overall deadline (in seconds) of the lookup.
+        See `ADS_hedged_lookup`.
+
+    Returns
+    -------
+    paper_link : `str`
+        Link to the paper on ADS or arXiv.
+
+    paper_link_match : `int`
+        1 if the paper was found, and 0 otherwise.
+    """
+    # Without an arXiv ID there is nothing to link to
+    if arxiv_id == '':
+        return '', 0
+    ## Cached paper
+    cache_key = ajc_metadata.arxiv_key(arxiv_id)
+    if use_cache:
+        paper_dict = metadata_cache().get(cache_key)
+        if paper_dict is not None:
+            return paper_dict['link'], int(paper_dict['found'])
+    ## Resolving paper on ADS / arXiv
+    paper_dict, paper_miss = ADS_hedged_lookup(author, year, arxiv_id,
+                                hedge_delay=hedge_delay, deadline=deadline)
+    if paper_dict is None:
+        # Only definitive misses are cached, not errors or timeouts
+        if use_cache and paper_miss:
+            metadata_cache().put_miss([cache_key])
+        return '', 0
+    paper_link = paper_dict['link']
+    ## Checking if URL exists
+    try:
+        # url_checker(paper_link)
+        paper_link_match = 1
+    except:
+        paper_link_match = 0
+    ## Saving to cache
+    if use_cache:
+        metadata_cache().put([cache_key], link=paper_link,
+            title=paper_dict['title'], authors=paper_dict['authors'])
+
+    return paper_link, paper_link_match
+
+def ADS_lookup(author, year, arxiv_id):
+    """
+    Looks up a single paper on ADS.
+
+    Parameters
+    ----------
+    author, year, arxiv_id : `str`
+        First author, year and arXiv ID of the paper.
+
     Returns
     -------
-    paper_dict: `dict`
-        Dictionary with the information about the AJC paper.
+    paper_dict : `dict` or `NoneType`
+        Dictionary with `link`, `title` and `authors`, or `None` if ADS
+        did not return exactly one paper.
     """
+    np = lazy_import('numpy')
+    ads = lazy_import('ads')
     # Token form 'https://ui.adsabs.harvard.edu/#user/settings/token'
     ADS_token = os.environ.get('ads_token')
     # Configuring Token
     ads.config.token = ADS_token
     # Searching for Paper
-    try:
-        papers = list(ads.SearchQuery(arXiv=arxiv_id, first_author=author, year=year,
-                    fl=['title','author','year','doi','identifier',
-                        'first_author']))
-        ## Which platform to use
-        ads_opt = True
-    except:
-        ads_opt = False
-        papers  = []
+    papers = list(ads.SearchQuery(arXiv=arxiv_id, first_author=author, year=year,
+                fl=['title','author','year','doi','identifier',
+                    'first_author']))
+    if len(papers) != 1:
+        return None
+    paper = papers[0]
+    # Adding link
+    arXiv_identifier = np.unique([s for s in paper.identifier if 'arXiv' in s])
+    paper_dict = {  'link'   : 'http://adsabs.harvard.edu/abs/' + arXiv_identifier[0],
+                    'title'  : (paper.title or [''])[0],
+                    'authors': list(paper.author or [])}
+
+    return paper_dict
+
+def arXiv_lookup(arxiv_id):
+    """
+    Looks up a single paper on arXiv.
+
+    Parameters
+    ----------
+    arxiv_id : `str`
+        ArXiv ID of the paper.
+
+    Returns
+    -------
+    paper_dict : `dict` or `NoneType`
+        Dictionary with `link`, `title` and `authors`, or `None` if arXiv
+        did not return the paper.
+    """
+    arxiv = lazy_import('arxiv')
+    papers = arxiv.query(id_list=[arxiv_id])
+    if len(papers) == 0:
+        return None
+    paper = papers[0]
+    paper_dict = {  'link'   : paper['arxiv_url'],
+                    'title'  : paper.get('title', ''),
+                    'authors': list(paper.get('authors', []))}
+
+    return paper_dict
+
+def ADS_hedged_lookup(author, year, arxiv_id, hedge_delay=ADS_HEDGE_DELAY,
+    deadline=ADS_DEADLINE):
+    """
+    Looks up a paper on ADS, hedging with arXiv.
+
+    ADS is queried first. If it has not answered after `hedge_delay`
+    seconds, or fails, arXiv is queried as well, and the first good answer
+    is kept. Lookups still running when an answer is found, or when
+    `deadline` expires, are abandoned and their result is discarded.
+    The latency and wins of each backend are recorded with
+    `MetadataCache.record_lookup`.
+
+    Parameters
+    ----------
+    author, year, arxiv_id : `str`
+        First author, year and arXiv ID of the paper.
+
+    hedge_delay : `float` or `NoneType`, optional
+        Seconds to wait for ADS before querying arXiv. If `None`, arXiv is
+        only queried after ADS fails. This variable is set to
+        `ADS_HEDGE_DELAY` by default.
+
+    deadline : `float`, optional
+        Maximum number of seconds for the whole lookup. This variable is
+        set to `ADS_DEADLINE` by default.
+
+    Returns
+    -------
+    paper_dict : `dict` or `NoneType`
+        Dictionary with `link`, `title` and `authors`, or `None`.
+
+    paper_miss : `bool`
+        True if every backend answered without finding the paper.
+    """
+    threading = lazy_import('threading')
+    queue = lazy_import('queue')
+    backends = {'ads'  : lambda: ADS_lookup(author, year, arxiv_id),
+                'arxiv': lambda: arXiv_lookup(arxiv_id)}
+    results = queue.Queue()
+    def run_backend(backend):
+        start_ii = time.perf_counter()
+        try:
+            paper_ii, error_ii = backends[backend](), None
+        except Exception as err:
+            paper_ii, error_ii = None, err
+        results.put((backend, paper_ii, error_ii,
+            time.perf_counter() - start_ii))
+    def launch(backend):
+        thread = threading.Thread(target=run_backend, args=(backend,))
+        # Abandoned lookups must not keep the run alive
+        thread.daemon = True
+        thread.start()
+        launched.append(backend)
     ##
-    ## Getting paper info
-    if arxiv_id != '':
-        if ads_opt and (len(papers) == 1):
-            paper = papers[0]
-            # Adding link
-            arXiv_identifier = np.unique([s for s in paper.identifier if 'arXiv' in s])
-            paper_link = 'http://adsabs.harvard.edu/abs/' + arXiv_identifier[0]
+    start    = time.perf_counter()
+    hedge_at = start + (deadline if hedge_delay is None else hedge_delay)
+    stop_at  = start + deadline
+    launched = []
+    answered = []
+    misses   = 0
+    paper_dict = None
+    launch('ads')
+    while len(answered) < len(backends):
+        now = time.perf_counter()
+        if now >= stop_at:
+            break
+        if 'arxiv' not in launched:
+            if now >= hedge_at:
+                launch('arxiv')
+                continue
+            timeout = min(hedge_at, stop_at) - now
+        elif len(answered) < len(launched):
+            timeout = stop_at - now
         else:
-            ## Using arxiv API instead
-            papers = arxiv.query(id_list=[arxiv_id])
-            paper  = papers[0]
-            paper_link = paper['arxiv_url']
-        ## Checking if URL exists
+            break
         try:
-            # url_checker(paper_link)
-            paper_link_match = 1
-        except:
-            paper_link_match = 0
-    else:
-        paper_link_match = 0
-        paper_link       = ''
+            backend, paper_ii, error_ii, latency = results.get(timeout=timeout)
+        except queue.Empty:
+            continue
+        answered.append(backend)
+        won = (paper_ii is not None) and (paper_dict is None)
+        metadata_cache().record_lookup(backend, latency, won=won,
+            error=(error_ii is not None))
+        if won:
+            paper_dict = paper_ii
+            break
+        if error_ii is None:
+            misses += 1
+        # ADS failed before the hedge delay: querying arXiv right away
+        if 'arxiv' not in launched:
+            launch('arxiv')
+    ## Abandoned lookups
+    for backend in launched:
+        if backend not in answered:
+            metadata_cache().record_lookup(backend, None, won=False,
+                error=False)
+    if (paper_dict is None) and (len(answered) < len(backends)):
+        now = datetime.datetime.now()
+        sys.stderr.write('{0}\t ADS / arXiv lookup for `{1}` exceeded {2} seconds\n'.format(
+            now.strftime("%x %a %X"), arxiv_id, deadline))
+    paper_miss = (paper_dict is None) and (misses == len(backends))
 
-    return paper_link, paper_link_match
+    return paper_dict, paper_miss
 
-def url_checker(url_str):
+def metadata_cache():
     """
-    Checks if the `url_str` is a valid URL
+    Returns the persistent cache of paper metadata used by `ADS_Query`.
+
+    Returns
+    --------
+    _metadata_cache: `ajc_metadata.MetadataCache`
+        paper metadata cache
+    """
+    global _metadata_cache
+    if _metadata_cache is None:
+        _metadata_cache = ajc_metadata.MetadataCache()
+
+    return _metadata_cache
+
+def http_session():
+    """
+    Returns the `requests.Session` shared by all page requests.
+
+    The session keeps connections to the same host alive, so consecutive
+    requests to `as.vanderbilt.edu` reuse one TCP/TLS connection.
+
+    Returns
+    --------
+    _http_session: `requests.Session`
+        pooled HTTP session
+    """
+    requests = lazy_import('requests')
+    HTTPAdapter = lazy_import('requests.adapters').HTTPAdapter
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                              pool_maxsize=HTTP_POOL_SIZE)
+        _http_session.mount('https://', adapter)
+        _http_session.mount('http://', adapter)
+
+    return _http_session
+
+def http_cache():
+    """
+    Returns the on-disk response cache shared by all page requests.
+
+    Returns
+    --------
+    _http_cache: `ajc_cache.HTTPCache`
+        persistent response cache
+    """
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = ajc_cache.HTTPCache()
+
+    return _http_cache
+
+def url_fetch(url_str, timeout=HTTP_TIMEOUT, use_cache=True,
+    budget=HTTP_BUDGET, revalidate=False):
+    """
+    Downloads `url_str` once, checking that the request was successful.
+
+    Responses are kept in `http_cache`. Entries younger than the cache TTL
+    are served without contacting the server, and older ones are
+    revalidated with `If-None-Match` / `If-Modified-Since`, so that an
+    unchanged page is answered with `304` and read from disk.
+
+    If the page is cached, but the server fails or does not answer within
+    `budget` seconds, the cached copy is served instead (stale-while-
+    revalidate). The download keeps going in the background and updates
+    the cache when it finishes. The staleness of the copy is recorded in
+    `STALE_PAGES`, and an alert is logged when it exceeds `STALE_ALERT`.
 
     Parameters
     ----------
     url_str: string
-        url of the website to probe
+        url of the website to download
+
+    timeout: tuple, optional (default = `HTTP_TIMEOUT`)
+        (connect, read) timeouts, in seconds
+
+    use_cache: boolean, optional (default = True)
+        if False, the page is always downloaded and not stored.
+
+    budget: float, optional (default = `HTTP_BUDGET`)
+        seconds to wait for the server before serving a cached copy
+
+    revalidate: boolean, optional (default = False)
+        if True, the cached copy is revalidated with the server even if it
+        is younger than the cache TTL.
+
+    Returns
+    --------
+    url_html: string
+        body of the response
     """
-    request = requests.get(url_str)
+    cache = http_cache() if use_cache else None
+    entry = cache.lookup(url_str) if use_cache else None
+    # Fresh copy on disk
+    if (entry is not None) and (not revalidate) and cache.is_fresh(entry):
+        return cache.read_body(url_str)
+    # Nothing to fall back on
+    if entry is None:
+        return url_download(url_str, entry, timeout=timeout,
+                    use_cache=use_cache)
+    ## Revalidating in the background, within `budget`
+    threading = lazy_import('threading')
+    queue = lazy_import('queue')
+    results = queue.Queue()
+    def run_download():
+        try:
+            url_html, error = url_download(url_str, entry, timeout=timeout), None
+        except Exception as err:
+            url_html, error = None, err
+        results.put((url_html, error))
+    thread = threading.Thread(target=run_download)
+    thread.start()
+    try:
+        url_html, error = results.get(timeout=budget)
+    except queue.Empty:
+        url_html, error = None, 'no answer after {0} seconds'.format(budget)
+    if error is None:
+        return url_html
+    ## Serving the cached copy
+    staleness = cache.age(entry)
+    STALE_PAGES[url_str] = staleness
+    now = datetime.datetime.now()
+    sys.stderr.write('{0}\t Serving cached copy of `{1}` ({2:.1f} hours old): {3}\n'.format(
+        now.strftime("%x %a %X"), url_str, staleness / 3600., error))
+    if staleness > STALE_ALERT:
+        sys.stderr.write('{0}\t ALERT: `{1}` could not be refreshed for {2:.1f} hours!\n'.format(
+            now.strftime("%x %a %X"), url_str, staleness / 3600.))
+
+    return cache.read_body(url_str)
+
+def url_download(url_str, entry=None, timeout=HTTP_TIMEOUT, use_cache=True):
+    """
+    Requests `url_str` from the server, revalidating the cached `entry`
+    if there is one. See `url_fetch`.
+
+    Parameters
+    ----------
+    url_str: string
+        url of the website to download
+
+    entry: dict or NoneType, optional
+        metadata of the cached copy, from `ajc_cache.HTTPCache.lookup`
+
+    timeout: tuple, optional (default = `HTTP_TIMEOUT`)
+        (connect, read) timeouts, in seconds
+
+    use_cache: boolean, optional (default = True)
+        if False, the response is not stored.
+
+    Returns
+    --------
+    url_html: string
+        body of the response
+    """
+    requests = lazy_import('requests')
+    cache = http_cache() if use_cache else None
+    headers = cache.validators(entry) if use_cache else {}
+    try:
+        request = http_session().get(url_str, timeout=timeout,
+                    headers=headers)
+    except requests.exceptions.Timeout:
+        msg = '`url_str` ({0}) timed out after {1} seconds'.format(url_str,
+                timeout)
+        raise ValueError(msg)
+    # Page has not changed
+    if (request.status_code == 304) and (entry is not None):
+        cache.touch(url_str)
+        STALE_PAGES.pop(url_str, None)
+        return cache.read_body(url_str)
     if request.status_code != 200:
         msg = '`url_str` ({0}) does not exist'.format(url_str)
         raise ValueError(msg)
-    else:
-        pass
+    url_html = request.text
+    # Saving response
+    if use_cache:
+        cache.store(url_str, request.content,
+            etag=request.headers.get('ETag'),
+            last_modified=request.headers.get('Last-Modified'),
+            encoding=request.encoding or request.apparent_encoding)
+    STALE_PAGES.pop(url_str, None)
+
+    return url_html
+
+def fetch_pages(url_list, max_workers=HTTP_MAX_WORKERS, revalidate=False):
+    """
+    Downloads the pages in `url_list` concurrently with `url_fetch`.
+
+    Parameters
+    ----------
+    url_list: list
+        URLs to download
+
+    max_workers: int, optional (default = `HTTP_MAX_WORKERS`)
+        maximum number of requests running at the same time
+
+    revalidate: boolean, optional (default = False)
+        if True, cached pages are always revalidated with the server.
+        See `url_fetch`.
+
+    Returns
+    --------
+    html_dict: dict
+        body of each page, keyed by URL. Any exception raised while
+        downloading a page is re-raised here.
+    """
+    ThreadPoolExecutor = lazy_import('concurrent.futures').ThreadPoolExecutor
+    max_workers = max(1, min(max_workers, len(url_list)))
+    # Creating the shared session before starting the threads
+    http_session()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(url_fetch, url_ii, revalidate=revalidate)
+                    for url_ii in url_list]
+        html_dict = {url_ii: future_ii.result()
+                        for url_ii, future_ii in zip(url_list, futures)}
+
+    return html_dict
+
+def url_checker(url_str):
+    """
+    Checks if the `url_str` is a valid URL
+
+    Parameters
+    ----------
+    url_str: string
+        url of the website to probe
+
+    Returns
+    --------
+    url_html: string
+        body of the response, so that it does not need to be downloaded
+        a second time.
+    """
+    url_html = url_fetch(url_str)
+
+    return url_html
 
 def email_init(email_type='vandy'):
     """
@@ -609,28 +1708,30 @@ def email_init(email_type='vandy'):
     --------
     smtpserver: `smtplib` object
         email server being used
+
+    my_email: string
+        email address of the sender
+
+    Notes
+    --------
+    Prefer `ajc_mail.Mailer`, which reuses one session for all emails.
     """
-    if email_type == 'vandy':
-        smtp_server = 'smtpauth.vanderbilt.edu'
-        smtp_port   = 587
-        smtp_user   = os.environ['ajc_user']
-        smtp_pswd   = os.environ['ajc_pswd']
-        my_email    = os.environ['ajc_email']
-    else:
-        msg = 'Wrong `email_type` ({0})'.format(email_type)
-        raise ValueError(msg)
-    smtpserver = smtplib.SMTP(smtp_server, smtp_port)
-    smtpserver.ehlo()
-    smtpserver.starttls()
-    smtpserver.ehlo
-    smtpserver.login(smtp_user, smtp_pswd)
+    mailer = lazy_import('ajc_mail').Mailer(email_type=email_type)
+    smtpserver = mailer.connect()
 
-    return smtpserver, my_email
+    return smtpserver, mailer.my_email
 
 def ADS_Testing(ajc_gs_pd, now_dict):
     """
     Tests if paper can be obtain from each paper in AJC
 
+    Every paper from today onwards (parsed from `Title` by `ajc_parser`)
+    is resolved in one batch: a single ADS query with an `OR` over the
+    arXiv IDs, followed by a single `arxiv` `id_list` query for the papers
+    ADS did not return.
+    Results are written to `metadata_cache`, so that `ADS_Query` does not
+    need the network on the day of the announcement.
+
     Parameters
     -----------
     ajc_gs_pd: pandas DataFrame
@@ -640,32 +1741,276 @@ def ADS_Testing(ajc_gs_pd, now_dict):
 
     now_dict: python dictionary
         dictionary with `year`, `weekday`, `month`, `day` entries
+
+    Returns
+    --------
+    ads_pd: pandas DataFrame
+        DataFrame with `Date`, `Title`, `author`, `year`, `arxiv_id` and
+        `status` of each paper. `status` is one of `cached`, `ads`,
+        `arxiv`, `unparsed` or `unresolved`.
     """
+    pd = lazy_import('pandas')
     ## Today's Timestamp
     today_pd = pd.Timestamp('{0}/{1}/{2}'.format(now_dict['month'],
                                                  now_dict['day'],
                                                  now_dict['year']))
+    upcoming_pd = ajc_gs_pd.loc[ajc_gs_pd['Date'] >= today_pd]
+    ## Parsed titles - from `ajc_parser`
+    cache = metadata_cache()
+    ads_pd = upcoming_pd[['Date', 'Title', 'author', 'year', 'arxiv_id']]
+    ads_pd = ads_pd.rename_axis('Speaker').reset_index()
+    # Only papers with an arXiv ID can be prefetched
+    parsed = ads_pd['arxiv_id'].notna() & ads_pd['author'].notna() & \
+                ads_pd['year'].notna()
+    ads_pd['status'] = 'unparsed'
+    ads_pd.loc[parsed, 'status'] = 'unresolved'
+    cached = [cache.get(ajc_metadata.arxiv_key(arxiv_id)) is not None
+                for arxiv_id in ads_pd.loc[parsed, 'arxiv_id']]
+    ads_pd.loc[ads_pd.index[parsed.values][cached], 'status'] = 'cached'
+    ## Resolving papers that are not in the cache
+    pending = ads_pd.loc[ads_pd['status'] == 'unresolved']
+    if pending.shape[0] > 0:
+        resolved = ADS_batch_query(pending['arxiv_id'].tolist())
+        for idx, row in pending.iterrows():
+            paper_dict = resolved.get(row['arxiv_id'])
+            if paper_dict is None:
+                continue
+            cache.put([ajc_metadata.arxiv_key(row['arxiv_id'])],
+                      link=paper_dict['link'], title=paper_dict['title'],
+                      authors=paper_dict['authors'])
+            ads_pd.loc[idx, 'status'] = paper_dict['source']
+    ## Report
+    now = datetime.datetime.now()
+    failed_pd = ads_pd.loc[ads_pd['status'].isin(['unparsed', 'unresolved'])]
+    for _, row in failed_pd.iterrows():
+        sys.stderr.write('{0}\t Could not {1} AJC paper for `{2}` ({3}): {4}\n'.format(
+            now.strftime("%x %a %X"),
+            'parse' if row['status'] == 'unparsed' else 'resolve',
+            row['Speaker'], row['Date'].strftime('%Y-%m-%d'), row['Title']))
+    sys.stderr.write('{0}\t Prefetched {1} of {2} AJC papers\n'.format(
+        now.strftime("%x %a %X"), ads_pd.shape[0] - failed_pd.shape[0],
+        ads_pd.shape[0]))
 
-def main():
+    return ads_pd
+
+def ADS_batch_query(arxiv_id_list):
+    """
+    Resolves several arXiv IDs with one ADS query and one arXiv query.
+
+    Parameters
+    ----------
+    arxiv_id_list : `list`
+        ArXiv IDs of the papers to resolve.
+
+    Returns
+    -------
+    resolved : `dict`
+        Dictionary keyed by arXiv ID, with `link`, `title`, `authors` and
+        `source` (`ads` or `arxiv`) of each paper that was found.
+    """
+    ads = lazy_import('ads')
+    arxiv = lazy_import('arxiv')
+    arxiv_id_list = list(dict.fromkeys(arxiv_id_list))
+    resolved = {}
+    ## ADS - One query for all papers
+    ads.config.token = os.environ.get('ads_token')
+    ads_query = ' OR '.join(['arXiv:{0}'.format(id_ii)
+                    for id_ii in arxiv_id_list])
+    try:
+        papers = list(ads.SearchQuery(q=ads_query, rows=len(arxiv_id_list),
+                    fl=['title', 'author', 'year', 'identifier',
+                        'first_author']))
+    except Exception:
+        papers = []
+    for paper in papers:
+        identifiers = list(paper.identifier or [])
+        for id_ii in arxiv_id_list:
+            arxiv_ident = 'arXiv:{0}'.format(id_ii)
+            if (arxiv_ident in identifiers) and (id_ii not in resolved):
+                resolved[id_ii] = {
+                    'link'   : 'http://adsabs.harvard.edu/abs/' + arxiv_ident,
+                    'title'  : (paper.title or [''])[0],
+                    'authors': list(paper.author or []),
+                    'source' : 'ads'}
+    ## arXiv - One query for the rest
+    arxiv_rest = [id_ii for id_ii in arxiv_id_list if id_ii not in resolved]
+    if len(arxiv_rest) > 0:
+        try:
+            papers = arxiv.query(id_list=arxiv_rest)
+        except Exception:
+            papers = []
+        for paper in papers:
+            paper_id = paper.get('id', '').rstrip('/').split('/abs/')[-1]
+            paper_id = re.sub(r'v\d+$', '', paper_id)
+            if paper_id in arxiv_rest:
+                resolved[paper_id] = {
+                    'link'   : paper['arxiv_url'],
+                    'title'  : paper.get('title', ''),
+                    'authors': list(paper.get('authors', [])),
+                    'source' : 'arxiv'}
+
+    return resolved
+
+def get_parser():
+    """
+    Command-line options of `AJC_Reminders`.
+
+    Returns
+    --------
+    parser: `argparse.ArgumentParser`
+        parser of the command-line options
+    """
+    parser = argparse.ArgumentParser(description='Sends out the emails of '
+                'the Astronomy Journal Club (AJC).')
+    parser.add_argument('--roster', choices=['graduate', 'faculty', 'all'],
+        default=None, help='Instead of the daily emails, sends one '
+        'personalized email to everyone in the roster')
+    parser.add_argument('--template', default='signup',
+        help='Template of the `--roster` emails (default: %(default)s)')
+    parser.add_argument('--simulate', nargs=2, metavar=('START', 'END'),
+        default=None, help='Instead of sending the daily emails, writes '
+        'every email due between START and END (YYYY-MM-DD, inclusive) '
+        'to `--output`')
+    parser.add_argument('--output', default=None,
+        help='Output directory of `--simulate` '
+        '(default: AJC_CACHE_DIR/simulation)')
+
+    return parser
+
+def roster_main(people_type, template_name='signup'):
+    """
+    Sends template `template_name` to the `people_type` roster.
+
+    Parameters
+    ----------
+    people_type: string
+        `graduate`, `faculty` or `all`
+
+    template_name: string, optional (default = 'signup')
+        name of the template in `ajc_templates.TEMPLATES`
+    """
+    ajc_roster = lazy_import('ajc_roster')
+    now_dict = datetime_dict()
+    roster = roster_load()
+    if people_type != 'all':
+        roster = ajc_roster.Roster([person for person in roster
+                    if person.people_type == people_type])
+    context = {'ajc_url': ajc_url_creator(now_dict)}
+    send_email_roster(roster, template_name=template_name, context=context)
+
+def simulate_main(start_str, end_str, output_dir=None):
+    """
+    Dry run of the daily emails over a range of dates. The schedule and
+    the rosters are downloaded and parsed once, and every email that would
+    be sent on each day is written to `output_dir` instead.
+
+    Parameters
+    ----------
+    start_str, end_str: string
+        first and last simulated dates (`YYYY-MM-DD`)
+
+    output_dir: string, optional (default = `AJC_CACHE_DIR/simulation`)
+        directory of the rendered emails. See `ajc_mail.DryRunMailer`.
+    """
+    ajc_mail = lazy_import('ajc_mail')
+    start_date = datetime.datetime.strptime(start_str, '%Y-%m-%d').date()
+    end_date   = datetime.datetime.strptime(end_str, '%Y-%m-%d').date()
+    if output_dir is None:
+        output_dir = ajc_cache.cache_path('simulation')
+    ## Schedule and rosters, shared by every simulated day
+    now_dict = datetime_dict(start_date)
+    ajc_url  = ajc_url_creator(now_dict)
+    gs_url   = people_url_creator('graduate')
+    fac_url  = people_url_creator('faculty')
+    html_dict = fetch_pages([ajc_url, gs_url, fac_url])
+    ajc_pd    = ajc_parser(ajc_url, ajc_html=html_dict[ajc_url])
+    ajc_gs_pd = ajc_gs_merge(ajc_pd, gs_html=html_dict[gs_url],
+                    fac_html=html_dict[fac_url])
+    ADS_Testing(ajc_gs_pd, now_dict)
+    ## Simulating each day
+    n_days = 0
+    with ajc_mail.DryRunMailer(output_dir) as mailer:
+        day_date = start_date
+        while day_date <= end_date:
+            mailer.day = day_date.strftime('%Y-%m-%d')
+            now_dict = datetime_dict(day_date)
+            send_email_reminder(ajc_gs_pd, now_dict, mailer=mailer)
+            send_email_PHYS_AJC(ajc_gs_pd, now_dict, mailer=mailer)
+            day_date += datetime.timedelta(days=1)
+            n_days   += 1
+        n_emails = len(mailer.manifest)
+    ## Updating Log
+    now = datetime.datetime.now()
+    sys.stderr.write('{0}\t Simulated {1} days: {2} emails written to `{3}`\n'.format(
+        now.strftime("%x %a %X"), n_days, n_emails, output_dir))
+
+def main(args=None):
     """
     Grabs information for AJC and sends out email reminders before the 
     AJC date
+
+    Parameters
+    ----------
+    args: list, optional
+        command-line options. See `get_parser`.
     """
+    args = get_parser().parse_args(args)
+    if args.roster is not None:
+        return roster_main(args.roster, template_name=args.template)
+    if args.simulate is not None:
+        return simulate_main(args.simulate[0], args.simulate[1],
+                    output_dir=args.output)
     ## Datetime dictionary
     now_dict = datetime_dict()
-    ## Defining HTML URL'S
-    # AJC Website
-    ajc_url = ajc_url_creator(now_dict)
-    ## Obtaining Tables
-    # AJC Table
-    ajc_pd = ajc_parser(ajc_url)
-    ## Merging `ajc_pd` DataFrames
-    ajc_gs_pd = ajc_gs_merge(ajc_pd)
-    ## Sending email reminders to Speaker
-    send_email_reminder(ajc_gs_pd, now_dict)
-    ## Sending email to `PHYS_AJC`
-    send_email_PHYS_AJC(ajc_gs_pd, now_dict)
+    today_str = '{0}-{1}-{2}'.format(now_dict['year'], now_dict['month'],
+                                     now_dict['day'])
+    ## Schedule index
+    # The pages are only revalidated when an email can be due (rows of the
+    # index, or an AJC day of the calendar), or when the index is older
+    # than `ajc_index.INDEX_TTL`, so that new rows are resolved ahead of
+    # their emails. The index is only rebuilt when the pages changed.
+    # Emails due since the last successful run (e.g. a missed cron day)
+    # are caught up.
+    schedule_index = ajc_index.ScheduleIndex()
+    try:
+        last_run = schedule_index.last_run()
+        due_rows = schedule_index.due(today_str, since_str=last_run)
+        if due_rows or (not schedule_index.is_fresh()) or \
+            (not calendar_idle(now_dict, last_run=last_run)):
+            schedule_refresh(now_dict, schedule_index)
+            due_rows = schedule_index.due(today_str, since_str=last_run)
+        ## Nothing to send today. Exiting before loading `pandas`
+        if not due_rows:
+            now = datetime.datetime.now()
+            sys.stderr.write('{0}\t No email reminders today!\n'.format(
+                now.strftime("%x %a %X")))
+            sys.stderr.write('{0}\t No posts for `PHYS_AJC` today!\n'.format(
+                now.strftime("%x %a %X")))
+            schedule_index.set_last_run(today_str)
+            return
+        ## Rows due since the last run
+        ajc_gs_pd = schedule_frame(due_rows)
+        # Emails are written to the outbox and sent by `ajc_outbox.py`, unless
+        # `ajc_outbox` is turned off. Then, one SMTP session is used for all.
+        ajc_mail = lazy_import('ajc_mail')
+        if ajc_mail.env_flag('ajc_outbox'):
+            mailer = lazy_import('ajc_outbox').Outbox()
+        else:
+            mailer = ajc_mail.Mailer(email_type='vandy')
+        with mailer:
+            ## Sending email reminders to Speaker
+            send_email_reminder(ajc_gs_pd, now_dict, mailer=mailer,
+                last_run=last_run)
+            ## Sending email to `PHYS_AJC`
+            send_email_PHYS_AJC(ajc_gs_pd, now_dict, mailer=mailer,
+                last_run=last_run)
+        schedule_index.set_last_run(today_str)
+    finally:
+        schedule_index.close()
 
 # Main function
 if __name__=='__main__':
     main()
+    if IMPORT_TIME_REPORT:
+        sys.stderr.write('import time: {0:>10d} | total (lazy imports)\n'.format(
+            int(1e6 * sum(IMPORT_TIMES.values()))))
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+On-disk cache of the pages downloaded by `AJC_Reminders`.
+
+Each URL is stored under the SHA-1 of the URL as three kinds of files:
+
+    - `<key>.body` : raw bytes of the last `200` response.
+    - `<key>.json` : validators (`ETag`, `Last-Modified`), encoding and
+                     timestamps of the entry.
+    - `<key>.<name>.pkl` : objects parsed from the body (e.g. DataFrames),
+                     tagged with the digest of the body they came from.
+
+The cache directory is taken from the `ajc_cache_dir` environment variable,
+and defaults to `.ajc_cache` next to this file.
+"""
+import os
+import json
+import time
+import pickle
+import hashlib
+import threading
+
+## Defaults
+# Cache directory
+AJC_CACHE_DIR = os.environ.get('ajc_cache_dir',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.ajc_cache'))
+# Seconds during which an entry is served without contacting the server
+CACHE_TTL      = int(os.environ.get('ajc_cache_ttl', 3600))
+# Maximum size of the cache (in bytes)
+CACHE_MAX_SIZE = int(os.environ.get('ajc_cache_max_size', 50 * 1024**2))
+# Entries not used for this many seconds are evicted
+CACHE_MAX_AGE  = int(os.environ.get('ajc_cache_max_age', 30 * 86400))
+
+def cache_path(*args):
+    """
+    Returns a path inside the cache directory, creating the directory
+    if needed.
+
+    Parameters
+    ----------
+    args: strings
+        path elements, relative to `AJC_CACHE_DIR`
+
+    Returns
+    --------
+    path: string
+        path inside of `AJC_CACHE_DIR`
+    """
+    if not os.path.isdir(AJC_CACHE_DIR):
+        os.makedirs(AJC_CACHE_DIR)
+    path = os.path.join(AJC_CACHE_DIR, *args)
+
+    return path
+
+def atomic_write(path, data):
+    """
+    Writes `data` to `path` through a temporary file, so that readers
+    never see a partially written file.
+
+    Parameters
+    ----------
+    path: string
+        path to the output file
+
+    data: bytes
+        contents of the file
+    """
+    tmp_path = '{0}.tmp{1}'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_path, path)
+
+def body_digest(body):
+    """
+    Digest used to tie parsed objects to the body they were parsed from.
+
+    Parameters
+    ----------
+    body: string or bytes
+        body of a page
+
+    Returns
+    --------
+    digest: string
+        SHA-1 hex-digest of `body`
+    """
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+    digest = hashlib.sha1(body).hexdigest()
+
+    return digest
+
+class HTTPCache(object):
+    """
+    Persistent HTTP response cache keyed by URL.
+    """
+    def __init__(self, cache_dir=None, ttl=None, max_size=None,
+        max_age=None):
+        """
+        Parameters
+        ----------
+        cache_dir: string, optional (default = `AJC_CACHE_DIR/http`)
+            directory where the responses are stored
+
+        ttl: int, optional (default = `CACHE_TTL`)
+            seconds during which an entry is considered fresh
+
+        max_size: int, optional (default = `CACHE_MAX_SIZE`)
+            maximum size of the cache, in bytes
+
+        max_age: int, optional (default = `CACHE_MAX_AGE`)
+            entries not used for `max_age` seconds are evicted
+        """
+        if cache_dir is None:
+            cache_dir = cache_path('http')
+        self.cache_dir = cache_dir
+        self.ttl       = CACHE_TTL      if ttl      is None else ttl
+        self.max_size  = CACHE_MAX_SIZE if max_size is None else max_size
+        self.max_age   = CACHE_MAX_AGE  if max_age  is None else max_age
+        # Held by the thread running `evict`
+        self._evict_lock = threading.Lock()
+        if not os.path.isdir(self.cache_dir):
+            os.makedirs(self.cache_dir)
+
+    def _path(self, url_str, ext):
+        key = hashlib.sha1(url_str.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, '{0}.{1}'.format(key, ext))
+
+    def lookup(self, url_str):
+        """
+        Returns the metadata of the entry for `url_str`, or `None`.
+        """
+        try:
+            with open(self._path(url_str, 'json'), 'r') as meta_file:
+                entry = json.load(meta_file)
+        except (IOError, OSError, ValueError):
+            return None
+        if not os.path.exists(self._path(url_str, 'body')):
+            return None
+
+        return entry
+
+    def is_fresh(self, entry):
+        """
+        Checks if `entry` was validated less than `ttl` seconds ago.
+        """
+        return (time.time() - entry['validated']) < self.ttl
+
+    def age(self, entry):
+        """
+        Seconds since `entry` was last validated against the server.
+        """
+        return time.time() - entry['validated']
+
+    def validators(self, entry):
+        """
+        Headers for a conditional request revalidating `entry`.
+        """
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        return headers
+
+    def read_body(self, url_str):
+        """
+        Returns the cached body of `url_str` as text.
+        """
+        entry = self.lookup(url_str)
+        with open(self._path(url_str, 'body'), 'rb') as body_file:
+            body = body_file.read()
+        self._write_meta(url_str, entry, accessed=time.time())
+
+        return body.decode(entry.get('encoding') or 'utf-8', 'replace')
+
+    def _write_meta(self, url_str, entry, **kwargs):
+        entry.update(kwargs)
+        atomic_write(self._path(url_str, 'json'),
+            json.dumps(entry).encode('utf-8'))
+
+    def store(self, url_str, body, etag=None, last_modified=None,
+        encoding=None):
+        """
+        Stores a `200` response for `url_str`.
+
+        Parameters
+        ----------
+        url_str: string
+            URL of the response
+
+        body: bytes
+            raw body of the response
+
+        etag, last_modified: string or NoneType
+            validators sent by the server
+
+        encoding: string or NoneType
+            encoding of `body`
+        """
+        now = time.time()
+        atomic_write(self._path(url_str, 'body'), body)
+        entry = {   'url'          : url_str,
+                    'etag'         : etag,
+                    'last_modified': last_modified,
+                    'encoding'     : encoding,
+                    'digest'       : body_digest(body),
+                    'fetched'      : now,
+                    'validated'    : now,
+                    'accessed'     : now}
+        self._write_meta(url_str, entry)
+        self.evict()
+
+    def touch(self, url_str):
+        """
+        Marks the entry for `url_str` as revalidated, e.g. after a `304`.
+        """
+        entry = self.lookup(url_str)
+        if entry is not None:
+            now = time.time()
+            self._write_meta(url_str, entry, validated=now, accessed=now)
+
+    def load_parsed(self, url_str, name, body):
+        """
+        Returns the object `name` parsed from `body`, or `None` if it has
+        not been cached or was parsed from a different body.
+        """
+        try:
+            with open(self._path(url_str, name + '.pkl'), 'rb') as pkl_file:
+                digest, parsed = pickle.load(pkl_file)
+        except Exception:
+            return None
+        if digest != body_digest(body):
+            return None
+
+        return parsed
+
+    def store_parsed(self, url_str, name, body, parsed):
+        """
+        Stores the object `name` parsed from `body` next to the raw bytes.
+        """
+        atomic_write(self._path(url_str, name + '.pkl'),
+            pickle.dumps((body_digest(body), parsed), protocol=2))
+
+    def evict(self):
+        """
+        Removes entries older than `max_age`, and then the least recently
+        used entries until the cache is smaller than `max_size`.
+
+        Entries without metadata and temporary files are being written by
+        `store` (in this or another process), so they are left alone
+        unless they are older than `max_age`, e.g. after a crash. Only one
+        thread evicts at a time. The others skip it.
+        """
+        if not self._evict_lock.acquire(False):
+            return
+        try:
+            self._evict()
+        finally:
+            self._evict_lock.release()
+
+    def _evict(self):
+        now   = time.time()
+        files = {}
+        for file_ii in os.listdir(self.cache_dir):
+            key = file_ii.split('.')[0]
+            path_ii = os.path.join(self.cache_dir, file_ii)
+            files.setdefault(key, []).append(path_ii)
+        ## Sizes and last access of each entry
+        entries = []
+        for key, paths in files.items():
+            mtimes = {}
+            for path_ii in paths:
+                try:
+                    mtimes[path_ii] = os.path.getmtime(path_ii)
+                except OSError:
+                    # Removed by another thread / process
+                    pass
+            # Temporary files of writes in progress
+            paths = [path_ii for path_ii in mtimes
+                        if ('.tmp' not in os.path.basename(path_ii)) or
+                           ((now - mtimes[path_ii]) >= self.max_age)]
+            meta_path = os.path.join(self.cache_dir, key + '.json')
+            try:
+                with open(meta_path, 'r') as meta_file:
+                    accessed = json.load(meta_file)['accessed']
+            except (IOError, OSError, ValueError, KeyError):
+                # Entry being stored, unless it was left by a crash
+                accessed = max([mtimes[path_ii] for path_ii in paths] or [now])
+                if (now - accessed) < self.max_age:
+                    continue
+            size = 0
+            for path_ii in paths:
+                try:
+                    size += os.path.getsize(path_ii)
+                except OSError:
+                    pass
+            entries.append((accessed, size, paths))
+        entries.sort(key=lambda entry: entry[0])
+        total_size = sum(entry[1] for entry in entries)
+        for accessed, size, paths in entries:
+            if ((now - accessed) < self.max_age) and \
+               (total_size <= self.max_size):
+                break
+            for path_ii in paths:
+                try:
+                    os.remove(path_ii)
+                except OSError:
+                    pass
+            total_size -= size
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Local SQLite index of the merged AJC schedule.
+
+The output of `ajc_parser` + `ajc_gs_merge` is stored as one row per AJC
+date, with indexed `reminder` and `send_email` columns, so that the daily
+run only has to look up today's date instead of rebuilding and filtering
+the whole schedule. The index is replaced only when the digest of the
+source pages changes.
+
+Each row also stores a hash of its (date, speaker, title), so that a new
+version of the schedule can be diffed against the index row by row, and
+only the rows that were added or changed are processed again, as well as
+the paper title, first author, year and arXiv ID parsed from its title.
+
+The date of the last successful run is also kept, so that a run can catch
+up on every email that came due since then, e.g. after a missed cron day.
+
+The daily run reads the index before importing `pandas`, so this module
+does not import it.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+
+import ajc_cache
+
+## Defaults
+# Seconds during which the index is used without checking the source pages,
+# on days when no email can be due
+INDEX_TTL = int(os.environ.get('ajc_index_ttl', 2 * 86400))
+# Columns of the `schedule` table, in order
+SCHEDULE_COLS = ['speaker', 'date', 'reminder', 'send_email', 'email',
+                 'first_name', 'last_name', 'people_type', 'title', 'row_hash',
+                 'paper_title', 'author', 'year', 'arxiv_id', 'candidate']
+# Columns added after the first version of the index, with their types
+ADDED_COLS = [('row_hash', 'TEXT'), ('paper_title', 'TEXT'),
+              ('author', 'TEXT'), ('year', 'INTEGER'), ('arxiv_id', 'TEXT'),
+              ('candidate', 'TEXT')]
+
+def row_hash(date_str, speaker, title):
+    """
+    Hash of the content of one row of the AJC schedule.
+
+    Parameters
+    ----------
+    date_str, speaker, title: string or NoneType
+        `Date` (`YYYY-MM-DD`), `Speaker` and `Title` of the row
+
+    Returns
+    --------
+    hash_str: string
+        SHA-1 hex-digest of (date, speaker, title)
+    """
+    row_str = '|'.join(['' if val is None else str(val)
+                        for val in [date_str, speaker, title]])
+
+    return hashlib.sha1(row_str.encode('utf-8')).hexdigest()
+
+class ScheduleIndex(object):
+    """
+    SQLite index of the AJC schedule, keyed by date.
+    """
+    def __init__(self, db_path=None, ttl=None):
+        """
+        Parameters
+        ----------
+        db_path: string, optional (default = `AJC_CACHE_DIR/schedule.sqlite`)
+            path to the SQLite database
+
+        ttl: int, optional (default = `INDEX_TTL`)
+            seconds during which the index is considered fresh
+        """
+        if db_path is None:
+            db_path = ajc_cache.cache_path('schedule.sqlite')
+        self.db_path = db_path
+        self.ttl     = INDEX_TTL if ttl is None else ttl
+        self.conn    = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS schedule (
+                    speaker     TEXT,
+                    date        TEXT,
+                    reminder    TEXT,
+                    send_email  TEXT,
+                    email       TEXT,
+                    first_name  TEXT,
+                    last_name   TEXT,
+                    people_type TEXT,
+                    title       TEXT,
+                    row_hash    TEXT,
+                    paper_title TEXT,
+                    author      TEXT,
+                    year        INTEGER,
+                    arxiv_id    TEXT,
+                    candidate   TEXT)""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT)""")
+            # Indices built by older versions
+            cols = [row['name'] for row in
+                        self.conn.execute('PRAGMA table_info(schedule)')]
+            for col, col_type in ADDED_COLS:
+                if col not in cols:
+                    self.conn.execute('ALTER TABLE schedule ADD COLUMN {0} {1}'
+                        .format(col, col_type))
+            # Older versions used low-confidence matches of the speakers.
+            # Forgetting the rosters makes the next refresh resolve every
+            # row again.
+            if 'candidate' not in cols:
+                self.conn.execute("DELETE FROM meta WHERE key = 'roster_digest'")
+            self.conn.execute("""CREATE INDEX IF NOT EXISTS schedule_reminder
+                                 ON schedule (reminder)""")
+            self.conn.execute("""CREATE INDEX IF NOT EXISTS schedule_send_email
+                                 ON schedule (send_email)""")
+
+    def _get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?',
+                (key,)).fetchone()
+        return None if row is None else row['value']
+
+    def _set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+            (key, str(value)))
+
+    def source_digest(self):
+        """
+        Digest of the pages the current index was built from, or `None`.
+        """
+        return self._get_meta('source_digest')
+
+    def roster_digest(self):
+        """
+        Digest of the roster pages the current index was built from,
+        or `None`.
+        """
+        return self._get_meta('roster_digest')
+
+    def validated(self):
+        """
+        Time (in seconds since the epoch) the index was last built or
+        checked against the source pages, or `None`.
+        """
+        validated = self._get_meta('validated')
+
+        return None if validated is None else float(validated)
+
+    def is_fresh(self):
+        """
+        Checks if the index was built or validated less than `ttl`
+        seconds ago. Stale copies of the pages do not count. See `refresh`.
+        """
+        validated = self.validated()
+        if validated is None:
+            return False
+
+        return (time.time() - validated) < self.ttl
+
+    def refresh(self, records, source_digest, roster_digest=None,
+        validated=True):
+        """
+        Replaces the contents of the index.
+
+        Parameters
+        ----------
+        records: list
+            list of dictionaries with the keys in `SCHEDULE_COLS`. Dates
+            are ISO-formatted strings (`YYYY-MM-DD`).
+
+        source_digest: string
+            digest of the pages `records` were parsed from
+
+        roster_digest: string, optional
+            digest of the roster pages used to resolve the speakers
+
+        validated: boolean, optional (default = True)
+            if False, the validation time is not updated. See `touch`.
+        """
+        cols_str = ', '.join(SCHEDULE_COLS)
+        vals_str = ', '.join(['?'] * len(SCHEDULE_COLS))
+        rows = [tuple(rec_ii.get(col) for col in SCHEDULE_COLS)
+                    for rec_ii in records]
+        with self.conn:
+            self.conn.execute('DELETE FROM schedule')
+            self.conn.executemany('INSERT INTO schedule ({0}) VALUES ({1})'
+                .format(cols_str, vals_str), rows)
+            self._set_meta('source_digest', source_digest)
+            if roster_digest is not None:
+                self._set_meta('roster_digest', roster_digest)
+            if validated:
+                self._set_meta('validated', time.time())
+
+    def touch(self, source_digest=None, validated=True):
+        """
+        Marks the index as validated against unchanged source pages.
+
+        Parameters
+        ----------
+        source_digest: string, optional
+            new digest of the source pages, when they changed without
+            changing any row of the index
+
+        validated: boolean, optional (default = True)
+            if False, the validation time is not updated, e.g. when some
+            pages were served from a stale cached copy
+        """
+        with self.conn:
+            if source_digest is not None:
+                self._set_meta('source_digest', source_digest)
+            if validated:
+                self._set_meta('validated', time.time())
+
+    def rows(self):
+        """
+        Every row of the index, ordered by date.
+
+        Returns
+        --------
+        rows: list
+            list of dictionaries with the keys in `SCHEDULE_COLS`
+        """
+        cursor = self.conn.execute('SELECT * FROM schedule ORDER BY date')
+        rows = [dict(row) for row in cursor]
+
+        return rows
+
+    def last_run(self):
+        """
+        Date (`YYYY-MM-DD`) of the last successful run, or `None`.
+        """
+        return self._get_meta('last_run')
+
+    def set_last_run(self, date_str):
+        """
+        Records `date_str` (`YYYY-MM-DD`) as the date of the last
+        successful run.
+        """
+        with self.conn:
+            self._set_meta('last_run', date_str)
+
+    def due(self, date_str, since_str=None):
+        """
+        Rows with a reminder or announcement due in (`since_str`, `date_str`].
+
+        Parameters
+        ----------
+        date_str: string
+            ISO-formatted date (`YYYY-MM-DD`)
+
+        since_str: string, optional
+            ISO-formatted date (`YYYY-MM-DD`), excluded from the interval.
+            By default, only rows due on `date_str` are returned.
+
+        Returns
+        --------
+        rows: list
+            list of dictionaries with the keys in `SCHEDULE_COLS`
+        """
+        if since_str is None:
+            cursor = self.conn.execute("""
+                SELECT * FROM schedule WHERE reminder = ?
+                UNION
+                SELECT * FROM schedule WHERE send_email = ?
+                ORDER BY date""", (date_str, date_str))
+        else:
+            cursor = self.conn.execute("""
+                SELECT * FROM schedule WHERE reminder > ? AND reminder <= ?
+                UNION
+                SELECT * FROM schedule WHERE send_email > ? AND send_email <= ?
+                ORDER BY date""", (since_str, date_str, since_str, date_str))
+        rows = [dict(row) for row in cursor]
+
+        return rows
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+        self.conn.close()
@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Outbound mail for `AJC_Reminders`.
+
+`Mailer` opens one authenticated SMTP session the first time a message is
+sent, sends every message of the run over it, and reconnects if the server
+drops the connection. The server can be replaced with a local stand-in
+(e.g. `python -m aiosmtpd -n -l localhost:1025`) through the
+`ajc_smtp_host`, `ajc_smtp_port`, `ajc_smtp_tls` and `ajc_smtp_login`
+environment variables, or the arguments of `Mailer`.
+
+When the server advertises `PIPELINING` (RFC 2920), the `MAIL`, `RCPT` and
+`DATA` commands of a message are sent together, so that each message costs
+two round trips instead of one per command.
+
+`DryRunMailer` has the interface of `Mailer`, but writes each message to a
+directory instead of sending it.
+
+`MailerPool` sends a batch of messages over a few `Mailer` sessions working
+in parallel, under a shared rate cap, and returns the result of every
+message.
+"""
+import os
+import re
+import sys
+import json
+import time
+import queue
+import smtplib
+import datetime
+import threading
+
+## SMTP servers, by `email_type`
+SMTP_SERVERS = {'vandy': ('smtpauth.vanderbilt.edu', 587)}
+# Seconds to wait for the SMTP server
+SMTP_TIMEOUT = 60
+# Number of SMTP sessions used in parallel by `MailerPool`
+SMTP_POOL_SIZE = int(os.environ.get('ajc_smtp_pool_size', 4))
+# Maximum number of messages per second sent by `MailerPool` (0: no cap)
+SMTP_RATE      = float(os.environ.get('ajc_smtp_rate', 10))
+
+def env_flag(name, default=True):
+    """
+    Reads a boolean environment variable (`0`, `false`, `no` are False).
+    """
+    value = os.environ.get(name)
+    if value is None:
+        return default
+
+    return value.strip().lower() not in ['0', 'false', 'no', '']
+
+class Mailer(object):
+    """
+    Reusable, lazily-opened SMTP session.
+    """
+    # Messages are sent by `send`, not queued for later
+    queues = False
+
+    def __init__(self, email_type='vandy', host=None, port=None, user=None,
+        pswd=None, my_email=None, use_tls=None, login=None,
+        pipelining=None, timeout=SMTP_TIMEOUT, smtp_class=smtplib.SMTP):
+        """
+        Parameters
+        ----------
+        email_type: string, optional (default = 'vandy')
+            type of email settings to use
+            Options:
+                - 'vandy': Sends email from the Vanderbilt Email Address
+
+        host, port: string and int, optional
+            SMTP server. By default, taken from `ajc_smtp_host` and
+            `ajc_smtp_port`, or from `SMTP_SERVERS[email_type]`.
+
+        user, pswd, my_email: string, optional
+            credentials and sender address. By default, taken from the
+            `ajc_user`, `ajc_pswd` and `ajc_email` environment variables.
+
+        use_tls, login: boolean, optional
+            whether to use STARTTLS and to log in. By default, taken from
+            `ajc_smtp_tls` and `ajc_smtp_login`, or True.
+
+        pipelining: boolean, optional
+            whether to pipeline the commands of each message, when the
+            server supports it. By default, taken from `ajc_smtp_pipelining`,
+            or True.
+
+        timeout: float, optional (default = `SMTP_TIMEOUT`)
+            seconds to wait for the SMTP server
+
+        smtp_class: class, optional (default = `smtplib.SMTP`)
+            SMTP client class
+        """
+        if email_type not in SMTP_SERVERS:
+            msg = 'Wrong `email_type` ({0})'.format(email_type)
+            raise ValueError(msg)
+        default_host, default_port = SMTP_SERVERS[email_type]
+        self.host     = host or os.environ.get('ajc_smtp_host', default_host)
+        self.port     = int(port or os.environ.get('ajc_smtp_port', default_port))
+        self.use_tls  = env_flag('ajc_smtp_tls') if use_tls is None else use_tls
+        self.login    = env_flag('ajc_smtp_login') if login is None else login
+        self.pipelining = env_flag('ajc_smtp_pipelining') if pipelining is None \
+                            else pipelining
+        self.user     = user
+        self.pswd     = pswd
+        self.my_email = my_email or os.environ.get('ajc_email')
+        self.timeout  = timeout
+        self.smtp_class = smtp_class
+        self.server   = None
+        self.queue    = []
+        self.n_sent   = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def connect(self):
+        """
+        Opens and authenticates the SMTP session, unless it is already open.
+
+        Returns
+        --------
+        server: `smtplib.SMTP`
+            authenticated SMTP session
+        """
+        if self.server is not None:
+            return self.server
+        server = self.smtp_class(self.host, self.port, timeout=self.timeout)
+        try:
+            server.ehlo()
+            if self.use_tls:
+                server.starttls()
+                server.ehlo()
+            if self.login:
+                user = self.user or os.environ['ajc_user']
+                pswd = self.pswd or os.environ['ajc_pswd']
+                server.login(user, pswd)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+
+        return server
+
+    def send(self, msg, to_list, from_email=None, dedupe=None):
+        """
+        Sends `msg` over the shared session, reconnecting once if the
+        server closed the connection.
+
+        Parameters
+        ----------
+        msg: `email.message.Message`
+            message to send
+
+        to_list: list
+            list of recipients
+
+        from_email: string, optional (default = `my_email`)
+            envelope sender
+
+        dedupe: tuple, optional
+            (speaker, date, kind) of the message. Only used by
+            `ajc_outbox.Outbox`, which shares this interface.
+
+        Returns
+        --------
+        sent: boolean
+            True once the message has been accepted by the server.
+        """
+        return self.send_raw(msg.as_string(), to_list, from_email=from_email)
+
+    def send_raw(self, msg_str, to_list, from_email=None):
+        """
+        Sends the already rendered message `msg_str`. See `send`.
+        """
+        self.transaction(msg_str, to_list, from_email=from_email)
+
+        return True
+
+    def transaction(self, msg_str, to_list, from_email=None):
+        """
+        Sends the already rendered message `msg_str`, reconnecting once if
+        the server closed the connection.
+
+        Returns
+        --------
+        refused: dict
+            recipients refused by the server, with their (code, response).
+            `smtplib.SMTPRecipientsRefused` is raised if all were refused.
+        """
+        from_email = from_email or self.my_email
+        try:
+            refused = self._sendmail(from_email, to_list, msg_str)
+        except smtplib.SMTPServerDisconnected:
+            self.reset()
+            refused = self._sendmail(from_email, to_list, msg_str)
+        self.n_sent += 1
+
+        return refused
+
+    def _sendmail(self, from_email, to_list, msg_str):
+        server = self.connect()
+        if not (self.pipelining and server.has_extn('pipelining')):
+            return server.sendmail(from_email, to_list, msg_str)
+        ## Pipelined transaction: envelope and `DATA` in one write
+        cmd_list  = ['MAIL FROM:{0}'.format(smtplib.quoteaddr(from_email))]
+        cmd_list += ['RCPT TO:{0}'.format(smtplib.quoteaddr(addr))
+                        for addr in to_list]
+        cmd_list += ['DATA']
+        server.send(''.join(cmd + '\r\n' for cmd in cmd_list))
+        reply_list = [server.getreply() for cmd in cmd_list]
+        mail_reply, data_reply = reply_list[0], reply_list[-1]
+        refused = dict((addr, reply) for addr, reply in
+                        zip(to_list, reply_list[1:-1]) if reply[0] not in (250, 251))
+        envelope_ok = (mail_reply[0] == 250) and (len(refused) < len(to_list))
+        if data_reply[0] == 354 and not envelope_ok:
+            # `DATA` should have been rejected. Sending an empty message
+            # that the server will discard.
+            server.send('.\r\n')
+            server.getreply()
+        if data_reply[0] != 354 or not envelope_ok:
+            server.rset()
+            if mail_reply[0] != 250:
+                raise smtplib.SMTPSenderRefused(mail_reply[0], mail_reply[1],
+                        from_email)
+            if len(refused) == len(to_list):
+                raise smtplib.SMTPRecipientsRefused(refused)
+            raise smtplib.SMTPDataError(*data_reply)
+        ## Message body, with leading dots escaped
+        data_str = smtplib.quotedata(msg_str)
+        if not data_str.endswith('\r\n'):
+            data_str += '\r\n'
+        server.send((data_str + '.\r\n').encode('ascii'))
+        code, resp = server.getreply()
+        if code != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(code, resp)
+
+        return refused
+
+    def reset(self):
+        """
+        Closes the socket of a session that is likely unusable (e.g. after
+        an error), without `QUIT`. The next message opens a new session.
+        """
+        if self.server is not None:
+            try:
+                self.server.close()
+            except OSError:
+                pass
+            self.server = None
+
+    def enqueue(self, msg, to_list, from_email=None):
+        """
+        Adds `msg` to the queue sent by `flush`.
+        """
+        self.queue.append((msg, to_list, from_email))
+
+    def flush(self):
+        """
+        Sends every queued message over one session.
+        """
+        while self.queue:
+            msg, to_list, from_email = self.queue[0]
+            self.send(msg, to_list, from_email=from_email)
+            self.queue.pop(0)
+
+    def close(self):
+        """
+        Sends any queued message and closes the session.
+        """
+        try:
+            self.flush()
+        finally:
+            if self.server is not None:
+                try:
+                    self.server.quit()
+                except smtplib.SMTPException:
+                    pass
+                except OSError:
+                    pass
+                self.server = None
+                now = datetime.datetime.now()
+                sys.stderr.write('{0}\t Closed SMTP session ({1} emails)\n'.format(
+                    now.strftime("%x %a %X"), self.n_sent))
+
+class DryRunMailer(object):
+    """
+    Stand-in for `Mailer` that writes messages to a directory.
+
+    Each message is written to `<output_dir>/<day>/<NN>_<kind>_<speaker>.eml`
+    and listed, with its recipients, in `<output_dir>/manifest.json` when
+    the mailer is closed.
+    """
+    queues = False
+
+    def __init__(self, output_dir, my_email=None, day=''):
+        """
+        Parameters
+        ----------
+        output_dir: string
+            output directory
+
+        my_email: string, optional
+            sender address. By default, taken from `ajc_email`.
+
+        day: string, optional
+            sub-directory of the next messages, e.g. the simulated date
+        """
+        self.output_dir = output_dir
+        self.my_email   = my_email or os.environ.get('ajc_email')
+        self.day        = day
+        self.manifest   = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def send(self, msg, to_list, from_email=None, dedupe=None):
+        """
+        Writes `msg` to the output directory. Same interface as
+        `Mailer.send`.
+        """
+        speaker, date, kind = dedupe or ('', '', msg.get('Subject', ''))
+        day_dir = os.path.join(self.output_dir, self.day)
+        if not os.path.isdir(day_dir):
+            os.makedirs(day_dir)
+        file_name = '{0:02d}_{1}_{2}.eml'.format(len(self.manifest), kind,
+                        speaker)
+        file_name = re.sub(r'[^\w.\-]+', '_', file_name)
+        with open(os.path.join(day_dir, file_name), 'w') as msg_file:
+            msg_file.write(msg.as_string())
+        self.manifest.append({  'day'    : self.day,
+                                'file'   : os.path.join(self.day, file_name),
+                                'kind'   : kind,
+                                'speaker': speaker,
+                                'date'   : date,
+                                'subject': msg.get('Subject'),
+                                'from'   : from_email or self.my_email,
+                                'to'     : [str(to_ii) for to_ii in to_list]})
+
+        return True
+
+    def close(self):
+        """
+        Writes the manifest of every message written so far.
+        """
+        if not os.path.isdir(self.output_dir):
+            os.makedirs(self.output_dir)
+        with open(os.path.join(self.output_dir, 'manifest.json'), 'w') as man_file:
+            json.dump(self.manifest, man_file, indent=1)
+
+class RateLimiter(object):
+    """
+    Spaces out events shared between threads to at most `rate` per second.
+    """
+    def __init__(self, rate=SMTP_RATE):
+        """
+        Parameters
+        ----------
+        rate: float, optional (default = `SMTP_RATE`)
+            maximum number of events per second. No cap if 0 or `None`.
+        """
+        self.rate      = rate
+        self.lock      = threading.Lock()
+        self.next_time = 0.
+
+    def wait(self):
+        """
+        Blocks until the next event is allowed.
+        """
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + 1. / self.rate
+        if start > now:
+            time.sleep(start - now)
+
+class MailerPool(object):
+    """
+    Small pool of `Mailer` sessions sending a batch of messages in parallel.
+    """
+    def __init__(self, size=SMTP_POOL_SIZE, rate=SMTP_RATE,
+        mailer_factory=None, **mailer_kwargs):
+        """
+        Parameters
+        ----------
+        size: int, optional (default = `SMTP_POOL_SIZE`)
+            maximum number of SMTP sessions used at the same time
+
+        rate: float, optional (default = `SMTP_RATE`)
+            maximum number of messages per second, over all sessions.
+            No cap if 0 or `None`.
+
+        mailer_factory: callable, optional (default = `Mailer`)
+            returns a new `Mailer`. Called with `mailer_kwargs`.
+        """
+        self.size           = max(1, int(size))
+        self.rate           = rate
+        self.mailer_factory = mailer_factory or Mailer
+        self.mailer_kwargs  = mailer_kwargs
+
+    def send_many(self, message_list):
+        """
+        Sends every message of `message_list`.
+
+        Parameters
+        ----------
+        message_list: list
+            list of (msg, to_list) tuples. `msg` can be an
+            `email.message.Message` or an already rendered string.
+
+        Returns
+        --------
+        result_list: list
+            one dictionary per message, in the order of `message_list`,
+            with `to`, `status` (`sent`, `refused` or `error`), `refused`
+            (recipients refused by the server), `error` and `latency`
+            (in seconds).
+        """
+        result_list = [None] * len(message_list)
+        if len(message_list) == 0:
+            return result_list
+        job_queue = queue.Queue()
+        for job in enumerate(message_list):
+            job_queue.put(job)
+        limiter = RateLimiter(self.rate)
+
+        def worker():
+            mailer = self.mailer_factory(**self.mailer_kwargs)
+            try:
+                while True:
+                    try:
+                        ii, (msg, to_list) = job_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                    limiter.wait()
+                    result_list[ii] = self._send_one(mailer, msg, to_list)
+            finally:
+                try:
+                    mailer.close()
+                except (smtplib.SMTPException, OSError):
+                    pass
+
+        n_workers = min(self.size, len(message_list))
+        thread_list = [threading.Thread(target=worker)
+                        for kk in range(n_workers)]
+        for thread in thread_list:
+            thread.start()
+        for thread in thread_list:
+            thread.join()
+        # Messages left by a worker that could not start
+        for ii, result in enumerate(result_list):
+            if result is None:
+                result_list[ii] = { 'to'     : list(message_list[ii][1]),
+                                    'status' : 'error',
+                                    'refused': [],
+                                    'error'  : 'Message was not sent',
+                                    'latency': None}
+
+        return result_list
+
+    def _send_one(self, mailer, msg, to_list):
+        result = {  'to'     : list(to_list),
+                    'status' : 'sent',
+                    'refused': [],
+                    'error'  : None,
+                    'latency': None}
+        start = time.time()
+        try:
+            msg_str = msg if isinstance(msg, str) else msg.as_string()
+            refused = mailer.transaction(msg_str, to_list)
+            result['refused'] = sorted(refused.keys())
+        except smtplib.SMTPRecipientsRefused as err:
+            result['status']  = 'refused'
+            result['refused'] = sorted(err.recipients.keys())
+            result['error']   = str(err)
+        except Exception as err:
+            # SMTP and socket errors, but also e.g. a `KeyError` for missing
+            # credentials, are recorded so that the worker keeps going.
+            # Session is likely unusable. The next message opens a new one
+            mailer.reset()
+            result['status'] = 'error'
+            result['error']  = '{0}: {1}'.format(err.__class__.__name__, err)
+        result['latency'] = time.time() - start
+
+        return result
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Persistent cache of the paper metadata resolved by `ADS_Query`.
+
+Papers are stored under their arXiv ID (`arxiv:<id>`). Papers that could
+not be resolved are stored as misses, so that known-bad IDs are not sent
+to ADS / arXiv again until `miss_ttl` expires. The least recently used
+entries are evicted once the cache has more than `max_entries` entries.
+"""
+import os
+import json
+import time
+import sqlite3
+
+import ajc_cache
+
+## Defaults
+# Seconds during which a resolved paper is served from the cache
+METADATA_TTL         = int(os.environ.get('ajc_metadata_ttl', 90 * 86400))
+# Seconds during which a paper that could not be resolved is not re-queried
+METADATA_MISS_TTL    = int(os.environ.get('ajc_metadata_miss_ttl', 7 * 86400))
+# Maximum number of entries in the cache
+METADATA_MAX_ENTRIES = int(os.environ.get('ajc_metadata_max_entries', 5000))
+
+def arxiv_key(arxiv_id):
+    """
+    Cache key of a paper, given its arXiv ID.
+    """
+    return 'arxiv:{0}'.format(str(arxiv_id).strip().lower())
+
+class MetadataCache(object):
+    """
+    SQLite cache of paper metadata with TTL, negative caching and LRU
+    eviction.
+    """
+    def __init__(self, db_path=None, ttl=None, miss_ttl=None,
+        max_entries=None):
+        """
+        Parameters
+        ----------
+        db_path: string, optional (default = `AJC_CACHE_DIR/metadata.sqlite`)
+            path to the SQLite database
+
+        ttl: int, optional (default = `METADATA_TTL`)
+            seconds during which a resolved paper is used
+
+        miss_ttl: int, optional (default = `METADATA_MISS_TTL`)
+            seconds during which a miss is used
+
+        max_entries: int, optional (default = `METADATA_MAX_ENTRIES`)
+            maximum number of entries kept in the cache
+        """
+        if db_path is None:
+            db_path = ajc_cache.cache_path('metadata.sqlite')
+        self.db_path     = db_path
+        self.ttl         = METADATA_TTL if ttl is None else ttl
+        self.miss_ttl    = METADATA_MISS_TTL if miss_ttl is None else miss_ttl
+        self.max_entries = METADATA_MAX_ENTRIES if max_entries is None \
+                            else max_entries
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS papers (
+                    key      TEXT PRIMARY KEY,
+                    found    INTEGER,
+                    link     TEXT,
+                    title    TEXT,
+                    authors  TEXT,
+                    stored   REAL,
+                    accessed REAL)""")
+            self.conn.execute("""CREATE INDEX IF NOT EXISTS papers_accessed
+                                 ON papers (accessed)""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS lookups (
+                    backend   TEXT PRIMARY KEY,
+                    calls     INTEGER,
+                    wins      INTEGER,
+                    errors    INTEGER,
+                    abandoned INTEGER,
+                    latency   REAL)""")
+
+    def get(self, key):
+        """
+        Looks up `key` in the cache.
+
+        Parameters
+        ----------
+        key: string
+            key from `arxiv_key`
+
+        Returns
+        --------
+        paper_dict: `dict` or `NoneType`
+            `None` if `key` is not cached or has expired. Otherwise, a
+            dictionary with `found`, `link`, `title` and `authors` keys.
+            `found` is False for cached misses.
+        """
+        row = self.conn.execute('SELECT * FROM papers WHERE key = ?',
+                (key,)).fetchone()
+        if row is None:
+            return None
+        ttl = self.ttl if row['found'] else self.miss_ttl
+        if (time.time() - row['stored']) >= ttl:
+            return None
+        with self.conn:
+            self.conn.execute('UPDATE papers SET accessed = ? WHERE key = ?',
+                (time.time(), key))
+        paper_dict = {  'found'  : bool(row['found']),
+                        'link'   : row['link'] or '',
+                        'title'  : row['title'] or '',
+                        'authors': json.loads(row['authors'] or '[]')}
+
+        return paper_dict
+
+    def put(self, keys, link='', title='', authors=None):
+        """
+        Stores a resolved paper under every key in `keys`.
+
+        Parameters
+        ----------
+        keys: list
+            keys from `arxiv_key`
+
+        link, title: string
+            link to the paper and its title
+
+        authors: list, optional
+            list of authors of the paper
+        """
+        self._put(keys, True, link, title, authors or [])
+
+    def put_miss(self, keys):
+        """
+        Records that the paper under `keys` could not be resolved.
+        """
+        self._put(keys, False, '', '', [])
+
+    def _put(self, keys, found, link, title, authors):
+        now  = time.time()
+        rows = [(key, int(found), link, title, json.dumps(list(authors)),
+                    now, now) for key in keys]
+        with self.conn:
+            self.conn.executemany("""INSERT OR REPLACE INTO papers
+                VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+        self.evict()
+
+    def record_lookup(self, backend, latency, won=False, error=False):
+        """
+        Records the outcome of one lookup on `backend`.
+
+        Parameters
+        ----------
+        backend: string
+            name of the backend, e.g. `ads` or `arxiv`
+
+        latency: float or NoneType
+            seconds the backend took to answer, or `None` if the lookup
+            was abandoned before it answered
+
+        won: boolean, optional (default = False)
+            True if this backend provided the answer that was used
+
+        error: boolean, optional (default = False)
+            True if the backend raised an error
+        """
+        with self.conn:
+            self.conn.execute("""INSERT OR IGNORE INTO lookups
+                VALUES (?, 0, 0, 0, 0, 0.)""", (backend,))
+            self.conn.execute("""UPDATE lookups SET
+                calls    = calls + 1,
+                wins     = wins + ?,
+                errors   = errors + ?,
+                abandoned = abandoned + ?,
+                latency  = latency + ?
+                WHERE backend = ?""", (int(won), int(error),
+                    int(latency is None), latency or 0., backend))
+
+    def lookup_stats(self):
+        """
+        Summary of the lookups recorded with `record_lookup`, used to tune
+        the hedge delay of `ADS_hedged_lookup`.
+
+        Returns
+        --------
+        stats_dict: dict
+            dictionary keyed by backend, with `calls`, `wins`, `errors`,
+            `abandoned` and `mean_latency` (over the lookups that answered)
+        """
+        stats_dict = {}
+        for row in self.conn.execute('SELECT * FROM lookups'):
+            answered = row['calls'] - row['abandoned']
+            stats_dict[row['backend']] = {
+                'calls'       : row['calls'],
+                'wins'        : row['wins'],
+                'errors'      : row['errors'],
+                'abandoned'   : row['abandoned'],
+                'mean_latency': (row['latency'] / answered) if answered else None}
+
+        return stats_dict
+
+    def evict(self):
+        """
+        Removes the least recently used entries above `max_entries`.
+        """
+        with self.conn:
+            self.conn.execute("""DELETE FROM papers WHERE key IN (
+                SELECT key FROM papers ORDER BY accessed DESC
+                LIMIT -1 OFFSET ?)""", (self.max_entries,))
+
+    def close(self):
+        """
+        Closes the connection to the database.
+        """
+        self.conn.close()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Resolution of AJC speakers to the graduate-student and faculty rosters.
+
+Names are normalized (accents, case, hyphens and punctuation removed,
+common nicknames replaced by the full first name) and looked up in two
+steps:
+
+    - exact lookup of the sorted name tokens, e.g. `Last_First` and
+      `First Last` give the same key.
+    - approximate lookup. Each token of the shorter name is paired with
+      the most similar token of the other name (Dice coefficient of their
+      character trigrams), and the score is the mean similarity of the
+      pairs. Both names need at least two tokens, at least one token has
+      to match exactly (usually the last name), and names with extra
+      tokens (e.g. a middle name) score at most `SUBSET_SCORE`. Since a
+      shared token is required, only the roster entries found in the
+      inverted index of tokens under one of the speaker's tokens are
+      scored, instead of every entry sharing a trigram.
+
+The index is built once per roster and stored next to the page cache,
+tagged with a digest of the roster names and of `INDEX_VERSION`.
+"""
+import os
+import re
+import pickle
+import hashlib
+import unicodedata
+
+import ajc_cache
+
+## Defaults
+# Matches with a lower confidence are rejected
+NAME_MATCH_MIN = float(os.environ.get('ajc_name_match_min', 0.6))
+# Matches with a lower confidence are accepted, but reported
+NAME_MATCH_LOW = float(os.environ.get('ajc_name_match_low', 0.9))
+# Maximum confidence of a match between names with different tokens
+SUBSET_SCORE   = 0.95
+# Size of the character n-grams
+NGRAM_SIZE     = 3
+# Version of `NameIndex`, part of the digest of the cached index
+INDEX_VERSION  = 2
+# Nicknames, replaced by the full first name
+NICKNAMES = {   'alex'  : 'alexander',  'andy'  : 'andrew',
+                'ben'   : 'benjamin',   'bill'  : 'william',
+                'bob'   : 'robert',     'chris' : 'christopher',
+                'dan'   : 'daniel',     'dave'  : 'david',
+                'jim'   : 'james',      'joe'   : 'joseph',
+                'kate'  : 'katherine',  'liz'   : 'elizabeth',
+                'matt'  : 'matthew',    'mike'  : 'michael',
+                'nick'  : 'nicholas',   'rob'   : 'robert',
+                'sam'   : 'samuel',     'steve' : 'steven',
+                'tom'   : 'thomas',     'will'  : 'william'}
+# Anything that is not a letter or a digit separates tokens
+TOKEN_SPLIT_RE = re.compile(r'[^a-z0-9]+')
+
+def name_tokens(name):
+    """
+    Normalized tokens of `name`.
+
+    Parameters
+    ----------
+    name: string
+        name, e.g. `Last_First` or `First Middle Last`
+
+    Returns
+    --------
+    tokens: tuple
+        sorted, lower-case tokens without accents
+    """
+    name_str = unicodedata.normalize('NFKD', str(name))
+    name_str = ''.join(char for char in name_str
+                        if not unicodedata.combining(char)).lower()
+    tokens = [NICKNAMES.get(token, token)
+                for token in TOKEN_SPLIT_RE.split(name_str) if token]
+
+    return tuple(sorted(tokens))
+
+def ngrams(tokens, n=NGRAM_SIZE):
+    """
+    Set of character n-grams of the name made of `tokens`.
+    """
+    name_str = ' {0} '.format(' '.join(tokens))
+
+    return set(name_str[ii:ii + n] for ii in range(len(name_str) - n + 1))
+
+class NameIndex(object):
+    """
+    Exact and approximate lookup of names in a roster.
+    """
+    def __init__(self, names):
+        """
+        Parameters
+        ----------
+        names: list
+            roster names, e.g. the `full_name` index of
+            `people_info_extractor`
+        """
+        self.names  = []
+        self.tokens = []
+        # Normalized key -> position in `names`
+        self.keys     = {}
+        # Token -> positions in `names`
+        self.postings = {}
+        for name in names:
+            tokens = name_tokens(name)
+            if (not tokens) or (tokens in self.keys):
+                continue
+            idx = len(self.names)
+            self.names.append(name)
+            self.tokens.append(set(tokens))
+            self.keys[tokens] = idx
+            for token in set(tokens):
+                self.postings.setdefault(token, []).append(idx)
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, tokens):
+        """
+        Positions of the roster names sharing at least one of `tokens`,
+        the only ones `token_score` can score above 0.
+        """
+        candidates = set()
+        for token in set(tokens):
+            candidates.update(self.postings.get(token, []))
+
+        return candidates
+
+    def match(self, name, min_score=NAME_MATCH_MIN):
+        """
+        Finds the roster name that best matches `name`.
+
+        Parameters
+        ----------
+        name: string
+            name to look up, e.g. the `Speaker` of the AJC schedule
+
+        min_score: float, optional (default = `NAME_MATCH_MIN`)
+            matches with a lower confidence are rejected
+
+        Returns
+        --------
+        match_name: string or NoneType
+            roster name, or `None` if no match reached `min_score`
+
+        score: float
+            confidence of the best match, between 0 and 1
+        """
+        tokens = name_tokens(name)
+        if tokens in self.keys:
+            return self.names[self.keys[tokens]], 1.
+        best_idx, best_score = None, 0.
+        query_set = set(tokens)
+        for idx in sorted(self.candidates(tokens)):
+            score = token_score(query_set, self.tokens[idx])
+            if score > best_score:
+                best_idx, best_score = idx, score
+        if (best_idx is None) or (best_score < min_score):
+            return None, best_score
+
+        return self.names[best_idx], best_score
+
+def token_score(tokens_a, tokens_b):
+    """
+    Similarity of two sets of name tokens, between 0 and 1. See the
+    module docstring.
+    """
+    short_set, long_set = sorted([tokens_a, tokens_b], key=len)
+    # A single token (e.g. only a last name) is too ambiguous
+    if (len(short_set) < 2) or (not short_set.intersection(long_set)):
+        return 0.
+    long_grams = [(token, ngrams([token])) for token in long_set]
+    sim_list = []
+    for token in short_set:
+        if token in long_set:
+            sim_list.append(1.)
+            continue
+        grams = ngrams([token])
+        sim_list.append(max(2. * len(grams & grams_ii) / (len(grams) + len(grams_ii))
+                            for token_ii, grams_ii in long_grams))
+    score = sum(sim_list) / len(sim_list)
+    if tokens_a != tokens_b:
+        score = min(score, SUBSET_SCORE)
+
+    return score
+
+def load_index(names):
+    """
+    Returns the `NameIndex` of `names`, from the cache if it was already
+    built for the same roster.
+
+    Parameters
+    ----------
+    names: list
+        roster names
+
+    Returns
+    --------
+    name_index: `NameIndex`
+        index of `names`
+    """
+    names  = [str(name) for name in names]
+    digest = hashlib.sha1('\n'.join([str(INDEX_VERSION)] + names)
+                .encode('utf-8')).hexdigest()
+    index_path = ajc_cache.cache_path('name_index.pkl')
+    try:
+        with open(index_path, 'rb') as index_file:
+            index_digest, name_index = pickle.load(index_file)
+        if index_digest == digest:
+            return name_index
+    except Exception:
+        pass
+    name_index = NameIndex(names)
+    ajc_cache.atomic_write(index_path,
+        pickle.dumps((digest, name_index), protocol=2))
+
+    return name_index
@@ -0,0 +1,419 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Durable outbox for the emails of `AJC_Reminders`.
+
+`AJC_Reminders` renders each email and writes it to the spool with
+`Outbox.send`, which returns right away. Running this file drains the
+spool: messages are sent with `ajc_mail.Mailer`, failures are retried with
+exponential backoff, and messages that keep failing are moved to the
+dead-letter directory. With `--until`, the worker keeps running and
+retries failed messages as they come due, until the spool is empty or the
+given time of the day.
+
+Each message has a dedupe key built from (speaker, date, kind), so that
+re-running `AJC_Reminders` never queues, nor sends, the same email twice.
+
+Spool layout (inside `AJC_CACHE_DIR/outbox`):
+
+    - `pending/<key>.json` : messages waiting to be sent
+    - `sent/<key>.json`    : receipts of messages that were sent
+    - `dead/<key>.json`    : messages that failed `OUTBOX_MAX_ATTEMPTS` times
+
+Usage:
+
+    python AJC_Scheduler/ajc_outbox.py [--until HH:MM]
+"""
+import os
+import sys
+import json
+import time
+import fcntl
+import random
+import hashlib
+import smtplib
+import argparse
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import ajc_cache
+import ajc_mail
+
+## Defaults
+# Maximum number of delivery attempts before dead-lettering a message
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('ajc_outbox_max_attempts', 8))
+# Delay (in seconds) before the first retry. Doubles after every attempt
+OUTBOX_BASE_DELAY   = float(os.environ.get('ajc_outbox_base_delay', 60))
+# Maximum delay (in seconds) between two attempts
+OUTBOX_MAX_DELAY    = float(os.environ.get('ajc_outbox_max_delay', 6 * 3600))
+# Number of SMTP sessions used in parallel by the worker
+OUTBOX_WORKERS      = int(os.environ.get('ajc_outbox_workers', 2))
+# Spool states
+SPOOL_STATES = ['pending', 'sent', 'dead']
+
+def dedupe_key(speaker, date, kind):
+    """
+    Key identifying one email of the AJC pipeline.
+
+    Parameters
+    ----------
+    speaker: string
+        speaker the email is about (`Last_First`)
+
+    date: string
+        AJC date (`YYYY-MM-DD`)
+
+    kind: string
+        type of email, e.g. `reminder` or `announcement`
+
+    Returns
+    --------
+    key: string
+        SHA-1 hex-digest of (speaker, date, kind)
+    """
+    key_str = '|'.join([str(speaker), str(date), str(kind)])
+
+    return hashlib.sha1(key_str.encode('utf-8')).hexdigest()
+
+class Outbox(object):
+    """
+    On-disk spool of rendered emails.
+    """
+    # Messages are only queued by `send`, and sent by `drain`
+    queues = True
+
+    def __init__(self, spool_dir=None, my_email=None):
+        """
+        Parameters
+        ----------
+        spool_dir: string, optional (default = `AJC_CACHE_DIR/outbox`)
+            directory of the spool
+
+        my_email: string, optional
+            sender address. By default, taken from `ajc_email`.
+        """
+        if spool_dir is None:
+            spool_dir = ajc_cache.cache_path('outbox')
+        self.spool_dir = spool_dir
+        self.my_email  = my_email or os.environ.get('ajc_email')
+        for state in SPOOL_STATES:
+            state_dir = os.path.join(self.spool_dir, state)
+            if not os.path.isdir(state_dir):
+                os.makedirs(state_dir)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def path(self, state, key):
+        """
+        Path to the file of message `key` in `state`.
+        """
+        return os.path.join(self.spool_dir, state, key + '.json')
+
+    def state(self, key):
+        """
+        State of message `key` (`pending`, `sent` or `dead`), or `None`
+        if it has never been queued.
+        """
+        for state in SPOOL_STATES:
+            if os.path.exists(self.path(state, key)):
+                return state
+
+        return None
+
+    def send(self, msg, to_list, from_email=None, dedupe=None):
+        """
+        Writes `msg` to the spool. Same interface as `ajc_mail.Mailer.send`.
+
+        Parameters
+        ----------
+        msg: `email.message.Message`
+            message to send
+
+        to_list: list
+            list of recipients
+
+        from_email: string, optional (default = `my_email`)
+            envelope sender
+
+        dedupe: tuple, optional
+            (speaker, date, kind) of the message. If `None`, the key is
+            built from the message itself.
+
+        Returns
+        --------
+        queued: boolean
+            False if the message had already been queued or sent.
+        """
+        msg_str = msg.as_string()
+        if dedupe is None:
+            key = hashlib.sha1(msg_str.encode('utf-8')).hexdigest()
+            dedupe = ('', '', msg.get('Subject', ''))
+        else:
+            key = dedupe_key(*dedupe)
+        state = self.state(key)
+        if state is not None:
+            sys.stderr.write('{0}\t Skipping `{1}` email for `{2}` ({3}): already {4}\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), dedupe[2],
+                dedupe[0], dedupe[1], state))
+            return False
+        envelope = {'key'         : key,
+                    'speaker'     : dedupe[0],
+                    'date'        : dedupe[1],
+                    'kind'        : dedupe[2],
+                    'from'        : from_email or self.my_email,
+                    'to'          : list(to_list),
+                    'message'     : msg_str,
+                    'created'     : time.time(),
+                    'attempts'    : 0,
+                    'next_attempt': 0,
+                    'last_error'  : None}
+        ajc_cache.atomic_write(self.path('pending', key),
+            json.dumps(envelope).encode('utf-8'))
+        sys.stderr.write('{0}\t Queued `{1}` email for `{2}` ({3})\n'.format(
+            datetime.datetime.now().strftime("%x %a %X"), dedupe[2], dedupe[0],
+            dedupe[1]))
+
+        return True
+
+    def close(self):
+        """
+        Nothing to close. Kept for compatibility with `ajc_mail.Mailer`.
+        """
+        pass
+
+    def pending(self, now=None):
+        """
+        Pending messages whose next attempt is due.
+
+        Returns
+        --------
+        envelopes: list
+            list of envelopes, oldest first
+        """
+        now = time.time() if now is None else now
+        envelopes = []
+        pending_dir = os.path.join(self.spool_dir, 'pending')
+        for file_ii in sorted(os.listdir(pending_dir)):
+            if not file_ii.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(pending_dir, file_ii), 'r') as env_file:
+                    envelope = json.load(env_file)
+            except (IOError, OSError, ValueError):
+                continue
+            if envelope['next_attempt'] <= now:
+                envelopes.append(envelope)
+        envelopes.sort(key=lambda envelope: envelope['created'])
+
+        return envelopes
+
+    def mark_sent(self, envelope):
+        """
+        Moves `envelope` to `sent`, keeping a receipt without the body.
+        """
+        receipt = dict(envelope, message=None, sent=time.time())
+        ajc_cache.atomic_write(self.path('sent', envelope['key']),
+            json.dumps(receipt).encode('utf-8'))
+        os.remove(self.path('pending', envelope['key']))
+
+    def mark_failed(self, envelope, error, permanent=False,
+        max_attempts=OUTBOX_MAX_ATTEMPTS, base_delay=OUTBOX_BASE_DELAY,
+        max_delay=OUTBOX_MAX_DELAY):
+        """
+        Schedules the next attempt of `envelope`, with exponential backoff
+        and jitter, or moves it to `dead` after `max_attempts` attempts or
+        a permanent error.
+        """
+        envelope['attempts']  += 1
+        envelope['last_error'] = str(error)
+        if permanent or (envelope['attempts'] >= max_attempts):
+            ajc_cache.atomic_write(self.path('dead', envelope['key']),
+                json.dumps(envelope).encode('utf-8'))
+            os.remove(self.path('pending', envelope['key']))
+            sys.stderr.write('{0}\t Dead-lettered `{1}` email for `{2}` ({3}): {4}\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), envelope['kind'],
+                envelope['speaker'], envelope['date'], error))
+            return
+        delay = min(max_delay, base_delay * 2**(envelope['attempts'] - 1))
+        delay *= random.uniform(0.9, 1.1)
+        envelope['next_attempt'] = time.time() + delay
+        ajc_cache.atomic_write(self.path('pending', envelope['key']),
+            json.dumps(envelope).encode('utf-8'))
+        sys.stderr.write('{0}\t Could not send `{1}` email for `{2}` ({3}), retrying in {4:.0f} s: {5}\n'.format(
+            datetime.datetime.now().strftime("%x %a %X"), envelope['kind'],
+            envelope['speaker'], envelope['date'], delay, error))
+
+def drain_batch(outbox, envelopes, mailer_factory=ajc_mail.Mailer):
+    """
+    Sends `envelopes` over one SMTP session.
+
+    Returns
+    --------
+    n_sent: int
+        number of messages that were sent
+    """
+    n_sent = 0
+    mailer = mailer_factory()
+    try:
+        for envelope in envelopes:
+            try:
+                mailer.send_raw(envelope['message'], envelope['to'],
+                    from_email=envelope['from'])
+            except (smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPSenderRefused) as err:
+                outbox.mark_failed(envelope, err, permanent=True)
+                continue
+            except (smtplib.SMTPException, OSError) as err:
+                # Session is likely unusable. Starting a new one
+                mailer.reset()
+                outbox.mark_failed(envelope, err)
+                continue
+            outbox.mark_sent(envelope)
+            n_sent += 1
+            sys.stderr.write('{0}\t Sent `{1}` email for `{2}` ({3})\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), envelope['kind'],
+                envelope['speaker'], envelope['date']))
+    finally:
+        try:
+            mailer.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    return n_sent
+
+def drain(outbox=None, max_workers=OUTBOX_WORKERS,
+    mailer_factory=ajc_mail.Mailer):
+    """
+    Sends every pending message that is due, using up to `max_workers`
+    SMTP sessions in parallel. Only one worker drains the spool at a time.
+
+    Parameters
+    ----------
+    outbox: `Outbox`, optional
+        spool to drain. By default, `Outbox()`.
+
+    max_workers: int, optional (default = `OUTBOX_WORKERS`)
+        maximum number of SMTP sessions used at the same time
+
+    mailer_factory: callable, optional (default = `ajc_mail.Mailer`)
+        returns a new `ajc_mail.Mailer`
+
+    Returns
+    --------
+    n_sent: int or NoneType
+        number of messages that were sent, or `None` if another worker
+        holds the lock of the spool
+    """
+    outbox = Outbox() if outbox is None else outbox
+    lock_file = open(os.path.join(outbox.spool_dir, 'worker.lock'), 'w')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except (IOError, OSError):
+        sys.stderr.write('{0}\t Another outbox worker is running. Exiting\n'.format(
+            datetime.datetime.now().strftime("%x %a %X")))
+        lock_file.close()
+        return None
+    try:
+        envelopes = outbox.pending()
+        if len(envelopes) == 0:
+            return 0
+        n_workers = max(1, min(max_workers, len(envelopes)))
+        batches = [envelopes[ii::n_workers] for ii in range(n_workers)]
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            n_sent = sum(executor.map(lambda batch: drain_batch(outbox, batch,
+                        mailer_factory=mailer_factory), batches))
+    finally:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    return n_sent
+
+def drain_until(deadline, outbox=None, sleep=time.sleep, **kwargs):
+    """
+    Drains the outbox repeatedly, sleeping until the next retry is due,
+    until no message is pending or the next retry falls after `deadline`.
+    Returns right away if another worker is draining the spool, since that
+    worker retries the same messages.
+
+    Parameters
+    ----------
+    deadline: float
+        time (in seconds since the epoch) after which no retry is made
+
+    outbox: `Outbox`, optional
+        spool to drain. By default, `Outbox()`.
+
+    sleep: callable, optional (default = `time.sleep`)
+        waits for the given number of seconds
+
+    kwargs: dict
+        other arguments of `drain`
+
+    Returns
+    --------
+    n_sent: int
+        number of messages that were sent
+    """
+    outbox = Outbox() if outbox is None else outbox
+    n_sent = 0
+    while True:
+        n_batch = drain(outbox, **kwargs)
+        if n_batch is None:
+            return n_sent
+        n_sent += n_batch
+        # Every pending message, due or not
+        envelopes = outbox.pending(now=float('inf'))
+        if len(envelopes) == 0:
+            return n_sent
+        next_attempt = min(envelope['next_attempt'] for envelope in envelopes)
+        if next_attempt > deadline:
+            sys.stderr.write('{0}\t {1} email(s) still pending. Next retry is after the {2} deadline\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), len(envelopes),
+                datetime.datetime.fromtimestamp(deadline).strftime('%H:%M')))
+            return n_sent
+        sleep(max(0., next_attempt - time.time()))
+
+def get_parser():
+    """
+    Command-line arguments of the worker.
+
+    Returns
+    --------
+    parser: `argparse.ArgumentParser`
+        parser of the command-line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Sends the emails queued by `AJC_Reminders`')
+    parser.add_argument('--until', metavar='HH:MM',
+        help=('keep retrying failed emails until this time of the day, '
+              'instead of draining the outbox once'))
+
+    return parser
+
+def main(args=None):
+    """
+    Drains the outbox of `AJC_Reminders`.
+
+    Parameters
+    ----------
+    args: list, optional
+        command-line options. See `get_parser`.
+    """
+    args = get_parser().parse_args(args)
+    if args.until is None:
+        drain()
+        return
+    until = datetime.datetime.strptime(args.until, '%H:%M').time()
+    deadline = datetime.datetime.combine(datetime.date.today(), until)
+    drain_until(time.mktime(deadline.timetuple()))
+
+# Main function
+if __name__=='__main__':
+    main()
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Compact store of the graduate-student and faculty rosters.
+
+Each person is a `Person` record (with `__slots__`), indexed by
+`full_name` and by email. The roster is saved to a small binary file,
+read back in one go, so that looking up a speaker does not need `pandas`.
+A file that is truncated, or whose records do not match its header, raises
+`RosterError`.
+
+File layout:
+
+    - `MAGIC` (5 bytes)
+    - digest of the pages the roster was parsed from (20 bytes)
+    - number of people (unsigned int, 4 bytes)
+    - for each person, each field in `Person.__slots__`: length (unsigned
+      short, 2 bytes, `NULL_LEN` for `None`) followed by the UTF-8 bytes.
+"""
+import struct
+
+import ajc_cache
+
+## File format
+MAGIC    = b'AJCR\x01'
+NULL_LEN = 0xFFFF
+# Bytes before the first record: `MAGIC`, digest and number of people
+HEADER_LEN = len(MAGIC) + 20 + 4
+
+class RosterError(ValueError):
+    """
+    Raised when a roster file is truncated or corrupt.
+    """
+    pass
+
+class Person(object):
+    """
+    One person of the roster.
+    """
+    __slots__ = ('full_name', 'first_name', 'last_name', 'email',
+                 'people_type')
+
+    def __init__(self, full_name, first_name=None, last_name=None,
+        email=None, people_type=None):
+        self.full_name   = full_name
+        self.first_name  = first_name
+        self.last_name   = last_name
+        self.email       = email
+        self.people_type = people_type
+
+    def __repr__(self):
+        return 'Person({0!r}, {1!r})'.format(self.full_name, self.email)
+
+    def to_dict(self):
+        """
+        Fields of the person, as a dictionary.
+        """
+        return dict((field, getattr(self, field)) for field in self.__slots__)
+
+class Roster(object):
+    """
+    List of `Person` records, indexed by `full_name` and email.
+    """
+    def __init__(self, people=None):
+        """
+        Parameters
+        ----------
+        people: list, optional
+            list of `Person` records. The first record of each `full_name`
+            is kept.
+        """
+        self.people   = []
+        self.by_name  = {}
+        self.by_email = {}
+        for person in people or []:
+            if person.full_name in self.by_name:
+                continue
+            self.people.append(person)
+            self.by_name[person.full_name] = person
+            if person.email:
+                self.by_email.setdefault(person.email.lower(), person)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Builds a roster from a list of dictionaries with the fields of
+        `Person`.
+        """
+        return cls([Person(**dict((field, rec.get(field))
+                        for field in Person.__slots__)) for rec in records])
+
+    def __len__(self):
+        return len(self.people)
+
+    def __iter__(self):
+        return iter(self.people)
+
+    def names(self):
+        """
+        `full_name` of every person, in order.
+        """
+        return [person.full_name for person in self.people]
+
+    def get(self, full_name):
+        """
+        Person with `full_name`, or `None`.
+        """
+        return self.by_name.get(full_name)
+
+    def get_email(self, email):
+        """
+        Person with `email` (case-insensitive), or `None`.
+        """
+        return self.by_email.get(str(email).lower())
+
+    def save(self, path, digest):
+        """
+        Writes the roster to `path`.
+
+        Parameters
+        ----------
+        path: string
+            path to the output file
+
+        digest: string
+            hex-digest of the pages the roster was parsed from
+        """
+        chunks = [MAGIC, bytes.fromhex(digest)[:20].ljust(20, b'\0'),
+                  struct.pack('<I', len(self.people))]
+        for person in self.people:
+            for field in Person.__slots__:
+                value = getattr(person, field)
+                if value is None:
+                    chunks.append(struct.pack('<H', NULL_LEN))
+                    continue
+                value = str(value).encode('utf-8')[:NULL_LEN - 1]
+                chunks.append(struct.pack('<H', len(value)))
+                chunks.append(value)
+        ajc_cache.atomic_write(path, b''.join(chunks))
+
+    @classmethod
+    def load(cls, path, digest=None):
+        """
+        Reads the roster saved at `path`.
+
+        Parameters
+        ----------
+        path: string
+            path to the file written by `save`
+
+        digest: string, optional
+            if given, `None` is returned unless the roster was parsed from
+            pages with this digest
+
+        Returns
+        --------
+        roster: `Roster` or `NoneType`
+            the roster, or `None` if the file is missing or stale
+
+        Raises
+        --------
+        RosterError
+            if the file is truncated, or its records do not match its
+            header
+        """
+        try:
+            with open(path, 'rb') as roster_file:
+                buf = roster_file.read()
+        except (IOError, OSError):
+            return None
+        if len(buf) < HEADER_LEN:
+            raise RosterError('Roster file `{0}` is truncated ({1} bytes)'
+                .format(path, len(buf)))
+        if buf[:len(MAGIC)] != MAGIC:
+            raise RosterError('`{0}` is not a roster file'.format(path))
+        offset = len(MAGIC)
+        if (digest is not None) and \
+            (buf[offset:offset + 20] != bytes.fromhex(digest)[:20].ljust(20, b'\0')):
+            return None
+        offset += 20
+        n_people, = struct.unpack_from('<I', buf, offset)
+        offset += 4
+        people = []
+        try:
+            for ii in range(n_people):
+                values = []
+                for field in Person.__slots__:
+                    length, = struct.unpack_from('<H', buf, offset)
+                    offset += 2
+                    if length == NULL_LEN:
+                        values.append(None)
+                        continue
+                    if offset + length > len(buf):
+                        raise struct.error('field past the end of the file')
+                    values.append(buf[offset:offset + length].decode('utf-8'))
+                    offset += length
+                people.append(Person(*values))
+        except (struct.error, UnicodeDecodeError) as err:
+            raise RosterError('Roster file `{0}` is corrupt at record {1} of {2}: {3}'
+                .format(path, len(people) + 1, n_people, err))
+        if offset != len(buf):
+            raise RosterError('Roster file `{0}` has {1} bytes after its {2} records'
+                .format(path, len(buf) - offset, n_people))
+
+        return cls(people)
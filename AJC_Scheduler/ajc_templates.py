@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Email templates of `AJC_Reminders`.
+
+Each email (`reminder`, `speaker_not_found`, `announcement` and the
+roster-wide `signup`) has an HTML and a text template. Templates are
+compiled once per process, with the signature block (`ajc_name`,
+`ajc_email`, `ajc_website`) already filled in, so rendering a message is a
+single substitution per part. Both parts are rendered from the same
+context.
+"""
+import os
+import html
+from string import Template
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+## Signature blocks. `$sig_*` are filled in when the templates are compiled
+SIGNATURE_HTML = ('-'*130 + '<br />'
+                  '$sig_name<br />'
+                  "Email: <a href='mailto:$sig_email'>$sig_email</a><br />"
+                  "Website: <a href='$sig_website' target='_blank'>$sig_website</a><br />")
+SIGNATURE_TEXT = ('-'*100 + '\r\n'
+                  '$sig_name\r\n'
+                  'Email: $sig_email\r\n'
+                  'Website: $sig_website\r\n')
+
+## Templates: subject, HTML and text of each email
+TEMPLATES = {
+    'reminder': {
+        'subject': 'Astronomy Journal Club',
+        'html'   : ('<html><head></head><body><p>'
+                    'Hi $first_name,<br /><br />'
+                    'Could you please send me the name and arXiv link to the '
+                    'paper that you will be presenting at AJC by today at 8pm?'
+                    ' <br /><br />'
+                    'Thanks!<br />'
+                    + SIGNATURE_HTML +
+                    '</p></body></html>'),
+        'text'   : ('Hi $first_name,\r\n\r\n'
+                    'Could you please send me the name and arXiv link to the '
+                    'paper that you will be presenting at AJC by today at 8pm?\r\n\r\n'
+                    'Thanks!\r\n'
+                    + SIGNATURE_TEXT)},
+    'speaker_not_found': {
+        'subject': 'Astronomy Journal Club - Speaker not Faculty / Grad Student',
+        'html'   : ('<html><head></head><body><p>'
+                    'The speaker for `$speaker` could not be found! <br /><br />'
+                    '${candidate_line}'
+                    'Please email them directly today to obtain their title '
+                    'before 8pm today! <br /><br />'
+                    'Thanks!<br />'
+                    + SIGNATURE_HTML +
+                    '</p></body></html>'),
+        'text'   : ('The speaker for `$speaker` could not be found!\r\n\r\n'
+                    '${candidate_line}'
+                    'Please email them directly today to obtain their title '
+                    'before 8pm today!\r\n\r\n'
+                    'Thanks!\r\n'
+                    + SIGNATURE_TEXT)},
+    'announcement': {
+        'subject': 'Astronomy Journal Club',
+        'html'   : ('<html><head></head><body><p>'
+                    'Hello AJCers,<br/><br/>'
+                    "This week's AJC will be: <br /><br />"
+                    'Title            : "$title"<br />'
+                    'Author  : $author et al. ($year)<br />'
+                    '${link_line}'
+                    'Speaker : $first_name $last_name<br />'
+                    'Time    : $date_str @ 12pm<br />'
+                    "Location: <a href='$location'>$location</a><br />"
+                    'See you all there!<br /><br />'
+                    'Thanks!<br />'
+                    + SIGNATURE_HTML +
+                    '</p></body></html>'),
+        'text'   : ('Hello AJCers,\r\n\r\n'
+                    "This week's AJC will be:\r\n\r\n"
+                    'Title   : "$title"\r\n'
+                    'Author  : $author et al. ($year)\r\n'
+                    '${link_line}'
+                    'Speaker : $first_name $last_name\r\n'
+                    'Time    : $date_str @ 12pm\r\n'
+                    'Location: $location\r\n\r\n'
+                    'See you all there!\r\n\r\n'
+                    'Thanks!\r\n'
+                    + SIGNATURE_TEXT)},
+    'signup': {
+        'subject': 'Astronomy Journal Club - Schedule',
+        'html'   : ('<html><head></head><body><p>'
+                    'Hi $first_name,<br /><br />'
+                    "This semester's AJC schedule is now available at "
+                    "<a href='$ajc_url'>$ajc_url</a>.<br /><br />"
+                    'If you would like to present, please sign up for one '
+                    'of the open dates.<br /><br />'
+                    'Thanks!<br />'
+                    + SIGNATURE_HTML +
+                    '</p></body></html>'),
+        'text'   : ('Hi $first_name,\r\n\r\n'
+                    "This semester's AJC schedule is now available at "
+                    '$ajc_url.\r\n\r\n'
+                    'If you would like to present, please sign up for one '
+                    'of the open dates.\r\n\r\n'
+                    'Thanks!\r\n'
+                    + SIGNATURE_TEXT)},
+    }
+# Optional `Link` line of the announcement, when a link was found
+LINK_LINE = {'html': 'Link    : $link<br/>', 'text': 'Link    : $link\r\n'}
+# Optional line of `speaker_not_found`, when a roster name was close
+CANDIDATE_LINE = {
+    'html': ('The closest name in the rosters is $candidate, but the match is '
+             'not certain enough to email them. <br /><br />'),
+    'text': ('The closest name in the rosters is $candidate, but the match is '
+             'not certain enough to email them.\r\n\r\n')}
+# Optional lines: placeholder -> (context key, templates)
+OPTIONAL_LINES = {'link_line'     : ('link', LINK_LINE),
+                  'candidate_line': ('candidate', CANDIDATE_LINE)}
+
+## Compiled templates. Filled in by `get_template`
+_compiled = {}
+
+def signature():
+    """
+    Values of the signature block, read from the environment.
+
+    Returns
+    --------
+    sig_dict: dict
+        `sig_name`, `sig_email` and `sig_website` values
+    """
+    sig_dict = {'sig_name'   : os.environ.get('ajc_name'),
+                'sig_email'  : os.environ.get('ajc_email'),
+                'sig_website': os.environ.get('ajc_website')}
+
+    return sig_dict
+
+class MessageTemplate(object):
+    """
+    Compiled subject, HTML and text templates of one email.
+    """
+    def __init__(self, name, subject, html_str, text_str, sig_dict):
+        """
+        Parameters
+        ----------
+        name: string
+            name of the template
+
+        subject, html_str, text_str: string
+            `string.Template` strings of the subject, HTML and text parts
+
+        sig_dict: dict
+            values of the signature block, filled in right away
+        """
+        # `$` is doubled, so that it is not read as a placeholder later on
+        sig_text = dict((key, str(val).replace('$', '$$'))
+                        for key, val in sig_dict.items())
+        sig_html = dict((key, html.escape(val, quote=True))
+                        for key, val in sig_text.items())
+        self.name    = name
+        self.subject = Template(subject)
+        self.html    = Template(Template(html_str).safe_substitute(sig_html))
+        self.text    = Template(Template(text_str).safe_substitute(sig_text))
+
+    def render(self, context):
+        """
+        Renders the subject, HTML and text parts from one `context`.
+
+        Parameters
+        ----------
+        context: dict
+            values of the placeholders. Values are escaped for the HTML part.
+
+        Returns
+        --------
+        subject, html_str, text_str: string
+            rendered subject and parts
+        """
+        context_str  = dict((key, '' if val is None else str(val))
+                            for key, val in context.items())
+        context_html = dict((key, html.escape(val, quote=True))
+                            for key, val in context_str.items())
+        # Optional lines, only shown when their value is given
+        for line_key, (key, line_dict) in OPTIONAL_LINES.items():
+            value = context_str.get(key)
+            context_str[line_key]  = Template(line_dict['text']).substitute(
+                {key: value}) if value else ''
+            context_html[line_key] = Template(line_dict['html']).substitute(
+                {key: context_html[key]}) if value else ''
+        subject  = self.subject.substitute(context_str)
+        html_str = self.html.substitute(context_html)
+        text_str = self.text.substitute(context_str)
+
+        return subject, html_str, text_str
+
+    def render_many(self, context_list):
+        """
+        Renders the template once per context in `context_list`, e.g. for
+        bulk sends and previews. See `render`.
+
+        Returns
+        --------
+        rendered_list: list
+            list of (subject, html_str, text_str) tuples
+        """
+        return [self.render(context) for context in context_list]
+
+    def message(self, context, from_email, to_email):
+        """
+        Renders the template into a `multipart/alternative` message.
+
+        Parameters
+        ----------
+        context: dict
+            values of the placeholders
+
+        from_email, to_email: string
+            sender and recipient of the message
+
+        Returns
+        --------
+        msg: `email.mime.multipart.MIMEMultipart`
+            message with a text and an HTML part
+        """
+        subject, html_str, text_str = self.render(context)
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'   ] = from_email
+        msg['To'     ] = to_email
+        msg.add_header('reply-to', from_email)
+        # The last part is the one preferred by email clients
+        msg.attach(MIMEText(text_str, 'plain'))
+        msg.attach(MIMEText(html_str, 'html'))
+
+        return msg
+
+def get_template(name):
+    """
+    Returns the compiled template `name`, compiling it on first use.
+
+    Parameters
+    ----------
+    name: string
+        name of the template. One of the keys of `TEMPLATES`.
+
+    Returns
+    --------
+    template: `MessageTemplate`
+        compiled template
+    """
+    template = _compiled.get(name)
+    if template is None:
+        if name not in TEMPLATES:
+            msg = '>> `name` ({0}) is not a valid template ({1})! Exit!'
+            msg = msg.format(name, sorted(TEMPLATES.keys()))
+            raise ValueError(msg)
+        template = MessageTemplate(name, TEMPLATES[name]['subject'],
+                        TEMPLATES[name]['html'], TEMPLATES[name]['text'],
+                        signature())
+        _compiled[name] = template
+
+    return template
+
+def build_message(name, context, from_email, to_email):
+    """
+    Renders template `name` into a message. See `MessageTemplate.message`.
+    """
+    return get_template(name).message(context, from_email, to_email)
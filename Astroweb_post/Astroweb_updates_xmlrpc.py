@@ -7,15 +7,17 @@ Astronomy Group wordpress site.
 'Events' section contains the latest post in the category 'Events', so updating
 the section is the same as adding new posts with the category set to 'Events'.
 
-This script use python module 'xmlrpc' to communicate the XML-RPC protocol of
-wordpress. Please make sure the XML-RPC option is on in the wordpress setting.
+This script use python module 'xmlrpc.client' (through `wp_xmlrpc`) to
+communicate the XML-RPC protocol of wordpress. Please make sure the XML-RPC
+option is on in the wordpress setting.
 You can find it at 'Settings - Writing - Remote Publishing - XML-RPC'.
 
 Python module 'datetime' is used to get the time and date, then the script
-decides which notices to send based on the date.
+decides which notices to send based on the date. Events and breaks are
+declared in `event_calendar.json` (see `event_calendar`).
 
-Each kind of notice has a individual function. You can edit the contents as
-needed. 
+Each kind of notice has an individual `build_*` function. You can edit the
+contents as needed. 
 
 This script is supposed to be used together with crontab. Set the crontab with
 great care to automatically run this scrip. 
@@ -24,18 +26,34 @@ great care to automatically run this scrip.
 because the wordpress editor's password is in plain text in the script!!
 
 """
-import string
 import datetime
+import argparse
 import time
-import xmlrpclib
 import sys
 import os
 
+import wp_xmlrpc
+import wp_async
+import wp_ledger
+import event_calendar
+
+# Time of the day at which scheduled (`--bulk`) posts are published
+WP_POST_TIME = datetime.datetime.strptime(
+    os.environ.get('wp_post_time', '07:00'), '%H:%M').time()
+
+# Shared ledger of published posts. Opened on first use by `post_ledger`
+_post_ledger = None
+
 ## Functions
-def now_dict_calc():
+def now_dict_calc(now=None):
     """
     Produces python dictionary with datetime information
-    
+
+    Parameters
+    ----------
+    now: `datetime.datetime`, optional
+        date and time to use. By default, the current date and time.
+
     Returns
     --------
     now_dict: python dictionary
@@ -43,7 +61,7 @@ def now_dict_calc():
         Keys: 'weekday', 'month', 'day', 'now', 'now_str'
     """
     # Get date and time
-    now = datetime.datetime.now()
+    now = datetime.datetime.now() if now is None else now
     # Format date and time as needed
     weekday = now.strftime("%a")
     month   = now.strftime("%b")
@@ -66,41 +84,35 @@ def assert_env_vars():
         msg = '>> `Keyerror`'
         raise ValueError(msg)
 
-def sendpost(blog_content):
+def post_ledger():
     """
-    Use XML-RPC protocol to post to the Astro wordpress site.
-    Use python module xmlrpc to communicate with wordpress XML-RPC.  
+    Returns the ledger of published posts, opening it on first use.
+
+    Returns
+    --------
+    _post_ledger: `wp_ledger.PostLedger`
+        ledger of the posts, keyed by (event, date)
     """
-    # Verifying environment keys
-    assert_env_vars()
-    # Wordpress URL and Account
-    wp_url      = "https://as.vanderbilt.edu/astronomy/manage/xmlrpc.php"
-    wp_username = os.environ['wp_username']
-    wp_password = os.environ['wp_password']
-    # Blog ID - Wordpress doesn't use this ID, so it can be anything
-    wp_blogid = ""
-    # Status
-    status_draft = 0
-    status_published = 1
-    # Initializing server
-
-    server = xmlrpclib.ServerProxy(wp_url)
-    # Posing to Wordpress
-    post_id = server.metaWeblog.newPost(wp_blogid,
-                                        wp_username,
-                                        wp_password,
-                                        blog_content,
-                                        status_published)
-
-def sendAstroLunchNotice(now_dict):
+    global _post_ledger
+    if _post_ledger is None:
+        _post_ledger = wp_ledger.PostLedger()
+
+    return _post_ledger
+
+def build_astrolunch_notice(now_dict):
     """
-    Sends notice about `AstroLunch`
+    Builds the notice about `AstroLunch`
 
     Parameters
     ----------
     now_dict: python dictionary
         dictionary with datetime information
         Keys: 'weekday', 'month', 'day', 'now', 'now_str'
+
+    Returns
+    --------
+    blog_content: python dictionary
+        post, with `title`, `description` and `categories` keys
     """
     # Blog - Title
     title = 'AstroLunch, {0}. {1}. {2} at noon, sc 6333'.format(
@@ -119,18 +131,22 @@ def sendAstroLunchNotice(now_dict):
     # Blog - Details
     categories = ["Events"]
     blog_content = {'title': title, 'description': content, 'categories': categories}
-    # Posting Post
-    sendpost(blog_content)
+    return blog_content
 
-def sendAJCNotice(now_dict):
+def build_ajc_notice(now_dict):
     """
-    Sends notice about `Astronomy Journal Club`
+    Builds the notice about `Astronomy Journal Club`
 
     Parameters
     ----------
     now_dict: python dictionary
         dictionary with datetime information
         Keys: 'weekday', 'month', 'day', 'now', 'now_str'
+
+    Returns
+    --------
+    blog_content: python dictionary
+        post, with `title`, `description` and `categories` keys
     """
     # Blog - Title
     title = 'Astronomy Journal Club, {0}. {1}. {2} at noon, SC 6333'.format(
@@ -145,18 +161,22 @@ def sendAJCNotice(now_dict):
     # Blog - Details
     categories   = ["Events"]
     blog_content = {'title': title, 'description': content, 'categories': categories}
-    # Posting Post
-    sendpost(blog_content)
+    return blog_content
 
-def sendAstroBrewNotice(now_dict):
+def build_astrobrew_notice(now_dict):
     """
-    Sends notice about `AstroBrew`
+    Builds the notice about `AstroBrew`
 
     Parameters
     ----------
     now_dict: python dictionary
         dictionary with datetime information
         Keys: 'weekday', 'month', 'day', 'now', 'now_str'
+
+    Returns
+    --------
+    blog_content: python dictionary
+        post, with `title`, `description` and `categories` keys
     """
     # Blog - Title
     title = 'AstroBrew, {0}. {1}. {2} at 11am, SC 6333'.format(
@@ -175,18 +195,22 @@ def sendAstroBrewNotice(now_dict):
     # Blog - Details
     categories   = ["Events"]
     blog_content = {'title': title, 'description': content, 'categories': categories}
-    # Posting Post
-    sendpost(blog_content)
+    return blog_content
 
-def sendVinoNotice(now_dict):
+def build_vino_notice(now_dict):
     """
-    Sends notice about `Vino de Vida`
+    Builds the notice about `Vino de Vida`
 
     Parameters
     ----------
     now_dict: python dictionary
         dictionary with datetime information
         Keys: 'weekday', 'month', 'day', 'now', 'now_str'
+
+    Returns
+    --------
+    blog_content: python dictionary
+        post, with `title`, `description` and `categories` keys
     """
     # Blog - Title
     title = 'Vino de Vida, {0}. {1}. {2} at 4pm, 9th floor hallway'.format(
@@ -194,68 +218,219 @@ def sendVinoNotice(now_dict):
                     now_dict['month'],
                     now_dict['day'])
     # Blog - Content
-    content = string.join((
+    content = "\r\n".join((
         'Vino da Vida happens every Friday at 4pm in the 9th floor hallway. ', 
         'We have casual discussion over a glass of wine, beer, or soda to unwind and celebrate the end of the week.'
-        ), "\r\n")
+        ))
     # Blog - Details
     categories   = ["Events"]
     blog_content = {'title': title, 'description': content, 'categories': categories}
-    # Posting Post
-    sendpost(blog_content)
+    return blog_content
+
+## Events of `event_calendar` -> function building their post
+EVENT_NOTICES = {   'AstroLunch': build_astrolunch_notice,
+                    'AJC'       : build_ajc_notice,
+                    'AstroBrew' : build_astrobrew_notice,
+                    'Vino'      : build_vino_notice}
+
+def break_msg(now_dict):
+    """
+    Checks if `now_dict` falls on a break of `event_calendar`, when
+    nothing is posted.
+
+    Parameters
+    ----------
+    now_dict: python dictionary
+        dictionary with datetime information
+        Keys: 'weekday', 'month', 'day', 'now', 'now_str'
+
+    Returns
+    --------
+    msg: string or NoneType
+        log message of the break, or `None` on regular days
+    """
+    break_name = event_calendar.load_calendar().break_name(now_dict['now'])
+    if break_name is None:
+        return None
+
+    return '{0}\t {1}. No Post today. :|\n'.format(now_dict['now_str'],
+                break_name)
 
-def main():
+def day_notices(now_dict):
+    """
+    Functions building the posts of the events of `now_dict`, according
+    to `event_calendar`.
+
+    Returns
+    --------
+    notice_list: list
+        (event, function) of every event, in the order of the calendar
+    """
+    notice_list = []
+    for event in event_calendar.load_calendar().events_on(now_dict['now']):
+        if event not in EVENT_NOTICES:
+            sys.stderr.write('{0}\t No notice for event `{1}`. Skipping\n'.format(
+                now_dict['now_str'], event))
+            continue
+        notice_list.append((event, EVENT_NOTICES[event]))
+
+    return notice_list
+
+def bulk_posts(start_date, end_date, post_time=WP_POST_TIME):
+    """
+    Expands the events of `event_calendar` over every day between
+    `start_date` and `end_date`, skipping days that have already started.
+
+    Parameters
+    ----------
+    start_date, end_date: `datetime.date`
+        first and last day of the period, e.g. of the semester
+
+    post_time: `datetime.time`, optional (default = `WP_POST_TIME`)
+        time at which WordPress publishes each post
+
+    Returns
+    --------
+    post_list: list
+        (key, post) of every post, with the (event, date) `key` of
+        `post_ledger`, and the `wp.newPost` content of the post, with
+        `post_status` set to `future` and `post_date` to the day of the
+        event
+    """
+    now = datetime.datetime.now()
+    post_list = []
+    for ii in range((end_date - start_date).days + 1):
+        post_date = datetime.datetime.combine(
+                        start_date + datetime.timedelta(days=ii), post_time)
+        if post_date <= now:
+            continue
+        now_dict = now_dict_calc(post_date)
+        for event, notice in day_notices(now_dict):
+            blog_content = notice(now_dict)
+            post_list.append(((event, post_date.strftime('%Y-%m-%d')),
+                wp_xmlrpc.future_post(blog_content, post_date)))
+
+    return post_list
+
+def bulk_main(start_str, end_str, dry_run=False):
+    """
+    Schedules every post between `start_str` and `end_str`, in
+    `system.multicall` batches sent by `wp_async`. WordPress then publishes
+    each post on its day. Posts that cannot be sent are queued in
+    `post_ledger`, like the daily posts.
+
+    Parameters
+    ----------
+    start_str, end_str: string
+        first and last day of the period (`YYYY-MM-DD`)
+
+    dry_run: boolean, optional (default = False)
+        if True, the posts are only listed
+    """
+    start_date = datetime.datetime.strptime(start_str, '%Y-%m-%d').date()
+    end_date   = datetime.datetime.strptime(end_str, '%Y-%m-%d').date()
+    now_str    = now_dict_calc()['now_str']
+    post_list  = bulk_posts(start_date, end_date)
+    if dry_run:
+        for key, post in post_list:
+            sys.stderr.write('{0}\t {1}\t {2}\n'.format(now_str,
+                post['post_date'], post['post_title']))
+        return
+    ## Skipping posts that were already published or scheduled
+    ledger = post_ledger()
+    post_items = [(key, post, 'wp.newPost') for key, post in post_list
+                    if ledger.post_id(*key) is None]
+    n_skipped = len(post_list) - len(post_items)
+    ## Scheduling the remaining posts, together with the posts queued by
+    ## previous runs
+    if post_items or ledger.queued():
+        # Verifying environment keys
+        assert_env_vars()
+    results = wp_async.post_all(ledger, post_items, batch=True)
+    queued_keys = set(item[0] for item in ledger.queued())
+    n_posted = len([key for key, post, method in post_items
+                    if results.get(key) is not None])
+    n_queued = len([key for key, post, method in post_items
+                    if key in queued_keys])
+    sys.stderr.write('{0}\t Scheduled {1} of {2} posts between {3} and {4} ({5} already posted, {6} queued)\n'.format(
+        now_str, n_posted, len(post_list), start_str, end_str, n_skipped,
+        n_queued))
+
+def get_parser():
+    """
+    Command-line arguments of the script.
+
+    Returns
+    --------
+    parser: `argparse.ArgumentParser`
+        parser of the command-line arguments
+    """
+    parser = argparse.ArgumentParser(
+        description='Posts the events of the day to the Astro WordPress site')
+    parser.add_argument('--bulk', nargs=2, metavar=('START', 'END'),
+        help=('schedule every post between START and END (YYYY-MM-DD), e.g. '
+              'of the semester, as `future` posts'))
+    parser.add_argument('--dry-run', action='store_true',
+        help='with `--bulk`, only list the posts')
+    parser.add_argument('--drain', action='store_true',
+        help='only send the posts queued while the site was down')
+
+    return parser
+
+def main(args=None):
     """
     Determines current date and sends the expected notice
 
+    Posts are sent by `wp_async`, with retries and a circuit breaker.
+    Posts that cannot be sent are queued in `post_ledger`, and sent by the
+    next run.
+
+    Parameters
+    ----------
+    args: list, optional
+        command-line options. See `get_parser`.
     """
+    args = get_parser().parse_args(args)
+    if args.bulk:
+        bulk_main(args.bulk[0], args.bulk[1], dry_run=args.dry_run)
+        return
     ## Defining `now_dict` dictionary
     now_dict = now_dict_calc()
     ## Defining `post` strings
     post_success = '{0}\t Successfully posted! :D\n'.format(now_dict['now_str'])
-    post_ran     = '{0}\t Successfully ran but no post today\n'.format(
-                        now_dict['now_str'])
-    # Special Holidays
-    post_thanksg  = '{0}\t Thanksgiving Break. No Post today. :|\n'.format(
+    post_exists  = '{0}\t Posts already existed. Nothing to post\n'.format(
                         now_dict['now_str'])
-    post_spring   = '{0}\t Spring Break. No Post today. :|\n'.format(
+    post_ran     = '{0}\t Successfully ran but no post today\n'.format(
                         now_dict['now_str'])
-    post_summer   = '{0}\t Summer Break. No Post today. :|\n'.format(
+    post_queued  = '{0}\t Site unavailable. Posts queued for the next run\n'.format(
                         now_dict['now_str'])
-
-    ## EDIT THIS ONCE PER YEAR
-    thanksg_dates = list(range(20,25))
-    spring_dates  = list(range( 5,10))
-    summer_dates  = ['May','Jun','Jul']
-    # Thanksgiving
-    if (now_dict['weekday'] in thanksg_dates) and now_dict['month']=='Nov':
-        sys.stderr.write(post_thanksg)
-        sys.exit(0)
-    # Spring Break
-    if (now_dict['weekday'] in spring_dates) and now_dict['month']=='Mar':
-        sys.stderr.write(post_spring)
-        sys.exit(0)
-    # Summer
-    if (now_dict['month'] in summer_dates):
-        sys.stderr.write(post_summer)
-        sys.exit(0)
-
-    ## Defining Weekday and deciding which notice to send
-    if now_dict['weekday'] == 'Tue':
-        sendAstroLunchNotice(now_dict)
-        sys.stderr.write(post_success)
-    elif now_dict['weekday'] == 'Wed':
-        sendAJCNotice(now_dict)
-        sys.stderr.write(post_success)
-    elif now_dict['weekday'] == 'Thu':
-        sendAstroBrewNotice(now_dict)
-        sys.stderr.write(post_success)
-    elif now_dict['weekday'] == 'Fri':
-        sendVinoNotice(now_dict)
-        sys.stderr.write(post_success)
-    else:
+    ## Deciding which notices to send
+    notice_list = [] if args.drain else day_notices(now_dict)
+    date_str    = now_dict['now'].strftime('%Y-%m-%d')
+    post_items  = [((event, date_str), notice(now_dict),
+                    'metaWeblog.newPost') for event, notice in notice_list]
+    # Breaks, unless an event was added to this day
+    post_break = break_msg(now_dict)
+    if (post_break is not None) and (not notice_list):
+        sys.stderr.write(post_break)
+    ## Posting, together with the posts queued by previous runs
+    ledger = post_ledger()
+    if post_items or ledger.queued():
+        # Verifying environment keys
+        assert_env_vars()
+    posted_keys = set(item[0] for item in post_items
+                        if ledger.post_id(*item[0]) is not None)
+    results = wp_async.post_all(ledger, post_items)
+    queued_keys = set(item[0] for item in ledger.queued())
+    if any(item[0] in queued_keys for item in post_items):
+        sys.stderr.write(post_queued)
+    elif post_items and all(results.get(item[0]) for item in post_items):
+        if len(posted_keys) == len(post_items):
+            sys.stderr.write(post_exists)
+        else:
+            sys.stderr.write(post_success)
+    elif post_break is None:
         sys.stderr.write(post_ran)
 
 if __name__ == '__main__':
     main()
-
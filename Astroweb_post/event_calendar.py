@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Calendar of the recurring events of the Astronomy group.
+
+The calendar is declared in a JSON file (`event_calendar.json` next to this
+file, or the `event_calendar` environment variable) with three kinds of
+rules, applied in this order:
+
+    - `events`: recurring events, e.g.
+      `{"name": "AstroLunch", "weekdays": ["Tue"]}`. Optional `start` and
+      `end` dates (`YYYY-MM-DD`) limit the period of the event.
+    - `exclusions`: date ranges without events, e.g.
+      `{"name": "Summer Break", "start": "05-01", "end": "07-31"}`.
+      `MM-DD` dates repeat every year, and `YYYY-MM-DD` dates only apply to
+      that year. Breaks tied to a weekday are given by the `nth` `weekday`
+      of `month` (`-1` for the last one), extended `before` and `after`
+      days, e.g. `{"name": "Thanksgiving Break", "month": 11,
+      "weekday": "Thu", "nth": 4, "before": 1, "after": 1}`. An optional
+      `events` list limits the exclusion to those events.
+    - `overrides`: one-off changes, e.g.
+      `{"date": "2027-03-10", "add": ["AJC"], "remove": ["AstroBrew"]}`.
+
+The rules are compiled once per year into a `date -> Day` dictionary, so
+each query is a single lookup.
+"""
+import os
+import json
+import datetime
+from collections import namedtuple
+
+## Defaults
+# Rules file
+CALENDAR_PATH = os.environ.get('event_calendar',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        'event_calendar.json'))
+# Abbreviated weekday names, as given by `strftime('%a')`
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Events of one day, and name of the break (exclusion) it falls in
+Day = namedtuple('Day', ['events', 'break_name'])
+NO_EVENTS = Day((), None)
+
+## Calendars loaded by `load_calendar`, keyed by path
+_calendars = {}
+
+def parse_date(date_str, year):
+    """
+    Date of `date_str` (`MM-DD` or `YYYY-MM-DD`) in `year`, or `None` if
+    `date_str` belongs to another year.
+    """
+    parts = [int(part) for part in date_str.split('-')]
+    if len(parts) == 3:
+        if parts[0] != year:
+            return None
+        parts = parts[1:]
+
+    return datetime.date(year, parts[0], parts[1])
+
+def nth_weekday(year, month, weekday, nth):
+    """
+    Date of the `nth` `weekday` (e.g. `Thu`) of `month` in `year`. `nth`
+    counts from the end of the month if negative (`-1` is the last one).
+    """
+    weekday_idx = WEEKDAYS.index(weekday)
+    if nth > 0:
+        first = datetime.date(year, month, 1)
+        shift = (weekday_idx - first.weekday()) % 7
+        return first + datetime.timedelta(days=shift + 7 * (nth - 1))
+    if month == 12:
+        last = datetime.date(year, 12, 31)
+    else:
+        last = datetime.date(year, month + 1, 1) - datetime.timedelta(days=1)
+    shift = (last.weekday() - weekday_idx) % 7
+
+    return last - datetime.timedelta(days=shift + 7 * (-nth - 1))
+
+def exclusion_range(exclusion, year):
+    """
+    First and last dates of `exclusion` in `year`, or (`None`, `None`) if
+    it does not apply to `year`.
+    """
+    if 'nth' in exclusion:
+        day = nth_weekday(year, int(exclusion['month']), exclusion['weekday'],
+                int(exclusion['nth']))
+        first = day - datetime.timedelta(days=exclusion.get('before', 0))
+        last  = day + datetime.timedelta(days=exclusion.get('after', 0))
+        return first, last
+
+    first = parse_date(exclusion['start'], year)
+    last  = parse_date(exclusion['end'], year)
+
+    return first, last
+
+class EventCalendar(object):
+    """
+    Recurring events, exclusions and overrides, compiled per year.
+    """
+    def __init__(self, rules):
+        """
+        Parameters
+        ----------
+        rules: dict
+            `events`, `exclusions` and `overrides` lists. See the module
+            docstring.
+        """
+        self.events     = rules.get('events', [])
+        self.exclusions = rules.get('exclusions', [])
+        self.overrides  = rules.get('overrides', [])
+        weekdays = [(event['name'], weekday) for event in self.events
+                        for weekday in event.get('weekdays', [])]
+        weekdays += [(exclusion['name'], exclusion['weekday'])
+                        for exclusion in self.exclusions if 'nth' in exclusion]
+        for name, weekday in weekdays:
+            if weekday not in WEEKDAYS:
+                msg = '>> `weekday` ({0}) of `{1}` is not a valid input value ({2})! Exit!'
+                msg = msg.format(weekday, name, WEEKDAYS)
+                raise ValueError(msg)
+        # Compiled years
+        self.years = {}
+
+    def compile(self, year):
+        """
+        Compiles the rules into the index of `year`.
+
+        Returns
+        --------
+        year_index: dict
+            `Day` of every date of `year` with events or in a break
+        """
+        start = datetime.date(year, 1, 1)
+        n_days = (datetime.date(year + 1, 1, 1) - start).days
+        days = [start + datetime.timedelta(days=ii) for ii in range(n_days)]
+        events = dict((day, []) for day in days)
+        breaks = {}
+        ## Recurring events
+        for event in self.events:
+            weekdays = set(WEEKDAYS.index(weekday)
+                        for weekday in event.get('weekdays', []))
+            first = event.get('start', '0001-01-01')
+            last  = event.get('end', '9999-12-31')
+            for day in days:
+                day_str = day.isoformat()
+                if (day.weekday() in weekdays) and (first <= day_str <= last):
+                    events[day].append(event['name'])
+        ## Exclusions
+        for exclusion in self.exclusions:
+            first, last = exclusion_range(exclusion, year)
+            if (first is None) or (last is None):
+                continue
+            excluded = exclusion.get('events')
+            for ii in range((last - first).days + 1):
+                day = first + datetime.timedelta(days=ii)
+                if day.year != year:
+                    continue
+                if excluded is None:
+                    events[day] = []
+                else:
+                    events[day] = [name for name in events[day]
+                                    if name not in excluded]
+                breaks.setdefault(day, exclusion['name'])
+        ## One-off overrides
+        for override in self.overrides:
+            day = parse_date(override['date'], year)
+            if day is None:
+                continue
+            events[day] = [name for name in events[day]
+                            if name not in override.get('remove', [])]
+            events[day] += [name for name in override.get('add', [])
+                            if name not in events[day]]
+        year_index = {}
+        for day in days:
+            if events[day] or (day in breaks):
+                year_index[day] = Day(tuple(events[day]), breaks.get(day))
+
+        return year_index
+
+    def day(self, date):
+        """
+        Events of `date`, and name of the break it falls in.
+
+        Parameters
+        ----------
+        date: `datetime.date` or `datetime.datetime`
+            date to look up
+
+        Returns
+        --------
+        day: `Day`
+            `events` (tuple of event names) and `break_name` (string or
+            `None`)
+        """
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        year_index = self.years.get(date.year)
+        if year_index is None:
+            year_index = self.years[date.year] = self.compile(date.year)
+
+        return year_index.get(date, NO_EVENTS)
+
+    def events_on(self, date):
+        """
+        Names of the events of `date`. See `day`.
+        """
+        return self.day(date).events
+
+    def break_name(self, date):
+        """
+        Name of the break `date` falls in, or `None`. See `day`.
+        """
+        return self.day(date).break_name
+
+def load_calendar(path=None):
+    """
+    Returns the calendar declared in `path`, reading it only once per
+    process.
+
+    Parameters
+    ----------
+    path: string, optional (default = `CALENDAR_PATH`)
+        path to the JSON rules file
+
+    Returns
+    --------
+    calendar: `EventCalendar`
+        calendar of `path`
+    """
+    path = CALENDAR_PATH if path is None else path
+    calendar = _calendars.get(path)
+    if calendar is None:
+        with open(path, 'r') as rules_file:
+            calendar = EventCalendar(json.load(rules_file))
+        _calendars[path] = calendar
+
+    return calendar
@@ -0,0 +1,565 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Asynchronous posting to the Astro WordPress site.
+
+`xmlrpc.client` is blocking, so every call runs in a small pool of daemon
+threads (one `wp_xmlrpc.WordPressClient`, and keep-alive connection, per
+thread) and is awaited with a deadline. A call abandoned after its
+deadline does not keep the process alive. Failed read-only calls
+(timeouts, connection and HTTP errors) are retried with jittered
+exponential backoff. Faults raised by WordPress itself are not retried.
+
+New posts are never retried within a run: a `newPost` that timed out may
+still reach the site. The post stays `pending` in the ledger and queued,
+and the next run looks it up in the site (see `wp_ledger`) before it is
+sent again. Posts scheduled in advance are sent in `system.multicall`
+batches (`post_batch`), under the same rules.
+
+A circuit breaker counts consecutive failures. After
+`BREAKER_THRESHOLD` of them it opens, and no call reaches the site for
+`BREAKER_COOLDOWN` seconds. Its state is stored in `wp_ledger.PostLedger`,
+so a run started while the breaker is open does not call the site. After
+the cooldown, a single probe call goes through, and the other calls wait
+for its outcome. Posts that cannot be sent are kept in the queue of the
+ledger, and the queue is drained concurrently by the next run, once the
+site answers again. Queued posts of days that have passed are dropped.
+"""
+import os
+import sys
+import time
+import random
+import queue
+import asyncio
+import datetime
+import functools
+import threading
+import xmlrpc.client
+from concurrent.futures import Executor, Future
+
+import wp_xmlrpc
+import wp_ledger
+
+## Defaults
+# Maximum number of seconds for one XML-RPC call
+CALL_DEADLINE      = float(os.environ.get('wp_call_deadline', 30))
+# Maximum number of attempts of one read-only call
+MAX_ATTEMPTS       = int(os.environ.get('wp_max_attempts', 4))
+# Delay (in seconds) before the first retry. Doubles after every attempt
+BASE_DELAY         = float(os.environ.get('wp_base_delay', 2))
+# Maximum delay (in seconds) between two attempts
+MAX_DELAY          = float(os.environ.get('wp_max_delay', 60))
+# Consecutive failures that open the circuit breaker
+BREAKER_THRESHOLD  = int(os.environ.get('wp_breaker_threshold', 3))
+# Seconds during which an open breaker rejects every call
+BREAKER_COOLDOWN   = float(os.environ.get('wp_breaker_cooldown', 300))
+# Number of posts sent at the same time
+POST_WORKERS       = int(os.environ.get('wp_post_workers', 4))
+# Errors worth retrying
+TRANSIENT_ERRORS   = (OSError, asyncio.TimeoutError, xmlrpc.client.ProtocolError)
+# Seconds between two checks of a probe call in flight
+PROBE_POLL         = 0.05
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling the site while the circuit breaker is open.
+    """
+    pass
+
+class CircuitBreaker(object):
+    """
+    Stops calling the site after `threshold` consecutive failures.
+    """
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN,
+        clock=time.time, ledger=None):
+        """
+        Parameters
+        ----------
+        threshold: int, optional (default = `BREAKER_THRESHOLD`)
+            consecutive failures that open the breaker
+
+        cooldown: float, optional (default = `BREAKER_COOLDOWN`)
+            seconds before an open breaker lets one call through again
+
+        clock: callable, optional (default = `time.time`)
+            returns the current time, in seconds
+
+        ledger: `wp_ledger.PostLedger`, optional
+            ledger where the state of the breaker is loaded from and
+            stored, so that it carries over between runs
+        """
+        self.threshold = threshold
+        self.cooldown  = cooldown
+        self.clock     = clock
+        self.ledger    = ledger
+        self.failures  = 0
+        self.opened_at = None
+        # True while the probe call of the half-open breaker is in flight
+        self.probing   = False
+        if ledger is not None:
+            self.failures, self.opened_at = ledger.breaker_state()
+
+    def _now(self):
+        return self.clock()
+
+    def _save(self):
+        if self.ledger is not None:
+            self.ledger.set_breaker_state(self.failures, self.opened_at)
+
+    @property
+    def state(self):
+        """
+        `closed`, `open`, or `half-open` (cooldown over, next call is a
+        probe).
+        """
+        if self.opened_at is None:
+            return 'closed'
+        if (self._now() - self.opened_at) < self.cooldown:
+            return 'open'
+
+        return 'half-open'
+
+    def check(self):
+        """
+        Raises `CircuitOpen` if calls are not allowed. When the breaker is
+        half-open, the first call is let through as the probe, and the
+        others are rejected until it succeeds or fails.
+        """
+        state = self.state
+        if (state == 'open') or ((state == 'half-open') and self.probing):
+            raise CircuitOpen('Circuit breaker is open after {0} failures'
+                .format(self.failures))
+        if state == 'half-open':
+            self.probing = True
+
+    def success(self):
+        self.probing = False
+        if (self.failures == 0) and (self.opened_at is None):
+            return
+        self.failures  = 0
+        self.opened_at = None
+        self._save()
+
+    def failure(self):
+        self.probing   = False
+        self.failures += 1
+        if (self.failures >= self.threshold) or (self.opened_at is not None):
+            if self.opened_at is None:
+                sys.stderr.write('{0}\t Opening circuit breaker after {1} failures\n'.format(
+                    datetime.datetime.now().strftime("%x %a %X"), self.failures))
+            self.opened_at = self._now()
+        self._save()
+
+class DaemonExecutor(Executor):
+    """
+    Fixed pool of daemon threads. Unlike `ThreadPoolExecutor`, calls that
+    are still running when the process exits are not waited for.
+    """
+    def __init__(self, max_workers):
+        self._queue   = queue.Queue()
+        self._threads = []
+        for ii in range(max_workers):
+            thread = threading.Thread(target=self._work)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func()
+            except BaseException as err:
+                future.set_exception(err)
+            else:
+                future.set_result(result)
+
+    def submit(self, func, *args, **kwargs):
+        future = Future()
+        self._queue.put((future, functools.partial(func, *args, **kwargs)))
+
+        return future
+
+    def shutdown(self, wait=True, **kwargs):
+        for thread in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+class AsyncPoster(object):
+    """
+    Sends posts concurrently, with deadlines, retries and a circuit
+    breaker, queuing the ones that cannot be sent.
+    """
+    def __init__(self, ledger, client_factory=None, deadline=CALL_DEADLINE, max_attempts=MAX_ATTEMPTS,
+        base_delay=BASE_DELAY, max_delay=MAX_DELAY, breaker=None,
+        workers=POST_WORKERS, batch_size=wp_xmlrpc.WP_BATCH_SIZE):
+        """
+        Parameters
+        ----------
+        ledger: `wp_ledger.PostLedger`
+            ledger of the posts, with the queue of posts to send
+
+        client_factory: callable, optional
+            returns a new `wp_xmlrpc.WordPressClient`. By default, one
+            whose requests time out after `deadline` seconds.
+
+        deadline: float, optional (default = `CALL_DEADLINE`)
+            maximum number of seconds for one call
+
+        max_attempts: int, optional (default = `MAX_ATTEMPTS`)
+            maximum number of attempts of one read-only call
+
+        base_delay, max_delay: float, optional
+            backoff between attempts, in seconds
+
+        breaker: `CircuitBreaker`, optional
+            circuit breaker shared by every call. By default, one stored
+            in `ledger`.
+
+        workers: int, optional (default = `POST_WORKERS`)
+            number of calls running at the same time
+
+        batch_size: int, optional (default = `wp_xmlrpc.WP_BATCH_SIZE`)
+            maximum number of posts in one `post_batch` request
+        """
+        if client_factory is None:
+            client_factory = functools.partial(wp_xmlrpc.WordPressClient,
+                                timeout=deadline)
+        self.ledger         = ledger
+        self.client_factory = client_factory
+        self.deadline       = deadline
+        self.max_attempts   = max(1, max_attempts)
+        self.base_delay     = base_delay
+        self.max_delay      = max_delay
+        self.breaker        = CircuitBreaker(ledger=ledger) if breaker is None \
+                                else breaker
+        self.workers        = max(1, workers)
+        self.batch_size     = max(1, batch_size)
+        self.executor       = DaemonExecutor(self.workers)
+        # One client (and connection) per thread of `executor`
+        self._local         = threading.local()
+
+    def close(self):
+        """
+        Stops the threads, without waiting for abandoned calls.
+        """
+        self.executor.shutdown(wait=False)
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.client_factory()
+
+        return client
+
+    async def call(self, func, retry=True):
+        """
+        Runs `func(client)` in the thread pool, with `deadline`, retries
+        and the circuit breaker.
+
+        Parameters
+        ----------
+        func: callable
+            blocking function of a `wp_xmlrpc.WordPressClient`
+
+        retry: boolean, optional (default = True)
+            if False, `func` is only attempted once, e.g. for calls that
+            are not idempotent
+
+        Returns
+        --------
+        result: object
+            value returned by `func`
+        """
+        loop = asyncio.get_event_loop()
+        max_attempts = self.max_attempts if retry else 1
+        for attempt in range(1, max_attempts + 1):
+            # Waiting for the outcome of the probe of a half-open breaker
+            while self.breaker.probing:
+                await asyncio.sleep(PROBE_POLL)
+            self.breaker.check()
+            try:
+                result = await asyncio.wait_for(loop.run_in_executor(
+                            self.executor, lambda: func(self._client())),
+                            self.deadline)
+            except xmlrpc.client.Fault:
+                # The site answered: it is up
+                self.breaker.success()
+                raise
+            except TRANSIENT_ERRORS as err:
+                self.breaker.failure()
+                if attempt == max_attempts:
+                    raise
+                delay = min(self.max_delay, self.base_delay * 2**(attempt - 1))
+                delay *= random.uniform(0.5, 1.5)
+                sys.stderr.write('{0}\t XML-RPC call failed ({1}), retrying in {2:.1f} s\n'.format(
+                    datetime.datetime.now().strftime("%x %a %X"),
+                    err.__class__.__name__, delay))
+                await asyncio.sleep(delay)
+                continue
+            self.breaker.success()
+
+            return result
+
+    def _posted(self, key, title):
+        """
+        ID of the post of `key` if the ledger (or its snapshot of the site)
+        has it already, dequeuing it. `None` otherwise.
+        """
+        event, date_str = key
+        post_id = self.ledger.lookup(event, date_str, title)
+        if post_id is not None:
+            self.ledger.dequeue(event, date_str)
+            sys.stderr.write('{0}\t `{1}` ({2}) was already posted (ID {3}). Skipping\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), event, date_str,
+                post_id))
+
+        return post_id
+
+    def _sent(self, key, title, result):
+        """
+        Records the outcome of a `newPost` call: the ID of the new post, or
+        the `xmlrpc.client.Fault` rejecting it.
+        """
+        event, date_str = key
+        self.ledger.dequeue(event, date_str)
+        if isinstance(result, xmlrpc.client.Fault):
+            self.ledger.forget(event, date_str)
+            sys.stderr.write('{0}\t Could not post `{1}` ({2}): {3}\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), event, date_str,
+                result.faultString))
+            return None
+        self.ledger.record(event, date_str, title, result)
+        sys.stderr.write('{0}\t Posted `{1}` ({2}), ID {3}\n'.format(
+            datetime.datetime.now().strftime("%x %a %X"), event, date_str,
+            result))
+
+        return result
+
+    def _queue(self, key, blog_content, method, err):
+        """
+        Queues a post whose `newPost` call failed. The post stays
+        `pending`, so the site is checked before it is sent again, by the
+        next run.
+        """
+        event, date_str = key
+        self.ledger.enqueue(event, date_str, blog_content, method=method)
+        sys.stderr.write('{0}\t Queued `{1}` ({2}) for later: {3}\n'.format(
+            datetime.datetime.now().strftime("%x %a %X"), event, date_str,
+            err.__class__.__name__))
+
+    async def post(self, key, blog_content, method='metaWeblog.newPost'):
+        """
+        Sends one post, unless the ledger has it already. Posts that cannot
+        be sent are queued.
+
+        Parameters
+        ----------
+        key: tuple
+            (event, date) of the post, with the date as `YYYY-MM-DD`
+
+        blog_content: dict
+            XML-RPC content of the post
+
+        method: string, optional (default = 'metaWeblog.newPost')
+            `metaWeblog.newPost` or `wp.newPost`
+
+        Returns
+        --------
+        post_id: string or NoneType
+            ID of the post, or `None` if it was queued or rejected
+        """
+        title = blog_content.get('title', blog_content.get('post_title'))
+        post_id = self._posted(key, title)
+        if post_id is not None:
+            return post_id
+        self.ledger.mark_pending(key[0], key[1], title)
+        try:
+            # Not retried: a post that timed out may still be created
+            result = await self.call(lambda client: client.new_post(
+                        blog_content, method=method), retry=False)
+        except xmlrpc.client.Fault as err:
+            result = err
+        except (CircuitOpen,) + TRANSIENT_ERRORS as err:
+            self._queue(key, blog_content, method, err)
+            return None
+
+        return self._sent(key, title, result)
+
+    async def post_batch(self, items):
+        """
+        Sends several posts in one `system.multicall` request (see
+        `wp_xmlrpc.WordPressClient.new_posts`), skipping the ones the
+        ledger has already. Like `post`, the request is not retried, and
+        the posts are queued if it fails.
+
+        Parameters
+        ----------
+        items: list
+            (key, blog_content, method) of every post, all with the same
+            `method`
+
+        Returns
+        --------
+        post_ids: list
+            ID of each post, or `None` if it was queued or rejected
+        """
+        post_ids = [None] * len(items)
+        send_idx = []
+        for ii, (key, blog_content, method) in enumerate(items):
+            title = blog_content.get('title', blog_content.get('post_title'))
+            post_ids[ii] = self._posted(key, title)
+            if post_ids[ii] is None:
+                self.ledger.mark_pending(key[0], key[1], title)
+                send_idx.append(ii)
+        if not send_idx:
+            return post_ids
+        method = items[send_idx[0]][2]
+        contents = [items[ii][1] for ii in send_idx]
+        try:
+            # Not retried: posts of a request that timed out may exist
+            results = await self.call(lambda client: client.new_posts(contents,
+                        method=method), retry=False)
+        except xmlrpc.client.Fault as err:
+            results = [err] * len(send_idx)
+        except (CircuitOpen,) + TRANSIENT_ERRORS as err:
+            for ii in send_idx:
+                key, blog_content, method = items[ii]
+                self._queue(key, blog_content, method, err)
+            return post_ids
+        for ii, result in zip(send_idx, results):
+            key, blog_content, method = items[ii]
+            post_ids[ii] = self._sent(key, blog_content.get('title',
+                                blog_content.get('post_title')), result)
+
+        return post_ids
+
+    async def reconcile(self):
+        """
+        Refreshes the snapshot of the site in the ledger, with one
+        `wp.getPosts` call. See `wp_ledger.PostLedger.reconcile`.
+        """
+        posts = await self.call(lambda client: client.get_posts(
+                    number=wp_ledger.LEDGER_LOOKBACK))
+        self.ledger.store_snapshot(posts)
+
+    async def run(self, items=(), today=None, batch=False):
+        """
+        Drains the queue and sends `items`, `workers` posts (or batches)
+        at a time.
+
+        Parameters
+        ----------
+        items: list, optional
+            (key, blog_content, method) of every new post
+
+        today: `datetime.date`, optional
+            current day. Queued posts of earlier days are dropped. By
+            default, today.
+
+        batch: boolean, optional (default = False)
+            if True, posts are sent in `post_batch` requests of at most
+            `batch_size` posts, e.g. for a whole semester of scheduled
+            posts
+
+        Returns
+        --------
+        results: dict
+            ID of each post (or `None`), keyed by (event, date)
+        """
+        today = datetime.date.today() if today is None else today
+        for event, date_str in self.ledger.expire(today.strftime('%Y-%m-%d')):
+            sys.stderr.write('{0}\t Dropped queued `{1}` ({2}): its day has passed\n'.format(
+                datetime.datetime.now().strftime("%x %a %X"), event, date_str))
+        work = list(self.ledger.queued())
+        queued_keys = set(key for key, blog_content, method in work)
+        work += [item for item in items if item[0] not in queued_keys]
+        if not work:
+            return {}
+        ## Posts missing from the ledger, or left pending by a previous run,
+        ## are looked up in the site first
+        unknown = [key for key, blog_content, method in work
+                    if self.ledger.post_id(*key) is None]
+        pending = any(self.ledger.entry(*key) is not None for key in unknown)
+        if unknown and (pending or not self.ledger.is_fresh()):
+            try:
+                await self.reconcile()
+            except xmlrpc.client.Fault as err:
+                # The site is up but refused the query (e.g. `wp.getPosts`
+                # is disabled). Posts that were never sent go out anyway.
+                # Pending ones may exist already, so they stay queued.
+                held = [item for item in work
+                            if self.ledger.entry(*item[0]) is not None
+                            and self.ledger.post_id(*item[0]) is None]
+                sys.stderr.write('{0}\t ALERT: could not check the site for existing posts ({1}). Keeping {2} pending post(s) queued\n'.format(
+                    datetime.datetime.now().strftime("%x %a %X"),
+                    err.faultString, len(held)))
+                for key, blog_content, method in held:
+                    self.ledger.enqueue(key[0], key[1], blog_content,
+                        method=method)
+                held_keys = set(item[0] for item in held)
+                work = [item for item in work if item[0] not in held_keys]
+            except (CircuitOpen,) + TRANSIENT_ERRORS as err:
+                # Posts that may already exist are not sent blindly
+                sys.stderr.write('{0}\t Could not check the site for existing posts: {1}\n'.format(
+                    datetime.datetime.now().strftime("%x %a %X"),
+                    err.__class__.__name__))
+                for key, blog_content, method in work:
+                    if self.ledger.entry(*key) is None:
+                        self.ledger.mark_pending(key[0], key[1],
+                            blog_content.get('title',
+                                blog_content.get('post_title')))
+                    self.ledger.enqueue(key[0], key[1], blog_content,
+                        method=method)
+                return dict((key, None) for key, blog_content, method in work)
+        ## Sending posts concurrently
+        semaphore = asyncio.Semaphore(self.workers)
+        async def post_one(key, blog_content, method):
+            async with semaphore:
+                return await self.post(key, blog_content, method=method)
+        async def post_many(batch_items):
+            async with semaphore:
+                return await self.post_batch(batch_items)
+        if batch:
+            # Batches of posts with the same method
+            batches = []
+            for method in sorted(set(item[2] for item in work)):
+                method_items = [item for item in work if item[2] == method]
+                batches += [method_items[start:start + self.batch_size]
+                    for start in range(0, len(method_items), self.batch_size)]
+            work = [item for batch_items in batches for item in batch_items]
+            batch_ids = await asyncio.gather(*[post_many(batch_items)
+                            for batch_items in batches])
+            post_ids  = [post_id for ids in batch_ids for post_id in ids]
+        else:
+            post_ids = await asyncio.gather(*[post_one(*item) for item in work])
+        results  = dict((key, None) for key in unknown)
+        results.update((item[0], post_id) for item, post_id in zip(work, post_ids))
+
+        return results
+
+def post_all(ledger, items=(), batch=False, **kwargs):
+    """
+    Drains the queue of `ledger` and sends `items`, in `system.multicall`
+    batches if `batch`. See `AsyncPoster.run`.
+
+    Returns
+    --------
+    results: dict
+        ID of each post (or `None` if it was queued or rejected), keyed by
+        (event, date)
+    """
+    poster = AsyncPoster(ledger, **kwargs)
+    try:
+        return asyncio.run(poster.run(items, batch=batch))
+    finally:
+        poster.close()
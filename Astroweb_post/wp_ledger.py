@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+Local ledger of the posts published by `Astroweb_updates_xmlrpc`.
+
+Each post is recorded under its (event, date) key with the ID returned by
+WordPress, and the ledger is checked before any call to the site, so a
+rerun on the same day costs no network calls and never creates a
+duplicate post.
+
+A post is marked `pending` right before it is sent. If the run dies before
+WordPress answers (e.g. after a timeout), the post may or may not exist.
+Posts missing from the ledger, and pending ones, are then looked up in a
+snapshot of the latest posts of the site, taken with one `wp.getPosts`
+query and reused for `LEDGER_TTL` seconds (pending posts always get a new
+snapshot). A post is matched by its title and the day of its `post_date`.
+
+Posts that could not be sent (e.g. while the site was down) are kept in a
+queue, with their XML-RPC content, until they are sent by a later run.
+Queued posts whose day has passed are not sent anymore: `expire` marks
+them as `expired` in the ledger instead. The state of the circuit breaker
+of `wp_async` is also kept here, so that it carries over between runs.
+
+The ledger is stored in `.wp_ledger.sqlite` next to this file, or in the
+`wp_ledger` environment variable.
+"""
+import os
+import time
+import sqlite3
+import datetime
+import xmlrpc.client
+
+## Defaults
+# Path to the ledger
+LEDGER_PATH     = os.environ.get('wp_ledger',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+        '.wp_ledger.sqlite'))
+# Seconds during which the snapshot of the site is reused
+LEDGER_TTL      = int(os.environ.get('wp_ledger_ttl', 86400))
+# Number of latest posts in the snapshot of the site
+LEDGER_LOOKBACK = int(os.environ.get('wp_ledger_lookback', 200))
+
+def post_day(post_date):
+    """
+    Day (`YYYY-MM-DD`) of a `post_date` returned by WordPress.
+
+    Parameters
+    ----------
+    post_date: `xmlrpc.client.DateTime`, `datetime.datetime` or string
+        date of the post
+
+    Returns
+    --------
+    day_str: string
+        day of the post
+    """
+    if isinstance(post_date, datetime.datetime):
+        return post_date.strftime('%Y-%m-%d')
+    date_str = str(post_date)
+    if 'T' in date_str and '-' not in date_str:
+        # ISO 8601 basic format of `xmlrpc.client.DateTime`
+        return '{0}-{1}-{2}'.format(date_str[0:4], date_str[4:6],
+                    date_str[6:8])
+
+    return date_str[:10]
+
+class PostLedger(object):
+    """
+    SQLite ledger of the posts, keyed by (event, date).
+    """
+    def __init__(self, db_path=None, ttl=None):
+        """
+        Parameters
+        ----------
+        db_path: string, optional (default = `LEDGER_PATH`)
+            path to the SQLite database
+
+        ttl: int, optional (default = `LEDGER_TTL`)
+            seconds during which the snapshot of the site is reused
+        """
+        self.db_path = LEDGER_PATH if db_path is None else db_path
+        self.ttl     = LEDGER_TTL if ttl is None else ttl
+        self.conn    = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    event   TEXT,
+                    date    TEXT,
+                    title   TEXT,
+                    post_id TEXT,
+                    status  TEXT,
+                    updated REAL,
+                    PRIMARY KEY (event, date))""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS remote (
+                    title   TEXT,
+                    date    TEXT,
+                    post_id TEXT)""")
+            self.conn.execute("""CREATE INDEX IF NOT EXISTS remote_title
+                                 ON remote (title, date)""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS queue (
+                    event   TEXT,
+                    date    TEXT,
+                    method  TEXT,
+                    payload TEXT,
+                    queued  REAL,
+                    PRIMARY KEY (event, date))""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value TEXT)""")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def _get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?',
+                (key,)).fetchone()
+        return None if row is None else row['value']
+
+    def _set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+            (key, str(value)))
+
+    def entry(self, event, date_str):
+        """
+        Ledger row of (`event`, `date_str`), or `None`.
+        """
+        return self.conn.execute(
+            'SELECT * FROM posts WHERE event = ? AND date = ?',
+            (event, date_str)).fetchone()
+
+    def post_id(self, event, date_str):
+        """
+        ID of the published post of (`event`, `date_str`), or `None`.
+        """
+        row = self.entry(event, date_str)
+        if (row is None) or (row['status'] != 'published'):
+            return None
+
+        return row['post_id']
+
+    def mark_pending(self, event, date_str, title):
+        """
+        Records that the post of (`event`, `date_str`) is about to be sent.
+        """
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO posts VALUES (?, ?, ?, NULL, ?, ?)',
+                (event, date_str, title, 'pending', time.time()))
+
+    def record(self, event, date_str, title, post_id):
+        """
+        Records the ID of the published post of (`event`, `date_str`).
+        """
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO posts VALUES (?, ?, ?, ?, ?, ?)',
+                (event, date_str, title, str(post_id), 'published',
+                 time.time()))
+
+    def forget(self, event, date_str):
+        """
+        Removes (`event`, `date_str`) from the ledger, e.g. after a failed
+        post.
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM posts WHERE event = ? AND date = ?',
+                (event, date_str))
+
+    def is_fresh(self):
+        """
+        Checks if the snapshot of the site is younger than `ttl` seconds.
+        """
+        fetched = self._get_meta('remote_fetched')
+        if fetched is None:
+            return False
+
+        return (time.time() - float(fetched)) < self.ttl
+
+    def reconcile(self, client, force=False, lookback=LEDGER_LOOKBACK):
+        """
+        Replaces the snapshot of the site with its `lookback` latest posts,
+        through one `wp.getPosts` query, unless the snapshot is fresh.
+
+        Parameters
+        ----------
+        client: `wp_xmlrpc.WordPressClient`
+            session with the site
+
+        force: boolean, optional (default = False)
+            if True, a new snapshot is taken even if the current one is
+            fresh
+
+        lookback: int, optional (default = `LEDGER_LOOKBACK`)
+            number of posts in the snapshot
+
+        Returns
+        --------
+        queried: boolean
+            True if the site was queried
+        """
+        if self.is_fresh() and (not force):
+            return False
+        self.store_snapshot(client.get_posts(number=lookback))
+
+        return True
+
+    def store_snapshot(self, posts):
+        """
+        Replaces the snapshot of the site with `posts`, e.g. from
+        `wp_xmlrpc.WordPressClient.get_posts`.
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM remote')
+            self.conn.executemany('INSERT INTO remote VALUES (?, ?, ?)',
+                [(post['post_title'], post_day(post['post_date']),
+                  str(post['post_id'])) for post in posts])
+            self._set_meta('remote_fetched', time.time())
+
+    def lookup(self, event, date_str, title):
+        """
+        ID of the post of (`event`, `date_str`), if it was already
+        published.
+
+        The ledger is checked first. Posts missing from it, or still
+        pending, are looked up by `title` in the snapshot of the site (see
+        `reconcile`), and adopted into the ledger when found. The site
+        itself is not queried.
+
+        Parameters
+        ----------
+        event, date_str: string
+            event and day (`YYYY-MM-DD`) of the post
+
+        title: string
+            title of the post
+
+        Returns
+        --------
+        post_id: string or NoneType
+            ID of the post, or `None` if it has not been published
+        """
+        row = self.entry(event, date_str)
+        if (row is not None) and (row['status'] == 'published'):
+            return row['post_id']
+        remote = self.conn.execute(
+            'SELECT post_id FROM remote WHERE title = ? AND date = ?',
+            (title, date_str)).fetchone()
+        if remote is None:
+            return None
+        self.record(event, date_str, title, remote['post_id'])
+
+        return remote['post_id']
+
+    def enqueue(self, event, date_str, blog_content,
+        method='metaWeblog.newPost'):
+        """
+        Keeps the post of (`event`, `date_str`) to be sent later.
+
+        Parameters
+        ----------
+        event, date_str: string
+            event and day (`YYYY-MM-DD`) of the post
+
+        blog_content: dict
+            XML-RPC content of the post
+
+        method: string, optional (default = 'metaWeblog.newPost')
+            `metaWeblog.newPost` or `wp.newPost`
+        """
+        payload = xmlrpc.client.dumps((blog_content,), allow_none=True)
+        with self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO queue VALUES (?, ?, ?, ?, ?)',
+                (event, date_str, method, payload, time.time()))
+
+    def queued(self):
+        """
+        Posts waiting to be sent, oldest first.
+
+        Returns
+        --------
+        queue_list: list
+            (key, blog_content, method) of every post, with the
+            (event, date) `key` of the post
+        """
+        rows = self.conn.execute('SELECT * FROM queue ORDER BY queued')
+        queue_list = []
+        for row in rows:
+            blog_content = xmlrpc.client.loads(row['payload'])[0][0]
+            queue_list.append(((row['event'], row['date']), blog_content,
+                row['method']))
+
+        return queue_list
+
+    def dequeue(self, event, date_str):
+        """
+        Removes the post of (`event`, `date_str`) from the queue.
+        """
+        with self.conn:
+            self.conn.execute('DELETE FROM queue WHERE event = ? AND date = ?',
+                (event, date_str))
+
+    def expire(self, today_str):
+        """
+        Removes the queued posts of days before `today_str`, and marks
+        them as `expired` in the ledger, so that a notice is never posted
+        after its event.
+
+        Parameters
+        ----------
+        today_str: string
+            current day (`YYYY-MM-DD`)
+
+        Returns
+        --------
+        expired_list: list
+            (event, date) of every expired post
+        """
+        rows = self.conn.execute(
+            'SELECT event, date, payload FROM queue WHERE date < ?',
+            (today_str,)).fetchall()
+        expired_list = []
+        with self.conn:
+            for row in rows:
+                blog_content = xmlrpc.client.loads(row['payload'])[0][0]
+                title = blog_content.get('title',
+                            blog_content.get('post_title'))
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO posts VALUES (?, ?, ?, NULL, ?, ?)',
+                    (row['event'], row['date'], title, 'expired',
+                     time.time()))
+                expired_list.append((row['event'], row['date']))
+            self.conn.execute('DELETE FROM queue WHERE date < ?', (today_str,))
+
+        return expired_list
+
+    def breaker_state(self):
+        """
+        Consecutive failures and opening time (in seconds since the epoch,
+        or `None`) of the circuit breaker of `wp_async`.
+        """
+        failures  = self._get_meta('breaker_failures')
+        opened_at = self._get_meta('breaker_opened_at')
+        failures  = 0 if failures is None else int(failures)
+        opened_at = None if opened_at in (None, '') else float(opened_at)
+
+        return failures, opened_at
+
+    def set_breaker_state(self, failures, opened_at):
+        """
+        Stores the state of the circuit breaker. See `breaker_state`.
+        """
+        with self.conn:
+            self._set_meta('breaker_failures', failures)
+            self._set_meta('breaker_opened_at',
+                '' if opened_at is None else opened_at)
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+# Created       : 2026-10-18
+# Affiliation   : Vanderbilt University
+"""
+XML-RPC client for the Astro WordPress site.
+
+`WordPressClient` keeps one `xmlrpc.client.ServerProxy` for the whole run.
+Its transport keeps the HTTP(S) connection alive between calls, so only the
+first post pays for the TCP/TLS handshake, and every request has a timeout.
+
+Several posts can be sent in a single round trip with `new_posts`, which
+groups the `metaWeblog.newPost` / `wp.newPost` calls into
+`system.multicall` requests of at most `WP_BATCH_SIZE` calls. Servers
+without `system.multicall` get the calls one by one, over the same
+connection.
+
+The URL is taken from the `wp_url` environment variable, so the client can
+be pointed to a local stand-in, e.g.:
+
+    from xmlrpc.server import SimpleXMLRPCServer
+    server = SimpleXMLRPCServer(('127.0.0.1', 8080), allow_none=True)
+    server.register_function(new_post, 'metaWeblog.newPost')
+    server.register_multicall_functions()
+
+and `wp_url=http://127.0.0.1:8080`.
+"""
+import os
+import xmlrpc.client
+
+## Defaults
+# XML-RPC endpoint of the Astro WordPress site
+WP_URL        = os.environ.get('wp_url',
+    'https://as.vanderbilt.edu/astronomy/manage/xmlrpc.php')
+# Timeout (in seconds) of every request
+WP_TIMEOUT    = float(os.environ.get('wp_timeout', 30))
+# Maximum number of calls in one `system.multicall` request
+WP_BATCH_SIZE = int(os.environ.get('wp_batch_size', 50))
+# Fault codes of servers without `system.multicall`
+# (WordPress / `SimpleXMLRPCServer`)
+MULTICALL_UNSUPPORTED = (-32601, 1)
+
+class KeepAliveTransport(xmlrpc.client.Transport):
+    """
+    HTTP transport reusing one connection, with a timeout.
+    """
+    def __init__(self, timeout=WP_TIMEOUT, **kwargs):
+        super(KeepAliveTransport, self).__init__(**kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        # `Transport` keeps the last connection and reuses it for `host`
+        conn = super(KeepAliveTransport, self).make_connection(host)
+        conn.timeout = self.timeout
+
+        return conn
+
+class SafeKeepAliveTransport(xmlrpc.client.SafeTransport):
+    """
+    HTTPS transport reusing one connection (and TLS session), with a
+    timeout.
+    """
+    def __init__(self, timeout=WP_TIMEOUT, **kwargs):
+        super(SafeKeepAliveTransport, self).__init__(**kwargs)
+        self.timeout = timeout
+
+    def make_connection(self, host):
+        conn = super(SafeKeepAliveTransport, self).make_connection(host)
+        conn.timeout = self.timeout
+
+        return conn
+
+class WordPressClient(object):
+    """
+    Persistent XML-RPC session with the WordPress site.
+    """
+    def __init__(self, url=None, username=None, password=None,
+        timeout=WP_TIMEOUT, batch_size=WP_BATCH_SIZE, blog_id=''):
+        """
+        Parameters
+        ----------
+        url: string, optional (default = `WP_URL`)
+            XML-RPC endpoint
+
+        username, password: string, optional
+            WordPress account. By default, taken from `wp_username` and
+            `wp_password`.
+
+        timeout: float, optional (default = `WP_TIMEOUT`)
+            timeout of every request, in seconds
+
+        batch_size: int, optional (default = `WP_BATCH_SIZE`)
+            maximum number of calls in one `system.multicall` request
+
+        blog_id: string, optional
+            blog ID. WordPress does not use it, so it can be anything.
+        """
+        self.url        = url or WP_URL
+        self.username   = username or os.environ.get('wp_username')
+        self.password   = password or os.environ.get('wp_password')
+        self.batch_size = max(1, int(batch_size))
+        self.blog_id    = blog_id
+        if self.url.startswith('https'):
+            transport = SafeKeepAliveTransport(timeout=timeout)
+        else:
+            transport = KeepAliveTransport(timeout=timeout)
+        self.server = xmlrpc.client.ServerProxy(self.url, transport=transport,
+                        allow_none=True)
+        # Set to False the first time the server rejects `system.multicall`
+        self.multicall_ok = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the connection to the server.
+        """
+        self.server('close')()
+
+    def call(self, method, *params):
+        """
+        Calls `method` with `params`, over the open connection.
+        """
+        return getattr(self.server, method)(*params)
+
+    def post_call(self, blog_content, method='metaWeblog.newPost',
+        publish=True):
+        """
+        Method and parameters of the call creating the post `blog_content`.
+
+        Parameters
+        ----------
+        blog_content: dict
+            post. Keys of `metaWeblog.newPost` (`title`, `description`,
+            `categories`, ...) or of `wp.newPost` (`post_title`,
+            `post_content`, `post_status`, `post_date`, `terms_names`, ...)
+
+        method: string, optional (default = 'metaWeblog.newPost')
+            `metaWeblog.newPost` or `wp.newPost`
+
+        publish: boolean, optional (default = True)
+            if False, `metaWeblog.newPost` creates a draft. `wp.newPost`
+            uses `post_status` instead.
+
+        Returns
+        --------
+        method, params: string, tuple
+            XML-RPC method and its parameters
+        """
+        params = (self.blog_id, self.username, self.password, blog_content)
+        if method == 'metaWeblog.newPost':
+            params += (publish,)
+        elif method != 'wp.newPost':
+            msg = '>> `method` ({0}) is not a valid input value ({1})! Exit!'
+            msg = msg.format(method, ['metaWeblog.newPost', 'wp.newPost'])
+            raise ValueError(msg)
+
+        return method, params
+
+    def new_post(self, blog_content, method='metaWeblog.newPost',
+        publish=True):
+        """
+        Creates one post. See `post_call`.
+
+        Returns
+        --------
+        post_id: string
+            ID of the new post
+        """
+        method, params = self.post_call(blog_content, method=method,
+                            publish=publish)
+
+        return self.call(method, *params)
+
+    def get_posts(self, number=100, fields=('post_id', 'post_title',
+        'post_date', 'post_status')):
+        """
+        Latest posts of the site, of any status (published, scheduled,
+        drafts, ...), with one `wp.getPosts` call.
+
+        Parameters
+        ----------
+        number: int, optional (default = 100)
+            maximum number of posts
+
+        fields: tuple, optional
+            fields of each post
+
+        Returns
+        --------
+        posts: list
+            posts, newest first, as dictionaries with the keys in `fields`
+        """
+        post_filter = { 'post_type': 'post',
+                        'number'   : int(number),
+                        'orderby'  : 'date',
+                        'order'    : 'DESC'}
+
+        return self.call('wp.getPosts', self.blog_id, self.username,
+                    self.password, post_filter, list(fields))
+
+    def new_posts(self, blog_content_list, method='metaWeblog.newPost',
+        publish=True):
+        """
+        Creates several posts, in `system.multicall` batches. See
+        `post_call`.
+
+        Returns
+        --------
+        results: list
+            ID of each new post, or the `xmlrpc.client.Fault` raised by
+            the server for it, in the order of `blog_content_list`
+        """
+        calls = [self.post_call(blog_content, method=method, publish=publish)
+                    for blog_content in blog_content_list]
+
+        return self.multicall(calls)
+
+    def multicall(self, calls):
+        """
+        Runs `calls` in `system.multicall` batches of at most `batch_size`
+        calls, or one by one if the server does not support it.
+
+        Parameters
+        ----------
+        calls: list
+            list of (method, params) tuples
+
+        Returns
+        --------
+        results: list
+            result of each call, or the `xmlrpc.client.Fault` it raised
+        """
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            batch = calls[start:start + self.batch_size]
+            if self.multicall_ok:
+                try:
+                    results.extend(self._multicall(batch))
+                    continue
+                except xmlrpc.client.Fault as err:
+                    if err.faultCode not in MULTICALL_UNSUPPORTED:
+                        raise
+                    self.multicall_ok = False
+            for method, params in batch:
+                try:
+                    results.append(self.call(method, *params))
+                except xmlrpc.client.Fault as err:
+                    results.append(err)
+
+        return results
+
+    def _multicall(self, batch):
+        multicall = xmlrpc.client.MultiCall(self.server)
+        for method, params in batch:
+            getattr(multicall, method)(*params)
+        results  = []
+        iterator = multicall()
+        for ii in range(len(batch)):
+            try:
+                results.append(iterator[ii])
+            except xmlrpc.client.Fault as err:
+                results.append(err)
+
+        return results
+
+def future_post(blog_content, post_date, post_status='future'):
+    """
+    Converts a `metaWeblog.newPost` post into a `wp.newPost` post that
+    WordPress publishes by itself at `post_date`.
+
+    Parameters
+    ----------
+    blog_content: dict
+        post, with `title`, `description` and `categories` keys
+
+    post_date: `datetime.datetime`
+        publication date, in the time zone of the site
+
+    post_status: string, optional (default = 'future')
+        status of the post
+
+    Returns
+    --------
+    post: dict
+        `wp.newPost` content
+    """
+    post = {'post_type'   : 'post',
+            'post_status' : post_status,
+            'post_title'  : blog_content['title'],
+            'post_content': blog_content['description'],
+            'post_date'   : xmlrpc.client.DateTime(post_date),
+            'terms_names' : {'category': list(blog_content.get('categories', []))}}
+
+    return post
@@ -26,6 +26,9 @@ conda activate $ENV_NAME
 cd $proj_dir
 # Run AJC Script
 python AJC_Scheduler/AJC_Reminders.py >> AJC_Scheduler/ajc_log 2>&1
+# Send the emails queued by the AJC Script, retrying in the background
+# until the 8pm deadline of the reminders
+python AJC_Scheduler/ajc_outbox.py --until 20:00 >> AJC_Scheduler/ajc_log 2>&1 &
 # Run Astro Website Script
 python Astroweb_post/Astroweb_updates_xmlrpc.py >> Astroweb_post/updatelog2 2>&1
 # Deactivating Environment
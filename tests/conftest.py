@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+The scripts import their helper modules by name, from their own directory.
+The XML-RPC tests share a local stand-in of the WordPress site.
+"""
+import os
+import sys
+import time
+import threading
+import itertools
+from xmlrpc.server import SimpleXMLRPCServer
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for script_dir in ['AJC_Scheduler', 'Astroweb_post']:
+    sys.path.insert(0, os.path.join(ROOT_DIR, script_dir))
+
+import wp_ledger
+
+class WordPressStub(SimpleXMLRPCServer):
+    """
+    Local stand-in of the XML-RPC API of WordPress. Posts whose title
+    contains `bad` are rejected. `delay` slows down every new post, and
+    `getposts_fault` makes `wp.getPosts` raise a fault.
+    """
+    def __init__(self, multicall=True, port=0):
+        SimpleXMLRPCServer.__init__(self, ('127.0.0.1', port), allow_none=True,
+            logRequests=False)
+        self.multicall = multicall
+        self.delay     = 0
+        self.getposts_fault = False
+        self.posts     = []
+        self.requests  = []
+        self._ids      = itertools.count(100)
+        self.register_function(self.new_post, 'metaWeblog.newPost')
+        self.register_function(self.new_post, 'wp.newPost')
+        self.register_function(self.get_posts, 'wp.getPosts')
+        if multicall:
+            self.register_multicall_functions()
+
+    def _dispatch(self, method, params):
+        self.requests.append(method)
+        return SimpleXMLRPCServer._dispatch(self, method, params)
+
+    def new_post(self, blog_id, username, password, blog_content,
+        publish=True):
+        time.sleep(self.delay)
+        title = blog_content.get('title', blog_content.get('post_title'))
+        if 'bad' in title:
+            raise ValueError('Invalid post')
+        post_id = str(next(self._ids))
+        self.posts.append({ 'post_id'   : post_id,
+                            'post_title': title,
+                            'post_date' : blog_content.get('post_date',
+                                            '2026-10-18 09:00:00'),
+                            'post_status': 'publish'})
+        return post_id
+
+    def get_posts(self, blog_id, username, password, post_filter,
+        fields=None):
+        if self.getposts_fault:
+            raise ValueError('XML-RPC services are disabled')
+        return self.posts[::-1][:post_filter.get('number', 10)]
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:{0}'.format(self.server_address[1])
+
+def serve(server):
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server
+
+@pytest.fixture
+def wp_stub(request):
+    # `multicall` can be set with indirect parametrization
+    server = serve(WordPressStub(multicall=getattr(request, 'param', True)))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def ledger(tmp_path):
+    with wp_ledger.PostLedger(str(tmp_path / 'ledger.sqlite')) as ledger:
+        yield ledger
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the paper lookups of `AJC_Reminders`, against stand-ins of the
+`ads` and `arxiv` clients: batched prefetch and hedged lookups.
+"""
+import time
+
+import pytest
+
+import ajc_metadata
+import AJC_Reminders
+
+ads   = pytest.importorskip('ads')
+arxiv = pytest.importorskip('arxiv')
+
+class Paper(object):
+    def __init__(self, arxiv_id, title, authors):
+        self.identifier = ['2019ApJ...1..1S', 'arXiv:{0}'.format(arxiv_id)]
+        self.title      = [title]
+        self.author     = authors
+
+class FakeADS(object):
+    """
+    Stand-in of `ads.SearchQuery`, which knows about `papers` and records
+    every query.
+    """
+    def __init__(self, papers):
+        self.papers  = papers
+        self.queries = []
+
+    def __call__(self, **kwargs):
+        self.queries.append(kwargs)
+        return iter([paper for paper in self.papers
+                        if paper.identifier[1] in kwargs['q']])
+
+class FakeArXiv(object):
+    """
+    Stand-in of `arxiv.query`, which knows about `papers` and records
+    every query.
+    """
+    def __init__(self, papers):
+        self.papers  = papers
+        self.queries = []
+
+    def __call__(self, id_list):
+        self.queries.append(list(id_list))
+        return [self.papers[id_ii] for id_ii in id_list
+                    if id_ii in self.papers]
+
+def arxiv_paper(arxiv_id, title):
+    return {'id'       : 'http://arxiv.org/abs/{0}v1'.format(arxiv_id),
+            'arxiv_url': 'http://arxiv.org/abs/{0}v1'.format(arxiv_id),
+            'title'    : title,
+            'authors'  : ['Jane Doe']}
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ajc_metadata.MetadataCache(str(tmp_path / 'metadata.sqlite'))
+    monkeypatch.setattr(AJC_Reminders, '_metadata_cache', cache)
+    yield cache
+    cache.close()
+
+@pytest.fixture
+def backends(monkeypatch):
+    fake_ads   = FakeADS([Paper('1901.00001', 'Foo', ['Smith, J.'])])
+    fake_arxiv = FakeArXiv({'1901.00002': arxiv_paper('1901.00002', 'Bar')})
+    monkeypatch.setattr(ads, 'SearchQuery', fake_ads)
+    monkeypatch.setattr(arxiv, 'query', fake_arxiv, raising=False)
+    return fake_ads, fake_arxiv
+
+def test_batch_query(backends):
+    fake_ads, fake_arxiv = backends
+    resolved = AJC_Reminders.ADS_batch_query(['1901.00001', '1901.00002',
+                    '1901.00003', '1901.00001'])
+    # One query per backend, for every paper ADS did not return
+    assert len(fake_ads.queries) == 1
+    assert fake_ads.queries[0]['q'] == \
+        'arXiv:1901.00001 OR arXiv:1901.00002 OR arXiv:1901.00003'
+    assert fake_arxiv.queries == [['1901.00002', '1901.00003']]
+    assert resolved == {
+        '1901.00001': {'link'   : 'http://adsabs.harvard.edu/abs/arXiv:1901.00001',
+                       'title'  : 'Foo',
+                       'authors': ['Smith, J.'],
+                       'source' : 'ads'},
+        '1901.00002': {'link'   : 'http://arxiv.org/abs/1901.00002v1',
+                       'title'  : 'Bar',
+                       'authors': ['Jane Doe'],
+                       'source' : 'arxiv'}}
+
+def test_prefetch(cache, backends):
+    pd = pytest.importorskip('pandas')
+    fake_ads, fake_arxiv = backends
+    cache.put([ajc_metadata.arxiv_key('1901.00004')], link='cached',
+        title='Baz', authors=[])
+    dates = pd.to_datetime(['2026-10-14', '2026-10-21', '2026-10-28',
+                            '2026-11-04', '2026-11-11', '2026-11-18'])
+    ajc_gs_pd = pd.DataFrame({
+        'Date'    : dates,
+        'Title'   : ['Past', 'Foo', 'Bar', 'Missing', 'Baz', 'No paper'],
+        'author'  : ['Roe', 'Smith', 'Doe', 'Poe', 'Zed', None],
+        'year'    : [2018, 2019, 2019, 2019, 2019, None],
+        'arxiv_id': ['1901.00009', '1901.00001', '1901.00002',
+                     '1901.00003', '1901.00004', None]},
+        index=pd.Index(['Roe_Ann', 'Smith_Jo', 'Doe_Jane', 'Poe_Ed',
+                        'Zed_Ada', 'Doe_John'], name='Name'))
+    now_dict = {'year': '2026', 'month': '10', 'day': '18'}
+    ads_pd = AJC_Reminders.ADS_Testing(ajc_gs_pd, now_dict)
+    # Past papers are skipped, and cached papers are not looked up again
+    assert ads_pd['Speaker'].tolist() == ['Smith_Jo', 'Doe_Jane', 'Poe_Ed',
+                                          'Zed_Ada', 'Doe_John']
+    assert ads_pd['status'].tolist() == ['ads', 'arxiv', 'unresolved',
+                                         'cached', 'unparsed']
+    assert fake_arxiv.queries == [['1901.00002', '1901.00003']]
+    ## `ADS_Query` is answered from the cache
+    queries = (fake_ads.queries[:], fake_arxiv.queries[:])
+    assert AJC_Reminders.ADS_Query('Smith', 2019, '1901.00001') == \
+        ('http://adsabs.harvard.edu/abs/arXiv:1901.00001', 1)
+    assert AJC_Reminders.ADS_Query('Doe', 2019, '1901.00002') == \
+        ('http://arxiv.org/abs/1901.00002v1', 1)
+    assert (fake_ads.queries, fake_arxiv.queries) == queries
+
+def backend(result, delay=0):
+    def lookup(*args):
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return lookup
+
+ADS_PAPER   = {'link': 'ads', 'title': 'Foo', 'authors': []}
+ARXIV_PAPER = {'link': 'arxiv', 'title': 'Foo', 'authors': []}
+
+def test_hedged_lookup(cache, monkeypatch):
+    lookup = AJC_Reminders.ADS_hedged_lookup
+    monkeypatch.setattr(AJC_Reminders, 'ADS_lookup', backend(ADS_PAPER, 1))
+    monkeypatch.setattr(AJC_Reminders, 'arXiv_lookup', backend(ARXIV_PAPER))
+    # ADS is slower than the hedge delay: arXiv answers first
+    start = time.time()
+    assert lookup('Smith', 2019, '1901.00001', hedge_delay=0.05,
+                deadline=5) == (ARXIV_PAPER, False)
+    assert time.time() - start < 0.5
+    stats = cache.lookup_stats()
+    assert (stats['ads']['calls'], stats['ads']['abandoned']) == (1, 1)
+    assert (stats['arxiv']['calls'], stats['arxiv']['wins']) == (1, 1)
+    # ADS answers within the hedge delay: arXiv is never queried
+    monkeypatch.setattr(AJC_Reminders, 'ADS_lookup', backend(ADS_PAPER))
+    assert lookup('Smith', 2019, '1901.00001', hedge_delay=0.5,
+                deadline=5) == (ADS_PAPER, False)
+    assert cache.lookup_stats()['arxiv']['calls'] == 1
+    assert cache.lookup_stats()['ads']['wins'] == 1
+
+def test_hedged_lookup_failures(cache, monkeypatch):
+    lookup = AJC_Reminders.ADS_hedged_lookup
+    # ADS fails: arXiv is queried right away, even without hedging
+    monkeypatch.setattr(AJC_Reminders, 'ADS_lookup',
+        backend(ValueError('ADS is down')))
+    monkeypatch.setattr(AJC_Reminders, 'arXiv_lookup', backend(ARXIV_PAPER))
+    start = time.time()
+    assert lookup('Smith', 2019, '1901.00001', hedge_delay=None,
+                deadline=5) == (ARXIV_PAPER, False)
+    assert time.time() - start < 0.5
+    assert cache.lookup_stats()['ads']['errors'] == 1
+    # Both backends answer without the paper: a miss
+    monkeypatch.setattr(AJC_Reminders, 'ADS_lookup', backend(None))
+    monkeypatch.setattr(AJC_Reminders, 'arXiv_lookup', backend(None))
+    assert lookup('Smith', 2019, '1901.00001', hedge_delay=0.05,
+                deadline=5) == (None, True)
+    # Both backends are too slow: not a miss, and the deadline is kept
+    monkeypatch.setattr(AJC_Reminders, 'ADS_lookup', backend(ADS_PAPER, 1))
+    monkeypatch.setattr(AJC_Reminders, 'arXiv_lookup', backend(ARXIV_PAPER, 1))
+    start = time.time()
+    assert lookup('Smith', 2019, '1901.00001', hedge_delay=0.05,
+                deadline=0.2) == (None, False)
+    assert time.time() - start < 0.5
+    assert cache.lookup_stats()['arxiv']['abandoned'] == 1
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the eviction of `ajc_cache.HTTPCache`.
+"""
+import os
+import time
+
+import ajc_cache
+
+def test_evict_keeps_entries_being_stored(tmp_path):
+    cache = ajc_cache.HTTPCache(cache_dir=str(tmp_path), max_size=0,
+                max_age=3600)
+    cache.store('http://example.edu/old', b'old page')
+    ## Entry of another thread: body written, metadata not yet
+    body_path = cache._path('http://example.edu/new', 'body')
+    with open(body_path, 'wb') as body_file:
+        body_file.write(b'new page')
+    tmp_path_ii = cache._path('http://example.edu/new', 'json.tmp123')
+    with open(tmp_path_ii, 'w') as tmp_file:
+        tmp_file.write('{')
+    ## Entry left by a crash, long ago
+    orphan_path = cache._path('http://example.edu/orphan', 'body')
+    with open(orphan_path, 'wb') as orphan_file:
+        orphan_file.write(b'orphan page')
+    old_time = time.time() - 7200
+    os.utime(orphan_path, (old_time, old_time))
+    cache.evict()
+    # Over `max_size`: the complete entry goes, the one being stored stays
+    assert cache.lookup('http://example.edu/old') is None
+    assert os.path.exists(body_path)
+    assert os.path.exists(tmp_path_ii)
+    assert not os.path.exists(orphan_path)
+
+def test_evict_runs_once_at_a_time(tmp_path):
+    cache = ajc_cache.HTTPCache(cache_dir=str(tmp_path), max_size=0)
+    cache.store('http://example.edu/page', b'page')
+    with cache._evict_lock:
+        # Another thread is evicting: nothing is removed by this one
+        cache.store('http://example.edu/other', b'other page')
+        assert os.path.exists(cache._path('http://example.edu/other', 'body'))
+    cache.evict()
+    assert os.listdir(str(tmp_path)) == []
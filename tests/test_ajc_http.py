@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the page downloads of `AJC_Reminders` against a local HTTP
+stand-in of `as.vanderbilt.edu`.
+"""
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import ajc_cache
+import AJC_Reminders
+
+class PageHandler(BaseHTTPRequestHandler):
+    """
+    Serves `server.pages`, with an `ETag`, after `server.delay` seconds.
+    Unknown pages are `404`.
+    """
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        time.sleep(self.server.delay)
+        if self.server.status != 200:
+            self.send_response(self.server.status)
+            self.end_headers()
+            return
+        body = self.server.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = '"{0}"'.format(ajc_cache.body_digest(body))
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+class PageServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        ThreadingHTTPServer.__init__(self, ('127.0.0.1', 0), PageHandler)
+        self.pages    = {}
+        self.requests = []
+        self.delay    = 0
+        self.status   = 200
+
+    def url(self, path):
+        return 'http://127.0.0.1:{0}{1}'.format(self.server_address[1], path)
+
+@pytest.fixture
+def page_server(tmp_path, monkeypatch):
+    server = PageServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    monkeypatch.setattr(AJC_Reminders, '_http_cache',
+        ajc_cache.HTTPCache(cache_dir=str(tmp_path / 'http')))
+    monkeypatch.setattr(AJC_Reminders, 'STALE_PAGES', {})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def test_fetch_pages_concurrently(page_server):
+    paths = ['/ajc', '/graduate', '/faculty']
+    for path in paths:
+        page_server.pages[path] = 'page {0}'.format(path)
+    page_server.delay = 0.5
+    urls  = [page_server.url(path) for path in paths]
+    start = time.time()
+    html_dict = AJC_Reminders.fetch_pages(urls, max_workers=3)
+    # The three pages are downloaded at the same time
+    assert time.time() - start < 1.2
+    assert html_dict == dict((page_server.url(path), 'page ' + path)
+                                for path in paths)
+    ## Errors of any page are raised
+    with pytest.raises(ValueError):
+        AJC_Reminders.fetch_pages(urls + [page_server.url('/missing')])
+
+def test_serve_stale_when_slow(page_server):
+    url = page_server.url('/ajc')
+    page_server.pages['/ajc'] = 'version 1'
+    assert AJC_Reminders.url_fetch(url) == 'version 1'
+    # The server does not answer within the budget: cached copy
+    page_server.pages['/ajc'] = 'version 2'
+    page_server.delay = 0.5
+    start = time.time()
+    assert AJC_Reminders.url_fetch(url, budget=0.1,
+                revalidate=True) == 'version 1'
+    assert time.time() - start < 0.4
+    assert url in AJC_Reminders.STALE_PAGES
+    # The download finishes in the background and updates the cache
+    time.sleep(1)
+    assert url not in AJC_Reminders.STALE_PAGES
+    page_server.status = 500
+    assert AJC_Reminders.url_fetch(url) == 'version 2'
+
+def test_serve_stale_on_error(page_server, monkeypatch, capsys):
+    monkeypatch.setattr(AJC_Reminders, 'STALE_ALERT', 0)
+    url = page_server.url('/ajc')
+    page_server.pages['/ajc'] = 'version 1'
+    assert AJC_Reminders.url_fetch(url) == 'version 1'
+    page_server.status = 500
+    assert AJC_Reminders.url_fetch(url, revalidate=True) == 'version 1'
+    assert url in AJC_Reminders.STALE_PAGES
+    assert 'ALERT: `{0}`'.format(url) in capsys.readouterr().err
+    # Revalidated with a `304` once the server is back
+    page_server.status = 200
+    assert AJC_Reminders.url_fetch(url, revalidate=True) == 'version 1'
+    assert url not in AJC_Reminders.STALE_PAGES
+    assert len(page_server.requests) == 3
+    # Nothing to fall back on
+    page_server.status = 500
+    with pytest.raises(ValueError):
+        AJC_Reminders.url_fetch(page_server.url('/graduate'))
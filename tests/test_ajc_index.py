@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `ajc_index.ScheduleIndex`, including the migration of indices
+built by older versions.
+"""
+import sqlite3
+
+import ajc_index
+
+def make_record(date_str, speaker, reminder, send_email):
+    record = dict((col, None) for col in ajc_index.SCHEDULE_COLS)
+    record.update({ 'speaker'   : speaker,
+                    'date'      : date_str,
+                    'reminder'  : reminder,
+                    'send_email': send_email,
+                    'row_hash'  : ajc_index.row_hash(date_str, speaker, None)})
+
+    return record
+
+def test_row_hash():
+    row = ajc_index.row_hash('2026-10-21', 'Doe_Jane', 'Foo')
+    assert row == ajc_index.row_hash('2026-10-21', 'Doe_Jane', 'Foo')
+    assert len(row) == 40
+    # Any field changes the hash, and missing fields are empty
+    assert row != ajc_index.row_hash('2026-10-21', 'Doe_Jane', 'Bar')
+    assert row != ajc_index.row_hash('2026-10-28', 'Doe_Jane', 'Foo')
+    assert ajc_index.row_hash('2026-10-21', 'Doe_Jane', None) == \
+        ajc_index.row_hash('2026-10-21', 'Doe_Jane', '')
+
+def test_migrates_first_version(tmp_path):
+    db_path = str(tmp_path / 'schedule.sqlite')
+    ## Index of the first version: no added columns
+    conn = sqlite3.connect(db_path)
+    conn.execute("""CREATE TABLE schedule (speaker TEXT, date TEXT,
+                    reminder TEXT, send_email TEXT, email TEXT,
+                    first_name TEXT, last_name TEXT, people_type TEXT,
+                    title TEXT)""")
+    conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+    conn.execute("""INSERT INTO schedule (speaker, date, reminder, send_email)
+                    VALUES ('Jane Doe', '2026-10-21', '2026-10-14',
+                    '2026-10-19')""")
+    conn.execute("INSERT INTO meta VALUES ('source_digest', 'abc')")
+    conn.execute("INSERT INTO meta VALUES ('roster_digest', 'def')")
+    conn.commit()
+    conn.close()
+    index = ajc_index.ScheduleIndex(db_path)
+    try:
+        cols = [row['name'] for row in
+                    index.conn.execute('PRAGMA table_info(schedule)')]
+        assert cols == ajc_index.SCHEDULE_COLS
+        # Rows are kept, the rosters are resolved again
+        assert index.source_digest() == 'abc'
+        assert index.roster_digest() is None
+        rows = index.rows()
+        assert [row['speaker'] for row in rows] == ['Jane Doe']
+        assert rows[0]['candidate'] is None
+    finally:
+        index.close()
+    ## Opening a migrated index again keeps its rosters
+    index = ajc_index.ScheduleIndex(db_path)
+    try:
+        index.refresh(index.rows(), 'abc', roster_digest='ghi')
+    finally:
+        index.close()
+    index = ajc_index.ScheduleIndex(db_path)
+    try:
+        assert index.roster_digest() == 'ghi'
+    finally:
+        index.close()
+
+def test_refresh_and_due(tmp_path):
+    index = ajc_index.ScheduleIndex(str(tmp_path / 'schedule.sqlite'))
+    try:
+        records = [ make_record('2026-10-21', 'Jane Doe', '2026-10-14',
+                        '2026-10-19'),
+                    make_record('2026-10-28', 'John Roe', '2026-10-21',
+                        '2026-10-26')]
+        index.refresh(records, 'abc', roster_digest='def')
+        assert index.rows() == records
+        assert [row['speaker'] for row in index.due('2026-10-19')] == \
+            ['Jane Doe']
+        assert index.due('2026-10-20') == []
+        # Catching up on missed days
+        assert [row['speaker'] for row in
+                    index.due('2026-10-21', since_str='2026-10-13')] == \
+            ['Jane Doe', 'John Roe']
+        index.set_last_run('2026-10-21')
+        assert index.last_run() == '2026-10-21'
+    finally:
+        index.close()
+
+def test_touch_without_validation(tmp_path):
+    index = ajc_index.ScheduleIndex(str(tmp_path / 'schedule.sqlite'))
+    try:
+        assert index.validated() is None
+        index.refresh([], 'abc')
+        validated = index.validated()
+        assert validated is not None
+        # Stale pages: the digest changes, the validation time does not
+        index.touch(source_digest='def', validated=False)
+        assert index.source_digest() == 'def'
+        assert index.validated() == validated
+        index.refresh([], 'ghi', validated=False)
+        assert index.validated() == validated
+    finally:
+        index.close()
+
+def test_is_fresh(tmp_path):
+    index = ajc_index.ScheduleIndex(str(tmp_path / 'schedule.sqlite'),
+                ttl=3600)
+    try:
+        assert not index.is_fresh()
+        # Stale pages do not make the index fresh
+        index.refresh([], 'abc', validated=False)
+        assert not index.is_fresh()
+        index.touch()
+        assert index.is_fresh()
+        index.ttl = 0
+        assert not index.is_fresh()
+    finally:
+        index.close()
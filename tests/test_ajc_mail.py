@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `ajc_mail.Mailer` against a local SMTP stand-in.
+"""
+import smtplib
+import threading
+import socketserver
+from email.mime.text import MIMEText
+
+import pytest
+
+import ajc_mail
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """
+    Minimal SMTP server. Recipients containing `bad` are refused.
+    """
+    def reply(self, line):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        self.reply('220 stub')
+        rcpt_list = []
+        while True:
+            line = self.rfile.readline().decode('ascii').rstrip('\r\n')
+            if not line:
+                return
+            cmd = line.split(' ')[0].upper().split(':')[0]
+            if cmd == 'EHLO':
+                extn = ['PIPELINING'] if self.server.pipelining else []
+                for ext in ['stub'] + extn[:-1]:
+                    self.reply('250-' + ext)
+                self.reply('250 ' + (extn[-1] if extn else 'HELP'))
+            elif cmd == 'MAIL':
+                rcpt_list = []
+                self.reply('250 OK')
+            elif cmd == 'RCPT':
+                if 'bad' in line:
+                    self.reply('550 no such user')
+                else:
+                    rcpt_list.append(line.split(':', 1)[1].strip('<>'))
+                    self.reply('250 OK')
+            elif cmd == 'DATA':
+                if not rcpt_list:
+                    self.reply('554 no valid recipients')
+                    continue
+                self.reply('354 go ahead')
+                data = []
+                while True:
+                    data_line = self.rfile.readline().decode('ascii')
+                    if data_line == '.\r\n':
+                        break
+                    # Dot-stuffing
+                    if data_line.startswith('.'):
+                        data_line = data_line[1:]
+                    data.append(data_line)
+                self.server.messages.append((rcpt_list, ''.join(data)))
+                self.reply('250 queued')
+            elif cmd == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                # RSET, NOOP, ...
+                self.reply('250 OK')
+
+class SMTPStub(socketserver.ThreadingTCPServer):
+    daemon_threads      = True
+    allow_reuse_address = True
+
+    def __init__(self, pipelining=True):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0),
+            SMTPHandler)
+        self.pipelining = pipelining
+        self.messages   = []
+
+class RecordingSMTP(smtplib.SMTP):
+    """
+    `smtplib.SMTP` keeping every write sent to the server.
+    """
+    writes = []
+
+    def send(self, s):
+        RecordingSMTP.writes.append(s if isinstance(s, str) else s.decode())
+        smtplib.SMTP.send(self, s)
+
+@pytest.fixture(params=[True, False], ids=['pipelining', 'no-pipelining'])
+def smtp_stub(request):
+    server = SMTPStub(pipelining=request.param)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    RecordingSMTP.writes = []
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_mailer(server):
+    return ajc_mail.Mailer(host='127.0.0.1', port=server.server_address[1],
+                use_tls=False, login=False, my_email='ajc@vanderbilt.edu',
+                timeout=5, smtp_class=RecordingSMTP)
+
+def test_send_and_dot_stuffing(smtp_stub):
+    msg = MIMEText('Hello\n.starts with a dot\n..two dots\n')
+    with make_mailer(smtp_stub) as mailer:
+        assert mailer.send(msg, ['first.last@vanderbilt.edu'])
+        assert mailer.send(msg, ['first.last@vanderbilt.edu'])
+    assert len(smtp_stub.messages) == 2
+    rcpt_list, data = smtp_stub.messages[0]
+    assert rcpt_list == ['first.last@vanderbilt.edu']
+    assert '\r\n.starts with a dot\r\n..two dots\r\n' in data
+    # Envelope and `DATA` go out in one write when pipelining
+    envelope_writes = [write for write in RecordingSMTP.writes
+                        if write.upper().startswith('MAIL FROM')]
+    assert len(envelope_writes) == 2
+    if smtp_stub.pipelining:
+        assert all(('RCPT TO' in write.upper()) and write.endswith('DATA\r\n')
+                    for write in envelope_writes)
+    else:
+        assert not any('RCPT TO' in write.upper() for write in envelope_writes)
+
+def test_refused_recipient(smtp_stub):
+    msg = MIMEText('Hello')
+    with make_mailer(smtp_stub) as mailer:
+        refused = mailer.transaction(msg.as_string(),
+                    ['good@vanderbilt.edu', 'bad@vanderbilt.edu'])
+        assert list(refused) == ['bad@vanderbilt.edu']
+        assert refused['bad@vanderbilt.edu'][0] == 550
+        # Every recipient refused: nothing is sent, the session is reset
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            mailer.send(msg, ['bad@vanderbilt.edu'])
+        assert mailer.send(msg, ['other@vanderbilt.edu'])
+    assert [rcpt_list for rcpt_list, data in smtp_stub.messages] == \
+        [['good@vanderbilt.edu'], ['other@vanderbilt.edu']]
+
+def test_reconnects_after_disconnect(smtp_stub):
+    msg = MIMEText('Hello')
+    with make_mailer(smtp_stub) as mailer:
+        assert mailer.send(msg, ['first.last@vanderbilt.edu'])
+        # Server side of the session goes away
+        mailer.server.close()
+        assert mailer.send(msg, ['first.last@vanderbilt.edu'])
+    assert len(smtp_stub.messages) == 2
+
+def test_reset_closes_socket(smtp_stub):
+    with make_mailer(smtp_stub) as mailer:
+        assert mailer.send(MIMEText('Hello'), ['first.last@vanderbilt.edu'])
+        sock = mailer.server.sock
+        mailer.reset()
+        assert mailer.server is None
+        assert sock.fileno() == -1
+
+def test_pool_records_every_error(smtp_stub, monkeypatch):
+    # Missing credentials fail every message, without stopping the workers
+    monkeypatch.delenv('ajc_user', raising=False)
+    pool = ajc_mail.MailerPool(size=2, rate=0, host='127.0.0.1',
+                port=smtp_stub.server_address[1], use_tls=False, login=True,
+                my_email='ajc@vanderbilt.edu', timeout=5)
+    results = pool.send_many([(MIMEText('Hello'), ['first.last@vanderbilt.edu'])
+                                for ii in range(3)])
+    assert [result['status'] for result in results] == ['error'] * 3
+    assert results[0]['error'].startswith('KeyError')
+    assert smtp_stub.messages == []
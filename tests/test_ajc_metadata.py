@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `ajc_metadata.MetadataCache`: TTL, negative caching and LRU
+eviction.
+"""
+import pytest
+
+import ajc_metadata
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 1000.
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(ajc_metadata, 'time', clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, fake_time):
+    cache = ajc_metadata.MetadataCache(str(tmp_path / 'metadata.sqlite'),
+                ttl=100, miss_ttl=10, max_entries=2)
+    yield cache
+    cache.close()
+
+def test_arxiv_key():
+    assert ajc_metadata.arxiv_key(' 1901.00001V2 ') == 'arxiv:1901.00001v2'
+    assert ajc_metadata.arxiv_key('astro-ph/0601001') == \
+        'arxiv:astro-ph/0601001'
+
+def test_ttl(cache, fake_time):
+    key = ajc_metadata.arxiv_key('1901.00001')
+    assert cache.get(key) is None
+    cache.put([key], link='https://ui.adsabs.harvard.edu/abs/x',
+        title='Foo', authors=['Smith, J.'])
+    assert cache.get(key) == {'found'  : True,
+                              'link'   : 'https://ui.adsabs.harvard.edu/abs/x',
+                              'title'  : 'Foo',
+                              'authors': ['Smith, J.']}
+    fake_time.now += 100
+    assert cache.get(key) is None
+
+def test_misses(cache, fake_time):
+    key = ajc_metadata.arxiv_key('9999.99999')
+    cache.put_miss([key])
+    assert cache.get(key)['found'] is False
+    # Misses expire sooner than resolved papers
+    fake_time.now += 10
+    assert cache.get(key) is None
+
+def test_lru_eviction(cache, fake_time):
+    keys = [ajc_metadata.arxiv_key('1901.0000{0}'.format(ii))
+                for ii in range(3)]
+    cache.put(keys[:1], title='first')
+    fake_time.now += 1
+    cache.put(keys[1:2], title='second')
+    fake_time.now += 1
+    # Reading the first paper makes the second one the least recently used
+    assert cache.get(keys[0])['title'] == 'first'
+    fake_time.now += 1
+    cache.put(keys[2:], title='third')
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0])['title'] == 'first'
+    assert cache.get(keys[2])['title'] == 'third'
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the speaker lookup of `ajc_names`.
+"""
+import ajc_names
+
+ROSTER = ['Jane Doe', 'John Roe', u'José Núñez', 'Mary Ann Smith',
+          'Robert Brown', 'Janet Dunn']
+
+def test_exact_match():
+    index = ajc_names.NameIndex(ROSTER)
+    # Order, case, accents and nicknames do not matter
+    assert index.match('Doe_Jane') == ('Jane Doe', 1.)
+    assert index.match('jose nunez') == (u'José Núñez', 1.)
+    assert index.match('Bob Brown') == ('Robert Brown', 1.)
+
+def test_approximate_match():
+    index = ajc_names.NameIndex(ROSTER)
+    match_name, score = index.match('Jayne Doe')
+    assert match_name == 'Jane Doe'
+    assert ajc_names.NAME_MATCH_MIN < score < 1.
+    # Missing middle name
+    match_name, score = index.match('Mary Smith')
+    assert match_name == 'Mary Ann Smith'
+    assert score == ajc_names.SUBSET_SCORE
+
+def test_thresholds():
+    index = ajc_names.NameIndex(ROSTER)
+    # No shared token, or a single token: never a match
+    assert index.match('Jayne Dough') == (None, 0.)
+    assert index.match('Doe') == (None, 0.)
+    # Below `min_score`
+    match_name, score = index.match('Zed Doe')
+    assert match_name is None
+    assert 0. < score < ajc_names.NAME_MATCH_MIN
+    assert index.match('Zed Doe', min_score=0.)[0] == 'Jane Doe'
+
+def test_candidates_share_a_token():
+    index = ajc_names.NameIndex(ROSTER)
+    # `Janet Dunn` shares trigrams with `Jane Doe`, but no token
+    assert [index.names[idx] for idx in
+                index.candidates(ajc_names.name_tokens('Jane Doe'))] == \
+        ['Jane Doe']
+    assert index.candidates(ajc_names.name_tokens('Someone Else')) == set()
+
+def test_token_score():
+    tokens = ajc_names.name_tokens
+    assert ajc_names.token_score(set(tokens('Jane Doe')),
+                set(tokens('Jane Doe'))) == 1.
+    # Mean of the pairs: `doe` = 1, `jane` ~ `jayne`
+    score = ajc_names.token_score(set(tokens('Jane Doe')),
+                set(tokens('Jayne Doe')))
+    grams_a = ajc_names.ngrams(['jane'])
+    grams_b = ajc_names.ngrams(['jayne'])
+    dice = 2. * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+    assert abs(score - min((1. + dice) / 2., ajc_names.SUBSET_SCORE)) < 1e-9
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the outbox of `AJC_Reminders`: dedupe keys, backoff,
+dead-lettering and the `drain_until` worker.
+"""
+import os
+import fcntl
+import smtplib
+from email.mime.text import MIMEText
+
+import pytest
+
+import ajc_outbox
+
+class FakeTime(object):
+    """
+    Clock of `ajc_outbox`, moved forward by `sleep`.
+    """
+    def __init__(self):
+        self.now    = 1000.
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeMailer(object):
+    """
+    Mailer whose first `failures` sends fail with `error`.
+    """
+    sent = []
+
+    def __init__(self, failures=0, error=smtplib.SMTPServerDisconnected):
+        self.failures = failures
+        self.error    = error
+        self.server   = None
+
+    def __call__(self):
+        return self
+
+    def send_raw(self, msg_str, to_list, from_email=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise self.error('down')
+        FakeMailer.sent.append(to_list)
+
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def fake_time(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(ajc_outbox, 'time', clock)
+    return clock
+
+@pytest.fixture
+def outbox(tmp_path, fake_time):
+    FakeMailer.sent = []
+    return ajc_outbox.Outbox(str(tmp_path / 'outbox'),
+                my_email='ajc@vanderbilt.edu')
+
+def queue(outbox, speaker='Doe_Jane', kind='reminder'):
+    return outbox.send(MIMEText('Hello'), ['jane.doe@vanderbilt.edu'],
+                dedupe=(speaker, '2026-10-21', kind))
+
+def test_dedupe_key(outbox):
+    key = ajc_outbox.dedupe_key('Doe_Jane', '2026-10-21', 'reminder')
+    assert key == ajc_outbox.dedupe_key('Doe_Jane', '2026-10-21', 'reminder')
+    assert key != ajc_outbox.dedupe_key('Doe_Jane', '2026-10-21',
+                    'announcement')
+    assert queue(outbox)
+    assert outbox.state(key) == 'pending'
+    # Re-running the pipeline does not queue the email again
+    assert not queue(outbox)
+    assert queue(outbox, kind='announcement')
+    assert len(outbox.pending()) == 2
+
+def test_backoff(outbox, fake_time):
+    queue(outbox)
+    envelope = outbox.pending()[0]
+    for attempt in range(1, 4):
+        outbox.mark_failed(envelope, 'down', base_delay=60, max_delay=150)
+        envelope = outbox.pending(now=float('inf'))[0]
+        assert envelope['attempts'] == attempt
+        assert envelope['last_error'] == 'down'
+        # Doubling delay, capped by `max_delay`, with 10% jitter
+        delay = min(150, 60 * 2**(attempt - 1))
+        assert 0.9 * delay <= envelope['next_attempt'] - fake_time.now <= \
+            1.1 * delay
+    assert outbox.pending() == []
+
+def test_dead_letter(outbox):
+    queue(outbox)
+    queue(outbox, speaker='Roe_John')
+    first, second = outbox.pending()
+    outbox.mark_failed(first, 'down', max_attempts=2)
+    outbox.mark_failed(outbox.pending(now=float('inf'))[0], 'down',
+        max_attempts=2)
+    assert outbox.state(first['key']) == 'dead'
+    # Permanent errors are not retried
+    outbox.mark_failed(second, 'no such user', permanent=True)
+    assert outbox.state(second['key']) == 'dead'
+    assert outbox.pending(now=float('inf')) == []
+
+def test_drain_until_retries(outbox, fake_time):
+    queue(outbox)
+    mailer = FakeMailer(failures=2)
+    deadline = fake_time.now + 3600
+    assert ajc_outbox.drain_until(deadline, outbox=outbox,
+                sleep=fake_time.sleep, mailer_factory=mailer) == 1
+    assert FakeMailer.sent == [['jane.doe@vanderbilt.edu']]
+    assert len(fake_time.sleeps) == 2
+    assert outbox.pending(now=float('inf')) == []
+
+def test_drain_until_deadline(outbox, fake_time):
+    queue(outbox)
+    mailer = FakeMailer(failures=100)
+    deadline = fake_time.now + 600
+    assert ajc_outbox.drain_until(deadline, outbox=outbox,
+                sleep=fake_time.sleep, mailer_factory=mailer) == 0
+    # Left for the next run
+    envelope = outbox.pending(now=float('inf'))[0]
+    assert envelope['next_attempt'] > deadline
+    assert fake_time.now <= deadline
+
+def test_drain_until_other_worker(outbox, fake_time):
+    queue(outbox)
+    with open(os.path.join(outbox.spool_dir, 'worker.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        assert ajc_outbox.drain_until(fake_time.now + 3600, outbox=outbox,
+                    sleep=fake_time.sleep, mailer_factory=FakeMailer()) == 0
+    assert fake_time.sleeps == []
+    assert len(outbox.pending()) == 1
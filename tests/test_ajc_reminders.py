@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `AJC_Reminders`: days on which no email can be due, the parsing
+of the `Title` column and of the people pages, the incremental refresh of
+the schedule index, and the dry run of the daily emails.
+"""
+import json
+import datetime
+
+import pytest
+
+import ajc_cache
+import ajc_index
+import AJC_Reminders
+
+@pytest.fixture
+def http_cache(tmp_path, monkeypatch):
+    cache = ajc_cache.HTTPCache(cache_dir=str(tmp_path / 'http'))
+    monkeypatch.setattr(AJC_Reminders, '_http_cache', cache)
+    return cache
+
+def now_dict(date_str):
+    date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
+    return {'year': date.strftime('%Y'), 'month': date.strftime('%m'),
+            'day': date.strftime('%d')}
+
+def test_calendar_idle():
+    # Sunday: no AJC on Tuesday or Monday
+    assert AJC_Reminders.calendar_idle(now_dict('2026-10-18'))
+    # Reminder and `PHYS_AJC` days of the AJC on Wednesday
+    assert not AJC_Reminders.calendar_idle(now_dict('2026-10-19'))
+    assert not AJC_Reminders.calendar_idle(now_dict('2026-10-20'))
+    # No AJC during the summer break
+    assert AJC_Reminders.calendar_idle(now_dict('2026-06-15'))
+
+def test_calendar_idle_catchup():
+    today = now_dict('2026-10-18')
+    assert AJC_Reminders.calendar_idle(today, last_run='2026-10-17')
+    # Missed reminder of 2026-10-13
+    assert not AJC_Reminders.calendar_idle(today, last_run='2026-10-12')
+    # Second run of the day
+    assert AJC_Reminders.calendar_idle(now_dict('2026-10-19'),
+                last_run='2026-10-19')
+
+def test_title_parser():
+    parse = AJC_Reminders.title_parser
+    assert parse('"Foo Bar" by Smith et al. (2019) [arXiv:1901.00001v2]') == \
+        ('Foo Bar', 'Smith', 2019, '1901.00001v2')
+    # Curly quotes, `by` inside the title, old-style arXiv ID
+    assert parse(u'“Stand by Me” by Doe (2020) astro-ph/0601001') == \
+        ('Stand by Me', 'Doe', 2020, 'astro-ph/0601001')
+    assert parse('Stars by the Sea by Roe (2018)') == \
+        ('Stars by the Sea', 'Roe', 2018, '')
+    # Punctuation after `et al.`, no space before `by`, no parentheses
+    assert parse('"Foo" by Smith et al., (2019)') == ('Foo', 'Smith', 2019, '')
+    assert parse('"Foo"by Smith (2019)') == ('Foo', 'Smith', 2019, '')
+    assert parse("'Foo' by van der Berg, 2021 [1901.12345]") == \
+        ('Foo', 'van der Berg', 2021, '1901.12345')
+    # Other formats keep the title and the arXiv ID
+    assert parse('Some talk without a paper') == \
+        ('Some talk without a paper', '', None, '')
+    assert parse('"Foo" arXiv:1901.00001') == ('Foo', '', None, '1901.00001')
+    with pytest.raises(ValueError):
+        parse(None)
+
+def test_title_frame():
+    pd = pytest.importorskip('pandas')
+    cells = ['"Foo" by Smith et al., (2019) [astro-ph/0601001v2]',
+             'Some talk without a paper', None]
+    paper_pd = AJC_Reminders.title_frame(pd.Series(cells))
+    assert list(paper_pd.columns) == ['paper_title', 'author', 'year',
+                                      'arxiv_id']
+    assert paper_pd.iloc[0].tolist() == ['Foo', 'Smith', 2019,
+                                         'astro-ph/0601001v2']
+    assert paper_pd.loc[1, 'paper_title'] == 'Some talk without a paper'
+    assert paper_pd.loc[1, ['author', 'year', 'arxiv_id']].isna().all()
+    assert paper_pd.loc[2].isna().all()
+
+PEOPLE_HTML = """
+<table>
+<tr><td>-</td><td>Jane Doe Graduate Student Email: jane.doe@vanderbilt.edu
+    Office: SC 6333</td></tr>
+<tr><td>-</td><td>John Roe Email:john.roe@vanderbilt.edu, Phone: 1234</td></tr>
+<tr><td>-</td><td>Unknown Person, no contact</td></tr>
+</table>
+<table>
+<tr><td>-</td><td>Ada Zed Email: ada.zed@vanderbilt.edu</td></tr>
+</table>
+"""
+
+def test_people_parser():
+    pd = pytest.importorskip('pandas')
+    people_pd = AJC_Reminders.people_parser(pd.Series([
+                    'Jane Doe Email: jane.doe@vanderbilt.edu Office: 1',
+                    'John Roe Email:john.roe@vanderbilt.edu; Phone: 1234',
+                    'Nobody']))
+    assert people_pd['full_name'].tolist()[:2] == ['Doe_Jane', 'Roe_John']
+    assert people_pd['email'].tolist()[:2] == ['jane.doe@vanderbilt.edu',
+                                               'john.roe@vanderbilt.edu']
+    assert people_pd['malformed'].tolist() == [False, False, True]
+
+def test_people_info_extractor(http_cache):
+    pytest.importorskip('lxml')
+    people_pd = AJC_Reminders.people_info_extractor('graduate',
+                    people_html=PEOPLE_HTML)
+    # Every table, sorted by name, without the malformed row
+    assert people_pd.index.tolist() == ['Doe_Jane', 'Roe_John', 'Zed_Ada']
+    assert people_pd.loc['Roe_John', 'email'] == 'john.roe@vanderbilt.edu'
+    assert set(people_pd['people_type']) == set(['graduate'])
+    # Parsed once per page
+    url = AJC_Reminders.people_url_creator('graduate')
+    assert http_cache.load_parsed(url, 'people_pd', PEOPLE_HTML) is not None
+    with pytest.raises(ValueError):
+        AJC_Reminders.people_info_extractor('postdoc', people_html=PEOPLE_HTML)
+
+AJC_HTML = """
+<table>
+<tr><th>Date</th><th>Speaker</th><th>Title</th></tr>
+<tr><td>10/21/2026</td><td>Jane Doe</td>
+    <td>"Foo" by Smith et al. (2019) [arXiv:1901.00001]</td></tr>
+<tr><td>10/28/2026</td><td>Sam Stranger</td><td>TBD</td></tr>
+<tr><td>11/04/2026</td><td></td><td></td></tr>
+</table>
+"""
+
+FACULTY_HTML = """
+<table>
+<tr><td>-</td><td>Kay Holt Professor Email: kay.holt@vanderbilt.edu</td></tr>
+</table>
+"""
+
+class AJCSite(object):
+    """
+    Stand-in of the AJC and people pages, served by `fetch_pages`. Records
+    every download, and the speakers resolved by `ADS_Testing`.
+    """
+    def __init__(self):
+        self.pages = {
+            AJC_Reminders.ajc_url_creator(now_dict('2026-10-19')): AJC_HTML,
+            AJC_Reminders.people_url_creator('graduate'): PEOPLE_HTML,
+            AJC_Reminders.people_url_creator('faculty'): FACULTY_HTML}
+        self.fetched  = []
+        self.ads_rows = []
+
+    def fetch_pages(self, url_list, **kwargs):
+        self.fetched.append(list(url_list))
+        return dict((url, self.pages[url]) for url in url_list)
+
+    def ads_testing(self, ajc_gs_pd, now_dict):
+        self.ads_rows.append(ajc_gs_pd.index.tolist())
+
+@pytest.fixture
+def ajc_site(tmp_path, http_cache, monkeypatch):
+    pytest.importorskip('lxml')
+    monkeypatch.setattr(ajc_cache, 'AJC_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(AJC_Reminders, 'STALE_PAGES', {})
+    monkeypatch.setenv('ajc_email', 'ajc@vanderbilt.edu')
+    monkeypatch.setenv('vandy_email', 'organizer@vanderbilt.edu')
+    site = AJCSite()
+    monkeypatch.setattr(AJC_Reminders, 'fetch_pages', site.fetch_pages)
+    # No paper lookups
+    monkeypatch.setattr(AJC_Reminders, 'ADS_Testing', site.ads_testing)
+    monkeypatch.setattr(AJC_Reminders, 'ADS_Query', lambda *args: ('', 0))
+    return site
+
+def test_simulate_main(tmp_path, ajc_site):
+    output_dir = str(tmp_path / 'simulation')
+    AJC_Reminders.simulate_main('2026-10-19', '2026-10-26',
+        output_dir=output_dir)
+    # The pages are downloaded once for every simulated day
+    assert len(ajc_site.fetched) == 1
+    with open(str(tmp_path / 'simulation' / 'manifest.json')) as man_file:
+        manifest = json.load(man_file)
+    assert [(msg['day'], msg['kind'], msg['speaker'], msg['to'][0])
+                for msg in manifest] == [
+        ('2026-10-19', 'reminder', 'Doe_Jane', 'jane.doe@vanderbilt.edu'),
+        ('2026-10-20', 'announcement', 'Doe_Jane',
+            'PHYS_AJC@LIST.VANDERBILT.EDU'),
+        ('2026-10-26', 'reminder', 'Stranger_Sam', 'organizer@vanderbilt.edu')]
+    with open(str(tmp_path / 'simulation' / manifest[1]['file'])) as msg_file:
+        assert 'Speaker : Jane Doe' in msg_file.read()
+
+def test_schedule_diff():
+    def record(date_str, speaker, title):
+        return {'date': date_str, 'speaker': speaker, 'title': title,
+                'row_hash': ajc_index.row_hash(date_str, speaker, title)}
+    old_records = [record('2026-10-21', 'Doe_Jane', 'Foo'),
+                   record('2026-10-28', 'Roe_John', 'TBD'),
+                   record('2026-11-04', 'Zed_Ada', 'Bar')]
+    new_records = [record('2026-10-21', 'Doe_Jane', 'Foo'),
+                   record('2026-10-28', 'Roe_John', '"Baz" by Roe (2020)'),
+                   record('2026-11-11', 'Zed_Ada', 'Bar')]
+    assert AJC_Reminders.schedule_diff(new_records, old_records) == {
+        'added'    : [('2026-11-11', 'Zed_Ada')],
+        'changed'  : [('2026-10-28', 'Roe_John')],
+        'removed'  : [('2026-11-04', 'Zed_Ada')],
+        'unchanged': [('2026-10-21', 'Doe_Jane')]}
+
+def test_schedule_refresh(tmp_path, ajc_site, monkeypatch):
+    merged = []
+    ajc_gs_merge = AJC_Reminders.ajc_gs_merge
+    def merge_rows(ajc_pd, **kwargs):
+        merged.append(ajc_pd.index.tolist())
+        return ajc_gs_merge(ajc_pd, **kwargs)
+    monkeypatch.setattr(AJC_Reminders, 'ajc_gs_merge', merge_rows)
+    index = ajc_index.ScheduleIndex(str(tmp_path / 'schedule.sqlite'))
+    try:
+        today = now_dict('2026-10-19')
+        # Every row of a new index is resolved
+        assert AJC_Reminders.schedule_refresh(today, index)
+        assert merged == ajc_site.ads_rows == [['Doe_Jane', 'Stranger_Sam']]
+        # Unchanged pages
+        assert not AJC_Reminders.schedule_refresh(today, index)
+        assert len(merged) == 1
+        # Only the row whose title changed is resolved again
+        ajc_url = AJC_Reminders.ajc_url_creator(today)
+        ajc_site.pages[ajc_url] = AJC_HTML.replace('TBD',
+                                    '"Baz" by Stranger (2020)')
+        assert AJC_Reminders.schedule_refresh(today, index)
+        assert merged[1:] == ajc_site.ads_rows[1:] == [['Stranger_Sam']]
+        rows = dict((row['speaker'], row) for row in index.rows())
+        assert rows['Doe_Jane']['email'] == 'jane.doe@vanderbilt.edu'
+        assert rows['Stranger_Sam']['paper_title'] == 'Baz'
+        # New rosters resolve every row, but papers are not looked up again
+        ajc_site.pages[AJC_Reminders.people_url_creator('faculty')] = \
+            FACULTY_HTML.replace('Kay Holt', 'Kai Holt')
+        assert AJC_Reminders.schedule_refresh(today, index)
+        assert merged[2:] == [['Doe_Jane', 'Stranger_Sam']]
+        assert len(ajc_site.ads_rows) == 2
+    finally:
+        index.close()
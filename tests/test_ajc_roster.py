@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the binary roster file of `ajc_roster`.
+"""
+import struct
+
+import pytest
+
+import ajc_roster
+
+DIGEST = 'ab' * 20
+
+def make_roster():
+    return ajc_roster.Roster([
+        ajc_roster.Person('Jane Doe', 'Jane', 'Doe', 'jane.doe@vanderbilt.edu',
+            'graduate'),
+        ajc_roster.Person(u'José Núñez', u'José', u'Núñez', None, 'faculty')])
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'roster.bin')
+    make_roster().save(path, DIGEST)
+    roster = ajc_roster.Roster.load(path, digest=DIGEST)
+    assert [person.to_dict() for person in roster] == \
+        [person.to_dict() for person in make_roster()]
+    assert roster.get_email('JANE.DOE@vanderbilt.edu').full_name == 'Jane Doe'
+    # Parsed from other pages, or never saved
+    assert ajc_roster.Roster.load(path, digest='cd' * 20) is None
+    assert ajc_roster.Roster.load(str(tmp_path / 'missing.bin')) is None
+
+def test_corrupt_files(tmp_path):
+    path = str(tmp_path / 'roster.bin')
+    make_roster().save(path, DIGEST)
+    with open(path, 'rb') as roster_file:
+        data = roster_file.read()
+    header_len = ajc_roster.HEADER_LEN
+    corrupt_list = [data[:10],              # Truncated header
+                    data[:-3],              # Truncated record
+                    data + b'\0\0',         # Bytes after the records
+                    b'XXXX\x01' + data[5:], # Not a roster
+                    data[:header_len - 4] + struct.pack('<I', 3) +
+                        data[header_len:]]  # Wrong number of people
+    for corrupt in corrupt_list:
+        with open(path, 'wb') as roster_file:
+            roster_file.write(corrupt)
+        with pytest.raises(ajc_roster.RosterError):
+            ajc_roster.Roster.load(path)
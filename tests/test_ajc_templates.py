@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the email templates of `ajc_templates`.
+"""
+import pytest
+
+import ajc_templates
+
+@pytest.fixture(autouse=True)
+def signature(monkeypatch):
+    monkeypatch.setenv('ajc_name', 'AJC <Team> $5')
+    monkeypatch.setenv('ajc_email', 'ajc@vanderbilt.edu')
+    monkeypatch.setenv('ajc_website', 'https://as.vanderbilt.edu/ajc')
+    # Templates are compiled with the signature of the test
+    monkeypatch.setattr(ajc_templates, '_compiled', {})
+
+ANNOUNCEMENT = {'title'     : 'Stars & <Gas>',
+                'author'    : 'Smith',
+                'year'      : 2019,
+                'link'      : 'http://arxiv.org/abs/1901.00001',
+                'first_name': 'Jane',
+                'last_name' : 'Doe',
+                'date_str'  : 'Wednesday, October 21',
+                'location'  : 'https://maps.example.com/sc'}
+
+def test_get_template():
+    template = ajc_templates.get_template('reminder')
+    # Compiled once per process
+    assert ajc_templates.get_template('reminder') is template
+    subject, html_str, text_str = template.render({'first_name': 'Jane'})
+    assert subject == 'Astronomy Journal Club'
+    assert text_str.startswith('Hi Jane,\r\n')
+    # The signature is escaped in the HTML part, and `$` is kept as is
+    assert 'AJC &lt;Team&gt; $5<br />' in html_str
+    assert 'AJC <Team> $5\r\n' in text_str
+    with pytest.raises(ValueError):
+        ajc_templates.get_template('farewell')
+
+def test_render_optional_lines():
+    template = ajc_templates.get_template('announcement')
+    subject, html_str, text_str = template.render(ANNOUNCEMENT)
+    assert 'Title   : "Stars & <Gas>"\r\n' in text_str
+    assert '"Stars &amp; &lt;Gas&gt;"' in html_str
+    assert 'Link    : http://arxiv.org/abs/1901.00001\r\n' in text_str
+    # Without a link, the `Link` line is left out
+    context = dict(ANNOUNCEMENT, link=None)
+    (_, html_str, text_str), = template.render_many([context])
+    assert 'Link' not in text_str and 'Link' not in html_str
+    ## Candidate of `speaker_not_found`
+    template = ajc_templates.get_template('speaker_not_found')
+    _, _, text_str = template.render({'speaker': 'J. Doe'})
+    assert 'closest name' not in text_str
+    _, html_str, text_str = template.render({'speaker'  : 'J. Doe',
+                                             'candidate': 'Jane Doe'})
+    assert 'The closest name in the rosters is Jane Doe' in text_str
+    assert 'The closest name in the rosters is Jane Doe' in html_str
+    # Missing placeholders are errors
+    with pytest.raises(KeyError):
+        template.render({})
+
+def test_build_message():
+    msg = ajc_templates.build_message('announcement', ANNOUNCEMENT,
+                'ajc@vanderbilt.edu', 'astro@vanderbilt.edu')
+    assert msg['Subject'] == 'Astronomy Journal Club'
+    assert (msg['From'], msg['To'], msg['reply-to']) == \
+        ('ajc@vanderbilt.edu', 'astro@vanderbilt.edu', 'ajc@vanderbilt.edu')
+    # The HTML part comes last, as the one preferred by email clients
+    text_part, html_part = msg.get_payload()
+    assert text_part.get_content_type() == 'text/plain'
+    assert html_part.get_content_type() == 'text/html'
+    assert 'Speaker : Jane Doe' in text_part.get_payload(decode=True).decode()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the semester-wide scheduling (`--bulk`) of
+`Astroweb_updates_xmlrpc`, against a local stand-in of the site.
+"""
+import datetime
+
+import pytest
+
+import event_calendar
+import wp_xmlrpc
+import Astroweb_updates_xmlrpc as astroweb
+
+@pytest.fixture
+def calendar(monkeypatch):
+    calendar = event_calendar.EventCalendar({
+        'events': [{'name': 'AJC', 'weekdays': ['Wed']},
+                   {'name': 'Vino', 'weekdays': ['Fri']}]})
+    monkeypatch.setattr(event_calendar, 'load_calendar', lambda *args: calendar)
+    return calendar
+
+@pytest.fixture
+def site(wp_stub, ledger, monkeypatch):
+    monkeypatch.setattr(wp_xmlrpc, 'WP_URL', wp_stub.url)
+    monkeypatch.setattr(astroweb, '_post_ledger', ledger)
+    monkeypatch.setenv('wp_username', 'editor')
+    monkeypatch.setenv('wp_password', 'secret')
+    return wp_stub
+
+def next_week():
+    today = datetime.date.today()
+    monday = today + datetime.timedelta(days=7 - today.weekday())
+    return monday, monday + datetime.timedelta(days=6)
+
+def test_bulk_posts(calendar):
+    monday, sunday = next_week()
+    post_list = astroweb.bulk_posts(monday, sunday,
+                    post_time=datetime.time(9, 30))
+    wednesday = (monday + datetime.timedelta(days=2)).strftime('%Y-%m-%d')
+    friday    = (monday + datetime.timedelta(days=4)).strftime('%Y-%m-%d')
+    assert [key for key, post in post_list] == [('AJC', wednesday),
+                                                ('Vino', friday)]
+    post = post_list[1][1]
+    assert post['post_status'] == 'future'
+    assert post['post_title'].startswith('Vino de Vida, Fri.')
+    assert str(post['post_date']) == friday.replace('-', '') + 'T09:30:00'
+    # Days that have already started are skipped
+    assert astroweb.bulk_posts(monday - datetime.timedelta(days=14),
+                datetime.date.today() - datetime.timedelta(days=1)) == []
+
+def test_bulk_dry_run(calendar, site, capsys):
+    monday, sunday = next_week()
+    astroweb.main(['--bulk', str(monday), str(sunday), '--dry-run'])
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 2
+    assert 'Vino de Vida' in lines[1]
+    # Nothing is sent
+    assert site.requests == []
+
+def test_bulk_main(calendar, site, ledger, capsys):
+    monday, sunday = next_week()
+    astroweb.bulk_main(str(monday), str(sunday))
+    # Both posts in one `system.multicall` request
+    assert site.requests.count('system.multicall') == 1
+    assert site.requests.count('wp.newPost') == 2
+    assert site.posts[0]['post_title'].startswith('Astronomy Journal Club')
+    assert site.posts[1]['post_title'].startswith('Vino de Vida')
+    wednesday = (monday + datetime.timedelta(days=2)).strftime('%Y-%m-%d')
+    assert ledger.post_id('AJC', wednesday) == site.posts[0]['post_id']
+    assert 'Scheduled 2 of 2 posts' in capsys.readouterr().err
+    # Scheduled posts are not sent again
+    astroweb.bulk_main(str(monday), str(sunday))
+    assert len(site.posts) == 2
+    assert '(2 already posted, 0 queued)' in capsys.readouterr().err
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `event_calendar`: breaks tied to a weekday, and the calendar
+shipped in `event_calendar.json`.
+"""
+import datetime
+
+import pytest
+
+import event_calendar
+
+def date(date_str):
+    return datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
+
+def test_nth_weekday():
+    # Thanksgiving: 4th Thursday of November
+    assert event_calendar.nth_weekday(2026, 11, 'Thu', 4) == date('2026-11-26')
+    assert event_calendar.nth_weekday(2027, 11, 'Thu', 4) == date('2027-11-25')
+    assert event_calendar.nth_weekday(2026, 3, 'Mon', 1) == date('2026-03-02')
+    # Negative `nth` counts from the end of the month
+    assert event_calendar.nth_weekday(2026, 5, 'Mon', -1) == date('2026-05-25')
+    assert event_calendar.nth_weekday(2026, 12, 'Thu', -1) == date('2026-12-31')
+    assert event_calendar.nth_weekday(2026, 10, 'Wed', -2) == date('2026-10-21')
+
+@pytest.fixture
+def calendar():
+    return event_calendar.load_calendar(event_calendar.CALENDAR_PATH)
+
+def test_thanksgiving_window(calendar):
+    for year, thursday in [(2026, '2026-11-26'), (2027, '2027-11-25')]:
+        thursday = date(thursday)
+        # Wednesday to Friday around the 4th Thursday
+        for shift in [-1, 0, 1]:
+            day = calendar.day(thursday + datetime.timedelta(days=shift))
+            assert day.break_name == 'Thanksgiving Break'
+            assert day.events == ()
+        for shift in [-2, 2]:
+            day = calendar.day(thursday + datetime.timedelta(days=shift))
+            assert day.break_name is None
+    # AstroLunch of the Tuesday before
+    assert calendar.events_on(date('2026-11-24')) == ('AstroLunch',)
+
+def test_spring_break(calendar):
+    # Monday to Friday of the week of the 1st Monday of March
+    for ii in range(5):
+        day = calendar.day(date('2027-03-01') + datetime.timedelta(days=ii))
+        assert day.break_name == 'Spring Break'
+        assert day.events == ()
+    assert calendar.break_name(date('2027-02-28')) is None
+    assert calendar.events_on(date('2027-03-09')) == ('AstroLunch',)
+
+def test_overrides_and_limited_exclusions():
+    calendar = event_calendar.EventCalendar({
+        'events': [{'name': 'AJC', 'weekdays': ['Wed']},
+                   {'name': 'Vino', 'weekdays': ['Fri']}],
+        'exclusions': [{'name': 'Exams', 'start': '2026-12-07',
+                        'end': '2026-12-11', 'events': ['AJC']}],
+        'overrides': [{'date': '2026-12-10', 'add': ['AJC']}]})
+    assert calendar.events_on(date('2026-12-09')) == ()
+    assert calendar.break_name(date('2026-12-09')) == 'Exams'
+    assert calendar.events_on(date('2026-12-10')) == ('AJC',)
+    assert calendar.events_on(date('2026-12-11')) == ('Vino',)
+    # `YYYY-MM-DD` exclusions only apply to their year
+    assert calendar.events_on(date('2027-12-08')) == ('AJC',)
+    with pytest.raises(ValueError):
+        event_calendar.EventCalendar({'events': [{'name': 'AJC',
+                                        'weekdays': ['Wednesday']}]})
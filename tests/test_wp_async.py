@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the circuit breaker and of `wp_async.AsyncPoster`, against a
+local stand-in of the site.
+"""
+import time
+import socket
+import datetime
+
+import pytest
+
+import conftest
+import wp_async
+import wp_xmlrpc
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 1000.
+
+    def __call__(self):
+        return self.now
+
+def free_port():
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    return port
+
+def test_breaker_states(ledger):
+    clock   = FakeClock()
+    breaker = wp_async.CircuitBreaker(threshold=2, cooldown=60, clock=clock,
+                ledger=ledger)
+    assert breaker.state == 'closed'
+    breaker.failure()
+    assert breaker.state == 'closed'
+    breaker.failure()
+    assert breaker.state == 'open'
+    with pytest.raises(wp_async.CircuitOpen):
+        breaker.check()
+    ## Next run, before the cooldown is over
+    clock.now += 30
+    breaker = wp_async.CircuitBreaker(threshold=2, cooldown=60, clock=clock,
+                ledger=ledger)
+    assert breaker.state == 'open'
+    ## After the cooldown, one probe call. A failed probe reopens it.
+    clock.now += 31
+    assert breaker.state == 'half-open'
+    breaker.check()
+    breaker.failure()
+    assert breaker.state == 'open'
+    clock.now += 61
+    assert breaker.state == 'half-open'
+    breaker.success()
+    assert breaker.state == 'closed'
+    assert ledger.breaker_state() == (0, None)
+
+def test_half_open_breaker_lets_one_probe_through():
+    clock   = FakeClock()
+    breaker = wp_async.CircuitBreaker(threshold=1, cooldown=60, clock=clock)
+    breaker.failure()
+    clock.now += 61
+    breaker.check()
+    with pytest.raises(wp_async.CircuitOpen):
+        breaker.check()
+    breaker.success()
+    breaker.check()
+    breaker.check()
+
+class DownClient(object):
+    """
+    Client of a site that refuses every connection.
+    """
+    calls = []
+
+    def new_post(self, blog_content, method='metaWeblog.newPost'):
+        DownClient.calls.append(blog_content['title'])
+        time.sleep(0.1)
+        raise ConnectionRefusedError()
+
+def test_half_open_poster_sends_one_probe(ledger):
+    ledger.store_snapshot([])
+    ledger.set_breaker_state(2, 0.)
+    DownClient.calls = []
+    poster = wp_async.AsyncPoster(ledger, client_factory=DownClient,
+                max_attempts=1, workers=4)
+    items = [((title, '2026-10-18'), {'title': title, 'description': ''},
+                'metaWeblog.newPost') for title in ['AJC', 'Vino', 'AstroBrew']]
+    try:
+        results = wp_async.asyncio.run(poster.run(items,
+                    today=datetime.date(2026, 10, 18)))
+    finally:
+        poster.close()
+    # The probe failed: the other posts never reached the site
+    assert len(DownClient.calls) == 1
+    assert set(results.values()) == set([None])
+    assert len(ledger.queued()) == 3
+    assert poster.breaker.state == 'open'
+
+def make_poster(ledger, url, deadline=5, max_attempts=2, batch_size=50):
+    return wp_async.AsyncPoster(ledger,
+                client_factory=lambda: wp_xmlrpc.WordPressClient(url=url,
+                    timeout=deadline),
+                deadline=deadline, max_attempts=max_attempts, base_delay=0.01,
+                max_delay=0.01, breaker=wp_async.CircuitBreaker(threshold=2,
+                    cooldown=300, ledger=ledger), batch_size=batch_size)
+
+def run(ledger, url, items=(), today=datetime.date(2026, 10, 18), batch=False,
+    **kwargs):
+    poster = make_poster(ledger, url, **kwargs)
+    try:
+        return wp_async.asyncio.run(poster.run(items, today=today,
+                    batch=batch))
+    finally:
+        poster.close()
+
+def test_queues_while_down_and_drains(ledger):
+    port  = free_port()
+    url   = 'http://127.0.0.1:{0}'.format(port)
+    items = [(('AJC', '2026-10-18'), {'title': 'AJC', 'description': ''},
+                'metaWeblog.newPost'),
+             (('Vino', '2026-10-18'), {'title': 'Vino', 'description': ''},
+                'metaWeblog.newPost')]
+    ## Site is down: nothing is sent, posts are queued and the breaker opens
+    assert run(ledger, url, items) == {items[0][0]: None, items[1][0]: None}
+    assert [key for key, blog_content, method in ledger.queued()] == \
+        [items[0][0], items[1][0]]
+    assert ledger.breaker_state()[1] is not None
+    ## Site is back, after the cooldown
+    server = conftest.serve(conftest.WordPressStub(port=port))
+    try:
+        ledger.set_breaker_state(2, 0.)
+        results = run(ledger, url)
+        assert sorted(results.values()) == ['100', '101']
+        assert ledger.queued() == []
+        assert ledger.post_id('AJC', '2026-10-18') is not None
+        assert ledger.breaker_state() == (0, None)
+        ## Rerun: posts are in the ledger, the site is not called
+        n_requests = len(server.requests)
+        assert run(ledger, url, items) == results
+        assert len(server.requests) == n_requests
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert sorted(post['post_title'] for post in server.posts) == \
+        ['AJC', 'Vino']
+
+def test_expired_posts_are_dropped(ledger, wp_stub):
+    ledger.enqueue('AJC', '2026-10-15', {'title': 'AJC', 'description': ''})
+    assert run(ledger, wp_stub.url) == {}
+    assert ledger.entry('AJC', '2026-10-15')['status'] == 'expired'
+    assert wp_stub.posts == []
+
+def test_timed_out_post_is_not_sent_twice(ledger, wp_stub):
+    key  = ('AJC', '2026-10-18')
+    item = (key, {'title': 'AJC', 'description': ''}, 'metaWeblog.newPost')
+    ledger.store_snapshot([])
+    ## The post reaches the site after the deadline
+    wp_stub.delay = 1.5
+    assert run(ledger, wp_stub.url, [item], deadline=1, max_attempts=2) == \
+        {key: None}
+    assert ledger.entry(*key)['status'] == 'pending'
+    assert [queued[0] for queued in ledger.queued()] == [key]
+    for ii in range(50):
+        if wp_stub.posts:
+            break
+        time.sleep(0.1)
+    wp_stub.delay = 0
+    ## Next run finds the post in the site instead of sending it again
+    results = run(ledger, wp_stub.url, [item])
+    assert [post['post_title'] for post in wp_stub.posts] == ['AJC']
+    assert results == {key: wp_stub.posts[0]['post_id']}
+    assert ledger.post_id(*key) == wp_stub.posts[0]['post_id']
+    assert ledger.queued() == []
+
+def test_refused_snapshot_holds_pending_posts(ledger, wp_stub):
+    wp_stub.getposts_fault = True
+    ledger.mark_pending('AJC', '2026-10-18', 'AJC')
+    items = [(('AJC', '2026-10-18'), {'title': 'AJC', 'description': ''},
+                'metaWeblog.newPost'),
+             (('Vino', '2026-10-18'), {'title': 'Vino', 'description': ''},
+                'metaWeblog.newPost')]
+    results = run(ledger, wp_stub.url, items)
+    # The post that was never sent goes out. The pending one may exist
+    # already, so it waits in the queue
+    assert results == {('AJC', '2026-10-18'): None,
+                       ('Vino', '2026-10-18'): '100'}
+    assert [post['post_title'] for post in wp_stub.posts] == ['Vino']
+    assert [key for key, blog_content, method in ledger.queued()] == \
+        [('AJC', '2026-10-18')]
+
+def future_items(titles):
+    return [((title, '2026-11-04'), {'post_title': title, 'post_content': '',
+                'post_status': 'future', 'post_date': '2026-11-04 07:00:00'},
+                'wp.newPost') for title in titles]
+
+def test_batch_posts(ledger, wp_stub):
+    ledger.store_snapshot([])
+    items = future_items(['AJC', 'bad AJC', 'Vino'])
+    results = run(ledger, wp_stub.url, items, batch=True, batch_size=2)
+    assert results == {items[0][0]: '100', items[1][0]: None,
+                       items[2][0]: '101'}
+    # One request per batch of 2 posts
+    assert wp_stub.requests.count('system.multicall') == 2
+    assert ledger.post_id('Vino', '2026-11-04') == '101'
+    # Rejected posts are neither recorded nor queued
+    assert ledger.entry('bad AJC', '2026-11-04') is None
+    assert ledger.queued() == []
+
+def test_batch_queues_while_down(ledger):
+    url   = 'http://127.0.0.1:{0}'.format(free_port())
+    items = future_items(['AJC', 'Vino'])
+    ledger.store_snapshot([])
+    assert run(ledger, url, items, batch=True) == \
+        {items[0][0]: None, items[1][0]: None}
+    # Pending and queued, for the next run to check and send
+    assert [key for key, blog_content, method in ledger.queued()] == \
+        [items[0][0], items[1][0]]
+    assert ledger.entry('AJC', '2026-11-04')['status'] == 'pending'
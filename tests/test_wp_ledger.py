@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `wp_ledger.PostLedger`.
+"""
+import datetime
+import xmlrpc.client
+
+import wp_ledger
+import wp_xmlrpc
+
+def test_post_day():
+    assert wp_ledger.post_day(datetime.datetime(2026, 10, 21, 9)) == \
+        '2026-10-21'
+    assert wp_ledger.post_day(xmlrpc.client.DateTime(
+        datetime.datetime(2026, 10, 21, 9))) == '2026-10-21'
+    assert wp_ledger.post_day('2026-10-21 09:00:00') == '2026-10-21'
+
+def test_rerun_uses_the_ledger(ledger):
+    key = ('AJC', '2026-10-21')
+    assert ledger.lookup(key[0], key[1], 'AJC') is None
+    ledger.mark_pending(key[0], key[1], 'AJC')
+    assert ledger.entry(*key)['status'] == 'pending'
+    assert ledger.post_id(*key) is None
+    ledger.record(key[0], key[1], 'AJC', 123)
+    assert ledger.lookup(key[0], key[1], 'AJC') == '123'
+    ledger.forget(*key)
+    assert ledger.entry(*key) is None
+
+def test_pending_post_is_adopted(ledger, wp_stub):
+    with wp_xmlrpc.WordPressClient(url=wp_stub.url, timeout=5) as client:
+        ## A previous run died after sending the post
+        ledger.mark_pending('AJC', '2026-10-18', 'AJC')
+        post_id = client.new_post({'title': 'AJC', 'description': ''})
+        assert not ledger.is_fresh()
+        assert ledger.reconcile(client)
+        assert ledger.is_fresh()
+        assert ledger.lookup('AJC', '2026-10-18', 'AJC') == post_id
+        assert ledger.post_id('AJC', '2026-10-18') == post_id
+        assert ledger.lookup('Vino', '2026-10-18', 'Vino') is None
+        # The snapshot is reused while it is fresh
+        n_requests = len(wp_stub.requests)
+        assert not ledger.reconcile(client)
+        assert len(wp_stub.requests) == n_requests
+
+def test_queue_and_expire(ledger):
+    ledger.enqueue('AJC', '2026-10-15', {'title': 'AJC'})
+    ledger.enqueue('Vino', '2026-10-17', {'post_title': 'Vino'},
+        method='wp.newPost')
+    ledger.enqueue('AstroLunch', '2026-10-20', {'title': 'AstroLunch'})
+    assert [(key, method) for key, blog_content, method in ledger.queued()] \
+        == [(('AJC', '2026-10-15'), 'metaWeblog.newPost'),
+            (('Vino', '2026-10-17'), 'wp.newPost'),
+            (('AstroLunch', '2026-10-20'), 'metaWeblog.newPost')]
+    assert ledger.queued()[1][1] == {'post_title': 'Vino'}
+    ledger.dequeue('AJC', '2026-10-15')
+    assert ledger.expire('2026-10-18') == [('Vino', '2026-10-17')]
+    assert ledger.entry('Vino', '2026-10-17')['status'] == 'expired'
+    assert ledger.entry('Vino', '2026-10-17')['title'] == 'Vino'
+    assert [key for key, blog_content, method in ledger.queued()] == \
+        [('AstroLunch', '2026-10-20')]
+
+def test_breaker_state(ledger):
+    assert ledger.breaker_state() == (0, None)
+    ledger.set_breaker_state(3, 1000.5)
+    assert ledger.breaker_state() == (3, 1000.5)
+    ledger.set_breaker_state(0, None)
+    assert ledger.breaker_state() == (0, None)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of `wp_xmlrpc.WordPressClient` against a local `SimpleXMLRPCServer`,
+with and without `system.multicall`.
+"""
+import datetime
+import xmlrpc.client
+
+import pytest
+
+import wp_xmlrpc
+
+def make_client(server, batch_size=2):
+    return wp_xmlrpc.WordPressClient(url=server.url, username='user',
+                password='pass', timeout=5, batch_size=batch_size)
+
+def test_new_post(wp_stub):
+    with make_client(wp_stub) as client:
+        assert client.new_post({'title': 'AJC', 'description': ''}) == '100'
+        with pytest.raises(xmlrpc.client.Fault):
+            client.new_post({'title': 'bad AJC', 'description': ''})
+    assert [post['post_title'] for post in wp_stub.posts] == ['AJC']
+
+@pytest.mark.parametrize('wp_stub', [True, False],
+    ids=['multicall', 'no-multicall'], indirect=True)
+def test_new_posts(wp_stub):
+    titles = ['AstroLunch', 'bad AJC', 'AstroBrew', 'Vino', 'AJC']
+    with make_client(wp_stub) as client:
+        results = client.new_posts([{'title': title, 'description': ''}
+                    for title in titles])
+        multicall_ok = client.multicall_ok
+    # Results keep the order of the posts, with a `Fault` for the bad one
+    assert [isinstance(result, xmlrpc.client.Fault) for result in results] \
+        == [False, True, False, False, False]
+    assert [result for result in results if isinstance(result, str)] == \
+        ['100', '101', '102', '103']
+    assert [post['post_title'] for post in wp_stub.posts] == \
+        ['AstroLunch', 'AstroBrew', 'Vino', 'AJC']
+    assert multicall_ok == wp_stub.multicall
+    n_multicalls = wp_stub.requests.count('system.multicall')
+    if wp_stub.multicall:
+        # Three batches of at most two posts
+        assert n_multicalls == 3
+    else:
+        # Rejected once, then one call per post
+        assert n_multicalls == 1
+        assert wp_stub.requests.count('metaWeblog.newPost') == len(titles)
+
+def test_future_post_and_get_posts(wp_stub):
+    blog_content = {'title': 'AJC', 'description': 'Today',
+                    'categories': ['Events']}
+    post = wp_xmlrpc.future_post(blog_content,
+                datetime.datetime(2026, 10, 21, 9, 0))
+    assert post['post_title'] == 'AJC'
+    assert post['terms_names'] == {'category': ['Events']}
+    with make_client(wp_stub) as client:
+        post_id = client.new_post(post, method='wp.newPost')
+        posts = client.get_posts(number=5)
+        with pytest.raises(ValueError):
+            client.new_post(post, method='wp.editPost')
+    assert [(post_ii['post_id'], post_ii['post_title']) for post_ii in posts] \
+        == [(post_id, 'AJC')]